@@ -1,6 +1,9 @@
 from .authenticators import JWTAuthService, require_auth
+from .token_store import RefreshTokenStore, refresh_token_store
 
 __all__ = [
     'JWTAuthService',
-    'require_auth'
+    'require_auth',
+    'RefreshTokenStore',
+    'refresh_token_store'
 ]
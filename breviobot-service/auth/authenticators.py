@@ -7,6 +7,7 @@ from core.exceptions import AuthenticationError
 from persistence.repositories import UserRepository
 from persistence.db_session import SessionLocal
 from core.settings import settings
+from core.tracing import span
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity, get_jwt, verify_jwt_in_request
 
 ANONYMOUS_USER = {"username": "anonymous"}
@@ -60,7 +61,7 @@ def require_auth(f: callable) -> callable:
         @jwt_required()
         def decorated_function(*args: object, **kwargs: object) -> object:
             user_id = get_jwt_identity()
-            with SessionLocal() as db:
+            with span("auth.user_lookup"), SessionLocal() as db:
                 repo = UserRepository(db)
                 user_db = repo.get(id=user_id)
                 try:
@@ -1,9 +1,10 @@
 from flask import jsonify, g
-from flask_jwt_extended import get_jwt_identity, get_jwt, create_access_token, create_refresh_token
+from flask_jwt_extended import get_jwt_identity, get_jwt, create_access_token, create_refresh_token, decode_token
 from dataclasses import dataclass
 from core.logger import logger
 from core.exceptions import ValidationError, AuthenticationError
 from auth.authenticators import _jwt_auth_service
+from auth.token_store import refresh_token_store
 from sqlalchemy.exc import IntegrityError
 from core.email_utils import send_email
 from core.users import User
@@ -41,6 +42,7 @@ def handle_login_request(request_json):
         identity=str(user_db.id),
         expires_delta=timedelta(minutes=settings.auth.refresh_token_expiry_minutes)
     )
+    refresh_token_store.register(refresh_token, user_db.id)
     user_dict = User.model_validate(user_db).to_dict()
     return jsonify({
         "access_token": access_token,
@@ -61,14 +63,38 @@ def handle_refresh_token_request(request_json):
         user_db = repo.get(id=user_id)
         _jwt_auth_service.validate_user_status(user_db, require_verified=True)
     new_token = _jwt_auth_service.generate_token(user_db)
+    new_refresh_token = create_refresh_token(
+        identity=str(user_db.id),
+        expires_delta=timedelta(minutes=settings.auth.refresh_token_expiry_minutes)
+    )
+    refresh_token_store.rotate(get_jwt()["jti"], user_db.id, new_refresh_token)
     return jsonify({
         "access_token": new_token,
+        "refresh_token": new_refresh_token,
         "token_type": "bearer",
-        "expires_in": settings.auth.token_expiry_minutes * 60
+        "expires_in": settings.auth.token_expiry_minutes * 60,
+        "refresh_expires_in": settings.auth.refresh_token_expiry_minutes * 60
     })
 
-def handle_logout_request():
-    logger.info("User logout")
+def handle_logout_request(request_json):
+    user_id = g.current_user.get("user_id")
+    refresh_token = (request_json or {}).get("refresh_token")
+    if user_id is None:
+        logger.info("User logout")
+        return jsonify({"message": "Successfully logged out"})
+    if refresh_token:
+        try:
+            payload = decode_token(refresh_token, allow_expired=True)
+        except Exception:
+            raise ValidationError("Invalid refresh token")
+        if payload.get("type") != "refresh" or str(payload.get("sub")) != str(user_id):
+            raise ValidationError("Invalid refresh token")
+        refresh_token_store.revoke(payload["jti"])
+        logger.info(f"User logout: revoked refresh token for user_id={user_id}")
+    else:
+        # Without a refresh token the session cannot be identified, so all of them are closed
+        revoked = refresh_token_store.revoke_all(user_id)
+        logger.info(f"User logout: revoked {revoked} refresh tokens for user_id={user_id}")
     return jsonify({"message": "Successfully logged out"})
 
 def handle_verify_user_request(token):
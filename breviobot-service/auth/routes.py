@@ -17,7 +17,8 @@ auth_bp = Blueprint("auth_api", __name__)
 auth_limiter = Limiter(
     app=None,
     key_func=get_remote_address,
-    default_limits=[f"{settings.api.rate_limit} per minute"]
+    default_limits=[f"{settings.api.rate_limit} per minute"],
+    storage_uri=settings.api.rate_limit_storage_uri
 )
 
 @auth_bp.route("/api/auth/login", methods=["POST"])
@@ -46,7 +47,7 @@ def refresh_token():
 @auth_limiter.limit("10 per minute")
 @require_auth
 def logout():
-    return handle_logout_request()
+    return handle_logout_request(request.get_json(silent=True))
 
 @auth_bp.route("/api/auth/me", methods=["GET"])
 @require_auth
@@ -0,0 +1,130 @@
+import threading
+from datetime import datetime
+from flask_jwt_extended import decode_token
+from core.exceptions import AuthenticationError
+from core.logger import logger
+from core.settings import settings
+from persistence.db_session import SessionLocal
+from persistence.repositories import RefreshTokenRepository
+
+
+class RefreshTokenStore:
+    """
+    Tracks issued refresh-token JTIs so they can be rotated and revoked.
+    Revocation checks are served from an in-memory set of revoked, unexpired JTIs;
+    the refresh_tokens table is the source of truth. A background thread deletes
+    expired rows and reloads the set so revocations made by other workers are seen.
+    """
+
+    def __init__(self, compaction_interval_seconds: int):
+        self.compaction_interval_seconds = compaction_interval_seconds
+        self._lock = threading.Lock()
+        self._revoked = set()
+        self._recently_revoked = set()
+        self._loaded = False
+        self._stop_event = threading.Event()
+        self._compaction_thread = None
+
+    def _ensure_started(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._revoked = self._load_revoked()
+            self._loaded = True
+            self._compaction_thread = threading.Thread(target=self._compaction_loop, name="token-compaction", daemon=True)
+            self._compaction_thread.start()
+
+    @staticmethod
+    def _load_revoked() -> set:
+        with SessionLocal() as db:
+            return set(RefreshTokenRepository(db).get_revoked_jtis(datetime.utcnow()))
+
+    def is_revoked(self, jti: str) -> bool:
+        self._ensure_started()
+        return jti in self._revoked
+
+    def register(self, refresh_token: str, user_id: int) -> str:
+        payload = decode_token(refresh_token)
+        with SessionLocal() as db:
+            RefreshTokenRepository(db).add(
+                payload["jti"],
+                user_id,
+                datetime.utcfromtimestamp(payload["exp"])
+            )
+        return payload["jti"]
+
+    def rotate(self, jti: str, user_id: int, new_refresh_token: str) -> str:
+        self._ensure_started()
+        payload = decode_token(new_refresh_token)
+        now = datetime.utcnow()
+        with SessionLocal() as db:
+            repo = RefreshTokenRepository(db)
+            record = repo.get(jti)
+            if not record or record.user_id != user_id:
+                raise AuthenticationError("Refresh token is not recognized. Please log in again.")
+            if not repo.revoke(jti, now, replaced_by=payload["jti"]):
+                # A rotated token was presented again: treat the tokens issued from it as compromised
+                revoked = repo.revoke_descendants(jti, now)
+                self._add_revoked([jti] + revoked)
+                logger.warning(f"[Auth] Refresh token reuse detected for user_id={user_id}, revoked {len(revoked)} tokens in its family")
+                raise AuthenticationError("Refresh token has already been used. Please log in again.")
+            repo.add(payload["jti"], user_id, datetime.utcfromtimestamp(payload["exp"]))
+        self._add_revoked([jti])
+        return payload["jti"]
+
+    def handle_revoked_use(self, jti: str, user_id: int):
+        # Only called on the rare path where a revoked token is presented. Only the tokens
+        # rotated from it are revoked, so replaying an old token cannot end the user's other
+        # sessions; once its family is revoked, further replays revoke nothing.
+        self._ensure_started()
+        with SessionLocal() as db:
+            revoked = RefreshTokenRepository(db).revoke_descendants(jti, datetime.utcnow())
+        if revoked:
+            self._add_revoked(revoked)
+            logger.warning(f"[Auth] Rotated refresh token reused for user_id={user_id}, revoked {len(revoked)} tokens in its family")
+
+    def revoke(self, jti: str) -> bool:
+        self._ensure_started()
+        with SessionLocal() as db:
+            revoked = RefreshTokenRepository(db).revoke(jti, datetime.utcnow())
+        self._add_revoked([jti])
+        return revoked
+
+    def revoke_all(self, user_id: int) -> int:
+        self._ensure_started()
+        with SessionLocal() as db:
+            revoked = RefreshTokenRepository(db).revoke_all_for_user(user_id, datetime.utcnow())
+        self._add_revoked(revoked)
+        return len(revoked)
+
+    def _add_revoked(self, jtis):
+        with self._lock:
+            self._revoked.update(jtis)
+            self._recently_revoked.update(jtis)
+
+    def compact(self):
+        with self._lock:
+            self._recently_revoked = set()
+        with SessionLocal() as db:
+            deleted = RefreshTokenRepository(db).delete_expired(datetime.utcnow())
+        revoked = self._load_revoked()
+        with self._lock:
+            # Keep revocations made locally while the reload was running
+            self._revoked = revoked | self._recently_revoked
+        if deleted:
+            logger.info(f"[Auth] Compacted {deleted} expired refresh tokens")
+
+    def _compaction_loop(self):
+        while not self._stop_event.wait(self.compaction_interval_seconds):
+            try:
+                self.compact()
+            except Exception as e:
+                logger.error(f"[Auth] Refresh token compaction failed: {e}", exc_info=True)
+
+    def shutdown(self):
+        self._stop_event.set()
+
+
+refresh_token_store = RefreshTokenStore(settings.auth.token_store_compaction_seconds)
@@ -0,0 +1,29 @@
+"""
+Serves the application for the load tests in its own process, so the load
+generator does not compete with it for the GIL. Configuration comes from the
+BREVIOBOT_* environment prepared by benchmarks.loadtest.
+
+    python -m benchmarks.app_server --port 8765
+"""
+import argparse
+from werkzeug.serving import make_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, required=True)
+    args = parser.parse_args()
+
+    from core.warmup import warmup
+    from persistence.db_session import init_db
+    from server import create_app
+
+    init_db()
+    app = create_app()
+    warmup.start()
+    make_server(args.host, args.port, app, threaded=True).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,371 @@
+"""
+Local stand-ins for the external services BrevioBot talks to, used by the
+load tests. Every server listens on 127.0.0.1 on a free port and serves from
+background threads. Model latency is simulated as a fixed per-call latency
+plus completion_tokens / tokens_per_second, so the results reflect the
+service's own overhead on top of a predictable backend.
+"""
+import email
+import json
+import random
+import re
+import socketserver
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _json_body(self) -> dict:
+        body = self._body()
+        return json.loads(body) if body else {}
+
+    def _send_json(self, payload, status: int = 200):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_empty(self, status: int = 204):
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+class FakeServer:
+    handler_class = _Handler
+
+    def __init__(self):
+        server = self
+
+        class Handler(self.handler_class):
+            fake = server
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = None
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self):
+        with self._lock:
+            self.requests += 1
+
+    def start(self) -> "FakeServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name=type(self).__name__, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def _simulate_generation(latency_ms: float, tokens_per_second: float, completion_tokens: int) -> float:
+    seconds = latency_ms / 1000 + (completion_tokens / tokens_per_second if tokens_per_second else 0)
+    time.sleep(seconds)
+    return seconds
+
+
+class _OpenAIHandler(_Handler):
+    def do_GET(self):
+        self.fake.count()
+        if self.path.rstrip("/").endswith("/models"):
+            return self._send_json({"object": "list", "data": [{"id": "gpt-4.1-mini", "object": "model", "owned_by": "bench"}]})
+        self._send_json({"error": {"message": "Not found"}}, 404)
+
+    def do_POST(self):
+        self.fake.count()
+        path = urlparse(self.path).path
+        if path.endswith("/chat/completions"):
+            return self._chat()
+        if path.endswith("/audio/transcriptions"):
+            return self._transcription()
+        if path.endswith("/embeddings"):
+            return self._embeddings()
+        self._send_json({"error": {"message": "Not found"}}, 404)
+
+    def _chat(self):
+        fake = self.fake
+        request = self._json_body()
+        messages = request.get("messages", [])
+        prompt_tokens = max(1, len(json.dumps(messages)) // 4)
+        message = {"role": "assistant", "content": None}
+        if (request.get("tools") and request.get("tool_choice") != "none"
+                and not any(m.get("role") == "tool" for m in messages)
+                and random.random() < fake.tool_call_ratio):
+            completion_tokens = 20
+            message["tool_calls"] = [self._tool_call(request["tools"])]
+            finish_reason = "tool_calls"
+        else:
+            completion_tokens = fake.completion_tokens
+            message["content"] = " ".join(["word"] * completion_tokens)
+            finish_reason = "stop"
+        _simulate_generation(fake.latency_ms, fake.tokens_per_second, completion_tokens)
+        self._send_json({
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "gpt-4.1-mini"),
+            "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens}
+        })
+
+    @staticmethod
+    def _tool_call(tools: list) -> dict:
+        today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        arguments = {"start_date": today.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                     "end_date": (today + timedelta(days=7)).strftime("%Y-%m-%dT%H:%M:%SZ")}
+        return {
+            "id": f"call_{uuid.uuid4().hex[:12]}",
+            "type": "function",
+            "function": {"name": tools[0]["function"]["name"], "arguments": json.dumps(arguments)}
+        }
+
+    def _transcription(self):
+        fake = self.fake
+        self._body()
+        _simulate_generation(fake.latency_ms, fake.tokens_per_second, fake.completion_tokens)
+        text = " ".join(["word"] * fake.completion_tokens)
+        self._send_json({"task": "transcribe", "language": "english", "duration": fake.audio_seconds,
+                         "text": text, "segments": []})
+
+    def _embeddings(self):
+        request = self._json_body()
+        inputs = request.get("input")
+        inputs = inputs if isinstance(inputs, list) else [inputs]
+        self._send_json({
+            "object": "list",
+            "model": request.get("model", "text-embedding-3-small"),
+            "data": [{"object": "embedding", "index": i, "embedding": [random.random() for _ in range(64)]}
+                     for i in range(len(inputs))],
+            "usage": {"prompt_tokens": 1, "total_tokens": 1}
+        })
+
+
+class FakeOpenAIServer(FakeServer):
+    """
+    OpenAI-compatible /v1 API: chat completions (optionally answering with a
+    tool call first, tool_call_ratio of the time), audio transcriptions and
+    embeddings. Point the SDK at it with OPENAI_BASE_URL={url}/v1.
+    """
+    handler_class = _OpenAIHandler
+
+    def __init__(self, latency_ms: float = 200, tokens_per_second: float = 100, completion_tokens: int = 60,
+                 tool_call_ratio: float = 0.0, audio_seconds: float = 5.0):
+        super().__init__()
+        self.latency_ms = latency_ms
+        self.tokens_per_second = tokens_per_second
+        self.completion_tokens = completion_tokens
+        self.tool_call_ratio = tool_call_ratio
+        self.audio_seconds = audio_seconds
+
+
+class _OllamaHandler(_Handler):
+    def do_GET(self):
+        self.fake.count()
+        if self.path == "/api/tags":
+            return self._send_json({"models": [{"name": name} for name in self.fake.models]})
+        self._send_json({"error": "not found"}, 404)
+
+    def do_POST(self):
+        self.fake.count()
+        request = self._json_body()
+        if self.path == "/api/show":
+            return self._send_json({"model_info": {"llama.context_length": self.fake.context_length}})
+        if self.path == "/api/embeddings":
+            return self._send_json({"embedding": [random.random() for _ in range(64)]})
+        if self.path in ("/api/chat", "/api/generate"):
+            return self._generate(request)
+        self._send_json({"error": "not found"}, 404)
+
+    def _generate(self, request: dict):
+        fake = self.fake
+        # keep_alive pings send no messages or prompt and expect an empty answer
+        if not request.get("messages") and not request.get("prompt"):
+            return self._send_json({"model": request.get("model"), "done": True, "response": ""})
+        prompt_tokens = max(1, len(json.dumps(request.get("messages") or request.get("prompt"))) // 4)
+        started = time.perf_counter_ns()
+        elapsed = _simulate_generation(fake.latency_ms, fake.tokens_per_second, fake.completion_tokens)
+        content = " ".join(["word"] * fake.completion_tokens)
+        eval_duration = int((elapsed - fake.latency_ms / 1000) * 1e9) or 1
+        self._send_json({
+            "model": request.get("model"),
+            "message": {"role": "assistant", "content": content},
+            "response": content,
+            "done": True,
+            "total_duration": time.perf_counter_ns() - started,
+            "load_duration": 0,
+            "prompt_eval_count": prompt_tokens,
+            "prompt_eval_duration": int(fake.latency_ms * 1e6),
+            "eval_count": fake.completion_tokens,
+            "eval_duration": eval_duration
+        })
+
+
+class FakeOllamaServer(FakeServer):
+    """Ollama HTTP API: /api/tags, /api/show, /api/chat, /api/generate and /api/embeddings."""
+    handler_class = _OllamaHandler
+
+    def __init__(self, latency_ms: float = 100, tokens_per_second: float = 40, completion_tokens: int = 60,
+                 models=("llama3:latest",), context_length: int = 8192):
+        super().__init__()
+        self.latency_ms = latency_ms
+        self.tokens_per_second = tokens_per_second
+        self.completion_tokens = completion_tokens
+        self.models = list(models)
+        self.context_length = context_length
+
+
+_EVENTS_PATH = re.compile(r"/calendar/v3/calendars/([^/]+)/events(?:/([^/]+))?$")
+
+
+class _GoogleCalendarHandler(_Handler):
+    def do_GET(self):
+        self.fake.count()
+        url = urlparse(self.path)
+        time.sleep(self.fake.latency_ms / 1000)
+        if url.path == "/calendar/v3/users/me/calendarList":
+            return self._send_json({"kind": "calendar#calendarList", "items": [
+                {"id": calendar_id, "summary": calendar_id, "accessRole": "owner"} for calendar_id in self.fake.calendars
+            ]})
+        match = _EVENTS_PATH.match(url.path)
+        if match and not match.group(2):
+            params = parse_qs(url.query)
+            items = [] if "syncToken" in params else self.fake.events(unquote(match.group(1)))
+            return self._send_json({"kind": "calendar#events", "items": items, "nextSyncToken": uuid.uuid4().hex})
+        self._send_json({"error": {"code": 404, "message": "Not Found"}}, 404)
+
+    def do_POST(self):
+        self.fake.count()
+        match = _EVENTS_PATH.match(urlparse(self.path).path)
+        if not match:
+            return self._send_json({"error": {"code": 404, "message": "Not Found"}}, 404)
+        time.sleep(self.fake.latency_ms / 1000)
+        event = self._json_body()
+        event.update(id=uuid.uuid4().hex, status="confirmed", htmlLink="https://calendar.example/event")
+        self._send_json(event)
+
+    def do_DELETE(self):
+        self.fake.count()
+        time.sleep(self.fake.latency_ms / 1000)
+        self._send_empty(204)
+
+
+class FakeGoogleCalendarServer(FakeServer):
+    """
+    Google Calendar v3 REST API: calendar list, event listing (a full sync
+    returns events_per_calendar events spread over the next two weeks, an
+    incremental sync returns no changes), insert and delete. Point the
+    service at it with BREVIOBOT_GOOGLE_API_ENDPOINT={url}/calendar/v3/.
+    """
+    handler_class = _GoogleCalendarHandler
+
+    def __init__(self, latency_ms: float = 50, events_per_calendar: int = 50, calendars=("primary",)):
+        super().__init__()
+        self.latency_ms = latency_ms
+        self.events_per_calendar = events_per_calendar
+        self.calendars = list(calendars)
+
+    def events(self, calendar_id: str) -> list:
+        start = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        step = timedelta(days=14) / max(1, self.events_per_calendar)
+        return [{
+            "kind": "calendar#event",
+            "id": f"{calendar_id}-{i}",
+            "status": "confirmed",
+            "summary": f"Event {i}",
+            "description": "Benchmark event " * 8,
+            "htmlLink": f"https://calendar.example/{calendar_id}/{i}",
+            "start": {"dateTime": (start + step * i).isoformat()},
+            "end": {"dateTime": (start + step * i + timedelta(minutes=30)).isoformat()},
+            "organizer": {"email": "bench@example.com", "self": True},
+            "attendees": [{"email": f"guest{j}@example.com", "responseStatus": "accepted"} for j in range(3)]
+        } for i in range(self.events_per_calendar)]
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def _reply(self, line: str):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self._reply("220 breviobot-bench ESMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors="replace").strip().upper()
+            if command.startswith("EHLO"):
+                self._reply("250-breviobot-bench")
+                self._reply("250 AUTH PLAIN LOGIN")
+            elif command.startswith("DATA"):
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                for data_line in iter(self.rfile.readline, b""):
+                    if data_line in (b".\r\n", b".\n"):
+                        break
+                    data.append(data_line[1:] if data_line.startswith(b"..") else data_line)
+                self.server.sink.receive(b"".join(data))
+                self._reply("250 OK")
+            elif command.startswith("AUTH"):
+                self._reply("235 Authentication successful")
+            elif command.startswith("QUIT"):
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("250 OK")
+
+
+class SMTPSink:
+    """Accepts every message without TLS or authentication and keeps it in memory."""
+
+    def __init__(self):
+        self._server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _SMTPHandler)
+        self._server.daemon_threads = True
+        self._server.sink = self
+        self.messages = []
+        self._lock = threading.Lock()
+
+    @property
+    def host(self) -> str:
+        return self._server.server_address[0]
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def receive(self, raw: bytes):
+        with self._lock:
+            self.messages.append(email.message_from_bytes(raw))
+
+    def find(self, recipient: str):
+        with self._lock:
+            return next((m for m in reversed(self.messages) if recipient in (m.get("To") or "")), None)
+
+    def start(self) -> "SMTPSink":
+        threading.Thread(target=self._server.serve_forever, name="SMTPSink", daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
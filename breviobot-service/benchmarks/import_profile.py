@@ -0,0 +1,116 @@
+"""
+Cold-start profile: imports server and builds the app in fresh interpreters
+(-X importtime) and reports the median time, peak RSS, the slowest imports
+and which heavy dependencies were loaded. With --ref the same profile is
+taken for another commit, so a change can be shown before and after:
+
+    python -m benchmarks.import_profile --ref HEAD~1
+    BREVIOBOT_BLUEPRINTS=auth,text python -m benchmarks.import_profile
+"""
+import argparse
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+SERVICE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ["openai", "faster_whisper", "ctranslate2", "numpy", "av", "googleapiclient",
+                 "google_auth_oauthlib", "httplib2", "dateutil"]
+
+_PROBE = f"""
+import json, resource, sys, time
+started = time.perf_counter()
+import server
+getattr(server, "create_app", lambda: None)()
+print(json.dumps({{
+    "seconds": time.perf_counter() - started,
+    "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "modules": len(sys.modules),
+    "heavy": [m for m in {HEAVY_MODULES!r} if m in sys.modules]
+}}))
+"""
+
+
+def _parse_importtime(stderr: str) -> dict:
+    # "import time:   self [us] | cumulative | imported package", nesting shown by indentation
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = {"self_ms": int(self_us) / 1000, "cumulative_ms": int(cumulative_us) / 1000,
+                                 "top_level": len(name) - len(name.lstrip()) == 1}
+    return modules
+
+
+def profile(service_root: str, runs: int) -> dict:
+    env = dict(os.environ)
+    env.setdefault("BREVIOBOT_JWT_SECRET_KEY", "import-profile-secret-key-0123456789")
+    env.setdefault("BREVIOBOT_LOG_LEVEL", "WARNING")
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", _PROBE], cwd=service_root, env=env,
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"Import failed in {service_root}:\n{result.stderr[-2000:]}")
+        probe = json.loads(result.stdout.strip().splitlines()[-1])
+        probe["imports"] = _parse_importtime(result.stderr)
+        samples.append(probe)
+    median = sorted(samples, key=lambda s: s["seconds"])[len(samples) // 2]
+    return {
+        "median_ms": round(statistics.median(s["seconds"] for s in samples) * 1000, 1),
+        "min_ms": round(min(s["seconds"] for s in samples) * 1000, 1),
+        "max_rss_mb": round(statistics.median(s["max_rss_kb"] for s in samples) / 1024, 1),
+        "modules": median["modules"],
+        "heavy_loaded": median["heavy"],
+        "slowest_top_level": sorted(
+            ({"module": name, "cumulative_ms": round(stats["cumulative_ms"], 1)}
+             for name, stats in median["imports"].items() if stats["top_level"]),
+            key=lambda item: -item["cumulative_ms"]
+        )[:10],
+        "heavy_imports_ms": {name: round(median["imports"][name]["cumulative_ms"], 1)
+                             for name in HEAVY_MODULES if name in median["imports"]}
+    }
+
+
+def _checkout(ref: str, workdir: str) -> str:
+    # Run from the service directory, git archive exports just that tree
+    archive = subprocess.check_output(["git", "archive", "--format=tar", ref, "."], cwd=SERVICE_ROOT)
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(workdir)
+    return workdir
+
+
+def _print(label: str, report: dict):
+    print(f"{label}: {report['median_ms']}ms median (min {report['min_ms']}ms), {report['max_rss_mb']}MB RSS, "
+          f"{report['modules']} modules")
+    print(f"  heavy dependencies loaded: {', '.join(report['heavy_loaded']) or 'none'}")
+    for item in report["slowest_top_level"][:5]:
+        print(f"  {item['module']:<40} {item['cumulative_ms']:>8.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BrevioBot cold-start import profile")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--ref", help="also profile this git revision for a before/after comparison")
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args()
+
+    report = {"blueprints": os.environ.get("BREVIOBOT_BLUEPRINTS", "all"), "current": profile(SERVICE_ROOT, args.runs)}
+    if args.ref:
+        with tempfile.TemporaryDirectory(prefix="breviobot-import-") as workdir:
+            report["ref"] = args.ref
+            report["before"] = profile(_checkout(args.ref, workdir), args.runs)
+        _print(f"before ({args.ref})", report["before"])
+    _print("current", report["current"])
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,417 @@
+"""
+End-to-end load tests. Boots the service in a separate process against local
+stand-ins (benchmarks.fakes) for OpenAI, Ollama, Google Calendar and SMTP,
+drives each workload at fixed concurrency levels for a fixed duration and
+writes latency percentiles and throughput as JSON, tagged with the commit.
+Run from the service root:
+
+    python -m benchmarks.loadtest run --concurrency 1,4,16 --duration 10 --output bench/HEAD.json
+    python -m benchmarks.loadtest compare bench/main.json bench/HEAD.json --max-regression 0.15
+
+The load generator runs in Python threads; at high concurrency it may become
+the bottleneck itself, so compare runs made on the same machine and settings.
+"""
+import argparse
+import io
+import json
+import math
+import os
+import pickle
+import platform
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import wave
+from collections import Counter
+from datetime import datetime, timedelta
+import requests
+from benchmarks.fakes import FakeGoogleCalendarServer, FakeOllamaServer, FakeOpenAIServer, SMTPSink
+
+SERVICE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASSWORD = "bench-password-1"
+
+SUMMARY_TEXT = (
+    "The quarterly review covered revenue growth in the northern region, delays in the supplier "
+    "onboarding project and the plan to consolidate the two support teams before the end of the year. "
+) * 6
+ASK_QUERIES = [
+    "Which of my meetings next week could be moved to free up an afternoon?",
+    "Do I have anything scheduled with the design team soon?",
+    "How busy is my calendar over the next seven days?"
+]
+
+
+def _percentile(samples: list, fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(math.ceil(fraction * len(ordered))) - 1)]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wav_bytes(seconds: float = 1.0, rate: int = 16000) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(b"\x00\x00" * int(seconds * rate))
+    return buffer.getvalue()
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=SERVICE_ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+class BenchmarkEnvironment:
+    """
+    Starts the stand-ins and the app process, then signs up, verifies and logs
+    in the benchmark users through the API (verification links are read from
+    the SMTP sink) and gives each of them stored Google credentials.
+    """
+
+    def __init__(self, args):
+        self.args = args
+        self.workdir = tempfile.mkdtemp(prefix="breviobot-bench-")
+        self.openai = FakeOpenAIServer(latency_ms=args.openai_latency_ms, tokens_per_second=args.openai_tokens_per_second,
+                                       completion_tokens=args.completion_tokens, tool_call_ratio=args.tool_call_ratio)
+        self.ollama = FakeOllamaServer(latency_ms=args.ollama_latency_ms, tokens_per_second=args.ollama_tokens_per_second,
+                                       completion_tokens=args.completion_tokens)
+        self.google = FakeGoogleCalendarServer(latency_ms=args.google_latency_ms)
+        self.smtp = SMTPSink()
+        self.port = args.port or _free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self.database_url = f"sqlite:///{os.path.join(self.workdir, 'bench.db')}"
+        self.process = None
+        self.users = []
+
+    def app_env(self) -> dict:
+        env = dict(os.environ)
+        env.update({
+            "OPENAI_BASE_URL": f"{self.openai.url}/v1",
+            "BREVIOBOT_OPENAI_API_KEY": "bench",
+            "BREVIOBOT_OLLAMA_URL": self.ollama.url,
+            "BREVIOBOT_GOOGLE_API_ENDPOINT": f"{self.google.url}/calendar/v3/",
+            "GOOGLE_CLIENT_SECRET_PATH": os.path.join(self.workdir, "unused-client-secret.json"),
+            "BREVIOBOT_SMTP_HOST": self.smtp.host,
+            "BREVIOBOT_SMTP_PORT": str(self.smtp.port),
+            "BREVIOBOT_SMTP_STARTTLS": "false",
+            "BREVIOBOT_DATABASE_URL": self.database_url,
+            "BREVIOBOT_AUDIO_TEMP_DIR": os.path.join(self.workdir, "audio"),
+            "BREVIOBOT_JWT_SECRET_KEY": "bench-secret",
+            "BREVIOBOT_ENABLE_AUTH": "true",
+            "BREVIOBOT_WHISPER_USE_API": "true",
+            "BREVIOBOT_RATE_LIMIT_ENABLED": "false",
+            "BREVIOBOT_TRACING_EXPORTER": "none",
+            "BREVIOBOT_LOG_LEVEL": "WARNING",
+            "BREVIOBOT_METRICS_DIR": ""
+        })
+        if not self.args.dedup:
+            # Repeated benchmark texts would otherwise be answered from the dedup index
+            env["BREVIOBOT_SUMMARY_DEDUP_ENABLED"] = "false"
+        return env
+
+    def __enter__(self) -> "BenchmarkEnvironment":
+        for fake in (self.openai, self.ollama, self.google, self.smtp):
+            fake.start()
+        self._log = open(os.path.join(self.workdir, "server.log"), "wb")
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.app_server", "--port", str(self.port)],
+            cwd=SERVICE_ROOT, env=self.app_env(), stdout=self._log, stderr=subprocess.STDOUT
+        )
+        try:
+            self._wait_until_up()
+            self._create_users(self.args.users)
+        except Exception:
+            self.__exit__(*sys.exc_info())
+            raise
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self._log.close()
+        for fake in (self.openai, self.ollama, self.google, self.smtp):
+            fake.stop()
+        if exc_info[0] is None and not self.args.keep_workdir:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+        else:
+            print(f"Benchmark files kept in {self.workdir}", file=sys.stderr)
+
+    def _wait_until_up(self, timeout: float = 60):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"App process exited with code {self.process.returncode}, see {self.workdir}/server.log")
+            try:
+                if requests.get(f"{self.base_url}/ready", timeout=1).status_code == 200:
+                    return
+            except requests.ConnectionError:
+                pass
+            time.sleep(0.2)
+        raise RuntimeError(f"App did not start within {timeout}s, see {self.workdir}/server.log")
+
+    def _create_users(self, count: int):
+        for i in range(count):
+            username = f"bench{i}"
+            address = f"{username}@example.com"
+            response = requests.post(f"{self.base_url}/api/auth/signup", json={
+                "username": username, "email": address, "password": PASSWORD
+            })
+            response.raise_for_status()
+            message = self.smtp.find(address)
+            if message is None:
+                raise RuntimeError(f"No verification email received for {address}")
+            token = re.search(r"token=([\w\-]+)", message.get_payload(decode=True).decode()).group(1)
+            requests.get(f"{self.base_url}/api/auth/verify", params={"token": token}).raise_for_status()
+            response = requests.post(f"{self.base_url}/api/auth/login", json={"username": username, "password": PASSWORD})
+            response.raise_for_status()
+            login = response.json()
+            self.users.append({"username": username, "id": login["user"]["id"], "access_token": login["access_token"]})
+        self._store_google_credentials([user["id"] for user in self.users])
+
+    def _store_google_credentials(self, user_ids: list):
+        # Written straight to the database: the OAuth flow needs a browser
+        from google.oauth2.credentials import Credentials
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import Session
+        from persistence.database import UserGoogleToken
+
+        creds = Credentials(token="bench-token", expiry=datetime.utcnow() + timedelta(days=1))
+        engine = create_engine(self.database_url)
+        with Session(engine) as db:
+            db.add_all(UserGoogleToken(user_id=user_id, token=pickle.dumps(creds)) for user_id in user_ids)
+            db.commit()
+        engine.dispose()
+
+
+def _auth(user: dict) -> dict:
+    return {"Authorization": f"Bearer {user['access_token']}"}
+
+
+def _login(session, env, user, n):
+    return session.post(f"{env.base_url}/api/auth/login", json={"username": user["username"], "password": PASSWORD})
+
+
+def _summarize(session, env, user, n):
+    # A request number up front keeps texts distinct should dedup be enabled
+    return session.post(f"{env.base_url}/api/text/summarize", headers=_auth(user), json={
+        "text": f"Report {n}. {SUMMARY_TEXT}", "language": "en", "model": env.args.summarize_model
+    })
+
+
+def _ask(session, env, user, n):
+    return session.post(f"{env.base_url}/api/text/ask", headers=_auth(user), json={
+        "query": ASK_QUERIES[n % len(ASK_QUERIES)], "model": env.args.ask_model
+    })
+
+
+_AUDIO = _wav_bytes()
+
+
+def _transcribe(session, env, user, n):
+    # Uploads are saved under their file name, so every request needs its own
+    name = f"bench-{threading.get_ident()}-{n}.wav"
+    return session.post(f"{env.base_url}/api/stt/transcribe", headers=_auth(user),
+                        files={"file": (name, _AUDIO, "audio/wav")}, data={"use_api": "true"})
+
+
+WORKLOADS = {
+    "login": _login,
+    "summarize": _summarize,
+    "ask": _ask,
+    "transcribe": _transcribe
+}
+
+
+def run_workload(env: BenchmarkEnvironment, name: str, concurrency: int, duration: float, warmup: float) -> dict:
+    workload = WORKLOADS[name]
+    latencies = []
+    statuses = Counter()
+    lock = threading.Lock()
+    started = time.monotonic()
+    measure_from = started + warmup
+    deadline = measure_from + duration
+    counter = iter(range(10 ** 9))
+
+    def worker(index: int):
+        user = env.users[index % len(env.users)]
+        local_latencies = []
+        local_statuses = Counter()
+        with requests.Session() as session:
+            while True:
+                request_started = time.monotonic()
+                if request_started >= deadline:
+                    break
+                try:
+                    status = str(workload(session, env, user, next(counter)).status_code)
+                except requests.RequestException as e:
+                    status = type(e).__name__
+                finished = time.monotonic()
+                if request_started >= measure_from:
+                    local_latencies.append(finished - request_started)
+                    local_statuses[status] += 1
+        with lock:
+            latencies.extend(local_latencies)
+            statuses.update(local_statuses)
+
+    threads = [threading.Thread(target=worker, args=(i,), name=f"load-{name}-{i}") for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Requests still running at the deadline are counted, so the window covers them
+    elapsed = max(duration, time.monotonic() - measure_from)
+    errors = sum(count for status, count in statuses.items() if not status.startswith("2"))
+    return {
+        "workload": name,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "status_counts": dict(statuses),
+        "rps": round(len(latencies) / elapsed, 2),
+        "latency_ms": {
+            "mean": round(1000 * sum(latencies) / len(latencies), 2) if latencies else 0.0,
+            "p50": round(1000 * _percentile(latencies, 0.5), 2),
+            "p95": round(1000 * _percentile(latencies, 0.95), 2),
+            "p99": round(1000 * _percentile(latencies, 0.99), 2),
+            "max": round(1000 * max(latencies), 2) if latencies else 0.0
+        }
+    }
+
+
+def run(args) -> dict:
+    workloads = [w.strip() for w in args.workloads.split(",") if w.strip()]
+    unknown = set(workloads) - set(WORKLOADS)
+    if unknown:
+        raise SystemExit(f"Unknown workloads: {', '.join(sorted(unknown))}")
+    levels = [int(c) for c in args.concurrency.split(",")]
+    results = []
+    with BenchmarkEnvironment(args) as env:
+        for name in workloads:
+            for concurrency in levels:
+                result = run_workload(env, name, concurrency, args.duration, args.warmup)
+                results.append(result)
+                latency = result["latency_ms"]
+                print(f"{name:<11} c={concurrency:<3} {result['rps']:>8.1f} rps  p50 {latency['p50']:>8.1f}ms  "
+                      f"p95 {latency['p95']:>8.1f}ms  p99 {latency['p99']:>8.1f}ms  errors {result['errors']}",
+                      file=sys.stderr)
+        backend_calls = {"openai": env.openai.requests, "ollama": env.ollama.requests,
+                         "google": env.google.requests, "smtp": len(env.smtp.messages)}
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.utcnow().replace(microsecond=0).isoformat() + "Z",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "duration_seconds": args.duration,
+            "warmup_seconds": args.warmup,
+            "users": args.users,
+            "stand_ins": {
+                "openai_latency_ms": args.openai_latency_ms,
+                "openai_tokens_per_second": args.openai_tokens_per_second,
+                "ollama_latency_ms": args.ollama_latency_ms,
+                "ollama_tokens_per_second": args.ollama_tokens_per_second,
+                "google_latency_ms": args.google_latency_ms,
+                "completion_tokens": args.completion_tokens,
+                "tool_call_ratio": args.tool_call_ratio
+            },
+            "backend_calls": backend_calls
+        },
+        "results": results
+    }
+
+
+def compare(baseline: dict, current: dict, max_regression: float) -> list:
+    """Relative change per workload and concurrency; returns the regressions beyond max_regression."""
+    previous = {(r["workload"], r["concurrency"]): r for r in baseline["results"]}
+    regressions = []
+    print(f"{'workload':<11} {'c':>3}  {'metric':<6} {'baseline':>10} {'current':>10} {'change':>8}")
+    for result in current["results"]:
+        key = (result["workload"], result["concurrency"])
+        before = previous.get(key)
+        if before is None:
+            continue
+        metrics = [(name, before["latency_ms"][name], result["latency_ms"][name], False) for name in ("p50", "p95", "p99")]
+        metrics.append(("rps", before["rps"], result["rps"], True))
+        for name, old, new, higher_is_better in metrics:
+            change = (new - old) / old if old else 0.0
+            regressed = (-change if higher_is_better else change) > max_regression
+            if regressed:
+                regressions.append({"workload": key[0], "concurrency": key[1], "metric": name, "change": round(change, 4)})
+            print(f"{key[0]:<11} {key[1]:>3}  {name:<6} {old:>10.1f} {new:>10.1f} {change:>+7.1%}{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BrevioBot load tests")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the workloads and write the results as JSON")
+    run_parser.add_argument("--workloads", default=",".join(WORKLOADS))
+    run_parser.add_argument("--concurrency", default="1,4,16", help="comma-separated concurrency levels")
+    run_parser.add_argument("--duration", type=float, default=10, help="measured seconds per workload and level")
+    run_parser.add_argument("--warmup", type=float, default=2, help="unmeasured seconds before each measurement")
+    run_parser.add_argument("--users", type=int, default=4)
+    run_parser.add_argument("--port", type=int, default=0)
+    run_parser.add_argument("--summarize-model", default="gpt-4.1-mini")
+    run_parser.add_argument("--ask-model", default="gpt-4.1-mini")
+    run_parser.add_argument("--openai-latency-ms", type=float, default=200)
+    run_parser.add_argument("--openai-tokens-per-second", type=float, default=100)
+    run_parser.add_argument("--ollama-latency-ms", type=float, default=100)
+    run_parser.add_argument("--ollama-tokens-per-second", type=float, default=40)
+    run_parser.add_argument("--google-latency-ms", type=float, default=50)
+    run_parser.add_argument("--completion-tokens", type=int, default=60)
+    run_parser.add_argument("--tool-call-ratio", type=float, default=0.5,
+                            help="fraction of ask requests answered with a calendar tool call first")
+    run_parser.add_argument("--dedup", action="store_true", help="keep summary deduplication enabled")
+    run_parser.add_argument("--keep-workdir", action="store_true", help="keep the database and server log")
+    run_parser.add_argument("--output", help="results file (default: stdout)")
+
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--max-regression", type=float, default=0.15,
+                                help="relative slowdown that fails the comparison")
+
+    args = parser.parse_args()
+    if args.command == "compare":
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+        regressions = compare(baseline, current, args.max_regression)
+        sys.exit(1 if regressions else 0)
+
+    results = run(args)
+    output = json.dumps(results, indent=2)
+    if args.output:
+        directory = os.path.dirname(args.output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""
+Microbenchmarks for helpers on the request hot path. Each benchmark is timed
+in rounds (garbage collection disabled, iterations per round calibrated to
+--min-round-ms) and summarized as min/median/mean/stddev/IQR per call.
+Medians can be saved as a baseline and later runs compared against it;
+a slowdown beyond --max-regression fails the run. Run from the service root:
+
+    python -m benchmarks.micro --save-baseline
+    python -m benchmarks.micro --compare --max-regression 0.2
+
+Baselines are machine-specific. The committed baselines/micro.json records
+the host it was measured on (meta); a comparison on a different host or
+Python version prints a warning, and that host should save its own baseline
+first. In CI, run --compare on the runner class that recorded the baseline
+and re-save it (and commit it) whenever that runner changes.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import timeit
+from datetime import datetime
+
+SERVICE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(SERVICE_ROOT, "benchmarks", "baselines", "micro.json")
+
+BENCHMARKS = {}
+
+
+def benchmark(name: str):
+    """Registers a setup function returning the zero-argument callable to time."""
+    def decorator(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return decorator
+
+
+def _configure_environment(workdir: str):
+    # Settings are read at import time, so this runs before any service module is imported
+    os.environ.update({
+        "BREVIOBOT_DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'micro.db')}",
+        "BREVIOBOT_JWT_SECRET_KEY": "micro-benchmark-secret-key-0123456789",
+        "BREVIOBOT_ENABLE_AUTH": "true",
+        "BREVIOBOT_LOG_LEVEL": "WARNING",
+        "BREVIOBOT_OLLAMA_DISCOVERY_ENABLED": "false"
+    })
+
+
+_context = {}
+
+
+def _app():
+    if "app" not in _context:
+        from persistence.db_session import SessionLocal, init_db
+        from persistence.repositories import UserRepository
+        from core.users import User
+        from server import create_app
+
+        init_db()
+        with SessionLocal() as db:
+            user = User(id=0, username="micro", email="micro@example.com", password="micro-password")
+            _context["user"] = UserRepository(db).create(user, is_verified=True)
+        _context["app"] = create_app()
+    return _context["app"]
+
+
+@benchmark("auth.require_auth")
+def _require_auth():
+    from flask_jwt_extended import create_access_token
+    from auth.authenticators import require_auth
+
+    app = _app()
+    with app.app_context():
+        token = create_access_token(identity=str(_context["user"].id))
+    view = require_auth(lambda: None)
+    ctx = app.test_request_context("/", headers={"Authorization": f"Bearer {token}"})
+    ctx.push()
+    return view
+
+
+@benchmark("auth.create_access_token")
+def _create_access_token():
+    from auth.authenticators import _jwt_auth_service
+
+    app = _app()
+    user = _context["user"]
+    app.app_context().push()
+    return lambda: _jwt_auth_service.generate_token(user)
+
+
+@benchmark("users.to_dict")
+def _user_to_dict():
+    from core.users import User
+    from persistence.database import UserDB
+
+    user_db = UserDB(id=1, username="micro", email="micro@example.com", full_name="Micro Bench",
+                     is_active=True, password="hash", is_verified=True)
+    return lambda: User.model_validate(user_db).to_dict()
+
+
+@benchmark("text.summarize_request")
+def _summarize_request():
+    from text.handlers import SummarizeRequest
+
+    data = {"text": "The quarterly review covered revenue growth and supplier delays. " * 20,
+            "language": "en", "model": "gpt-4.1-mini"}
+    return lambda: SummarizeRequest.from_json(data)
+
+
+@benchmark("stt.transcribe_request")
+def _transcribe_request():
+    import io
+    from werkzeug.datastructures import FileStorage, ImmutableMultiDict
+    from stt.handlers import TranscribeRequest
+
+    files = ImmutableMultiDict({"file": FileStorage(io.BytesIO(b"\x00" * 1024), filename="meeting.wav")})
+    form = ImmutableMultiDict({"use_api": "true"})
+    return lambda: TranscribeRequest.from_request(files, form)
+
+
+@benchmark("calendars.is_date_formula")
+def _is_date_formula():
+    from calendars.utils import is_date_formula
+
+    def run():
+        is_date_formula("+7D")
+        is_date_formula("2025-06-01T00:00:00Z")
+    return run
+
+
+@benchmark("calendars.parse_date_formula")
+def _parse_date_formula():
+    from calendars.utils import parse_date_formula
+
+    return lambda: parse_date_formula("-2W")
+
+
+@benchmark("calendars.events_response")
+def _events_response():
+    from flask import jsonify
+    from calendars.utils import parse_fields, project_fields
+
+    event = {"kind": "calendar#event", "id": "evt", "status": "confirmed", "summary": "Quarterly review",
+             "htmlLink": "https://www.google.com/calendar/event?eid=evt", "etag": "\"3350000000000000\"",
+             "start": {"dateTime": "2025-06-02T09:00:00+02:00", "timeZone": "Europe/Rome"},
+             "end": {"dateTime": "2025-06-02T10:00:00+02:00", "timeZone": "Europe/Rome"},
+             "attendees": [{"email": f"person{i}@example.com", "responseStatus": "accepted"} for i in range(5)]}
+    events = [dict(event, id=f"evt{i}") for i in range(20)]
+    fields = parse_fields("id,summary,start.dateTime,end.dateTime")
+    _app().app_context().push()
+    return lambda: jsonify({"events": [project_fields(e, fields) for e in events]}).get_data()
+
+
+def measure(func, rounds: int, min_round_seconds: float) -> dict:
+    timer = timeit.Timer(func)
+    # Calibration doubles as warmup
+    number = 1
+    while (elapsed := timer.timeit(number)) < min_round_seconds:
+        number = max(number * 2, int(number * min_round_seconds / elapsed)) if elapsed else number * 10
+    samples = [timer.timeit(number) / number for _ in range(rounds)]
+    quartiles = statistics.quantiles(samples, n=4) if len(samples) > 1 else [samples[0]] * 3
+    return {
+        "rounds": rounds,
+        "iterations": number,
+        "min_us": round(min(samples) * 1e6, 3),
+        "median_us": round(statistics.median(samples) * 1e6, 3),
+        "mean_us": round(statistics.fmean(samples) * 1e6, 3),
+        "stddev_us": round(statistics.pstdev(samples) * 1e6, 3),
+        "iqr_us": round((quartiles[2] - quartiles[0]) * 1e6, 3),
+        "ops_per_second": round(1 / statistics.median(samples), 1)
+    }
+
+
+def compare(baseline: dict, results: dict, max_regression: float) -> list:
+    regressions = []
+    print(f"{'benchmark':<32} {'baseline us':>12} {'current us':>12} {'change':>8}")
+    for name, result in results.items():
+        before = baseline.get("benchmarks", {}).get(name)
+        if before is None:
+            print(f"{name:<32} {'-':>12} {result['median_us']:>12.3f}")
+            continue
+        change = (result["median_us"] - before["median_us"]) / before["median_us"]
+        regressed = change > max_regression
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<32} {before['median_us']:>12.3f} {result['median_us']:>12.3f} {change:>+7.1%}"
+              f"{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BrevioBot microbenchmarks")
+    parser.add_argument("-k", "--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--min-round-ms", type=float, default=20)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline file")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--compare", action="store_true", help="fail on regressions against the baseline")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="relative median slowdown that fails the comparison")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="breviobot-micro-")
+    _configure_environment(workdir)
+
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if args.filter not in name:
+            continue
+        results[name] = measure(setup(), args.rounds, args.min_round_ms / 1000)
+        r = results[name]
+        print(f"{name:<32} median {r['median_us']:>10.3f}us  min {r['min_us']:>10.3f}us  "
+              f"iqr {r['iqr_us']:>8.3f}us  ({r['iterations']} x {r['rounds']})", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().replace(microsecond=0).isoformat() + "Z",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.node(),
+            "processor": platform.processor() or platform.machine(),
+            "cpus": os.cpu_count()
+        },
+        "benchmarks": results
+    }
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    exit_code = 0
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            raise SystemExit(f"No baseline at {args.baseline}; run with --save-baseline first")
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        recorded = baseline.get("meta", {})
+        for key in ("python", "platform", "processor", "cpus"):
+            if key in recorded and recorded[key] != report["meta"][key]:
+                print(f"Warning: baseline {key} is {recorded[key]!r}, this run {report['meta'][key]!r}; "
+                      f"differences may not be regressions", file=sys.stderr)
+        if compare(baseline, results, args.max_regression):
+            exit_code = 1
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        if os.path.exists(args.baseline) and args.filter:
+            # A filtered run only replaces the benchmarks it ran
+            with open(args.baseline) as f:
+                report["benchmarks"] = dict(json.load(f).get("benchmarks", {}), **results)
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
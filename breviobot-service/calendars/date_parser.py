@@ -0,0 +1,181 @@
+import re
+import threading
+import unicodedata
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+from core.metrics import register_cache_stats
+
+# Words that carry no date information in calendar queries ("show me my events next week"),
+# including what punctuation stripping leaves of "what's", "today's" and "l'altro"
+_FILLER_WORDS = frozenset("""
+    show me my the a an all any what whats which do does did i have has is are am there was were
+    events event calendar calendars agenda schedule meetings meeting appointments appointment
+    plans plan on for in during of list get give tell please can you could would from with
+    mostrami mostra dammi elenca quali quale che cosa cos ho ha hai c ci sono e il lo la i gli le
+    un una uno miei mie mio mia eventi evento calendario agenda impegni impegno appuntamenti
+    appuntamento riunioni riunione programma per di del della dei delle nel nella in a al alla
+    fammi vedere puoi potresti
+    s l d dell nell dall sull
+""".split())
+
+_WEEKDAYS = {
+    "monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3, "friday": 4, "saturday": 5, "sunday": 6,
+    "lunedi": 0, "martedi": 1, "mercoledi": 2, "giovedi": 3, "venerdi": 4, "sabato": 5, "domenica": 6
+}
+
+_UNITS = {
+    "day": "day", "days": "day", "giorno": "day", "giorni": "day",
+    "week": "week", "weeks": "week", "settimana": "week", "settimane": "week",
+    "month": "month", "months": "month", "mese": "month", "mesi": "month"
+}
+
+_NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "ten": 10, "fourteen": 14,
+    "un": 1, "uno": 1, "una": 1, "due": 2, "tre": 3, "quattro": 4, "cinque": 5, "sei": 6, "sette": 7,
+    "dieci": 10, "quattordici": 14
+}
+
+_NEXT = r"(?:next|coming|prossim[oaie]|seguente)"
+_LAST = r"(?:last|past|previous|scors[oaie]|passat[oaie]|precedent[ei]|ultim[oaie])"
+_THIS = r"(?:this|current|quest[oaie]|corrente)"
+_WEEKDAY = r"(?P<weekday>" + "|".join(_WEEKDAYS) + r")"
+_NUMBER = r"(?P<count>\d+|" + "|".join(_NUMBER_WORDS) + r")"
+_UNIT = r"(?P<unit>" + "|".join(_UNITS) + r")"
+
+# Ordered: longer, more specific phrasings first. Each entry is (compiled regex, kind, offset).
+_PATTERNS = [(re.compile(r"\b" + pattern + r"\b"), kind, offset) for pattern, kind, offset in [
+    (r"day after tomorrow|dopodomani", "day", 2),
+    (r"day before yesterday|l?altro ieri|ieri l?altro", "day", -2),
+    (r"today|tonight|oggi|stasera|stanotte", "day", 0),
+    (r"tomorrow|domani", "day", 1),
+    (r"yesterday|ieri", "day", -1),
+    (rf"{_NEXT} {_NUMBER} {_UNIT}", "next_n", 1),
+    (rf"{_NUMBER} {_UNIT} {_NEXT}", "next_n", 1),
+    (rf"{_LAST} {_NUMBER} {_UNIT}", "last_n", -1),
+    (rf"{_NUMBER} {_UNIT} {_LAST}", "last_n", -1),
+    (rf"(?:{_NEXT} (?:weekend|fine settimana)|(?:weekend|fine settimana) {_NEXT})", "weekend", 1),
+    (rf"(?:{_THIS} )?(?:weekend|fine settimana)", "weekend", 0),
+    (rf"(?:{_NEXT} (?:week|settimana)|(?:week|settimana) {_NEXT})", "week", 1),
+    (rf"(?:{_LAST} (?:week|settimana)|(?:week|settimana) {_LAST})", "week", -1),
+    (r"(?:this|current|questa) (?:week|settimana)|(?:week|settimana) (?:corrente|in corso)", "week", 0),
+    (rf"(?:{_NEXT} (?:month|mese)|(?:month|mese) {_NEXT})", "month", 1),
+    (rf"(?:{_LAST} (?:month|mese)|(?:month|mese) {_LAST})", "month", -1),
+    (r"(?:this|current|questo) (?:month|mese)|(?:month|mese) (?:corrente|in corso)", "month", 0),
+    (rf"{_NEXT} {_WEEKDAY}", "weekday", 1),
+    (rf"{_WEEKDAY} {_NEXT}", "weekday", 1),
+    (rf"(?:{_THIS} )?{_WEEKDAY}", "weekday", 0),
+]]
+
+
+@dataclass
+class DateRangeMatch:
+    start_date: str
+    end_date: str
+    confidence: float
+    phrase: str
+
+
+def _normalize(query: str) -> str:
+    # Lowercase, strip accents ("lunedì" -> "lunedi") and punctuation
+    text = unicodedata.normalize("NFKD", query.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"[^\w\s]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _day_range(start: datetime, days: int = 1) -> tuple:
+    start = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    end = start + timedelta(days=days) - timedelta(seconds=1)
+    return start, end
+
+
+def _resolve(kind: str, offset: int, match, today: datetime) -> tuple:
+    # Imported on first resolution rather than at startup; only month arithmetic needs dateutil
+    from dateutil.relativedelta import relativedelta
+    if kind == "day":
+        return _day_range(today + timedelta(days=offset))
+    if kind in ("next_n", "last_n"):
+        raw_count = match.group("count")
+        count = int(raw_count) if raw_count.isdigit() else _NUMBER_WORDS[raw_count]
+        unit = _UNITS[match.group("unit")]
+        delta = {"day": relativedelta(days=count), "week": relativedelta(weeks=count), "month": relativedelta(months=count)}[unit]
+        # Both directions count today as one of the N days: "last 7 days" ends today, "next 7 days" starts today
+        if kind == "next_n":
+            return _day_range(today, ((today + delta) - today).days)
+        start = today - delta + timedelta(days=1)
+        return _day_range(start, (today - start).days + 1)
+    if kind == "week":
+        monday = today - timedelta(days=today.weekday()) + timedelta(weeks=offset)
+        return _day_range(monday, 7)
+    if kind == "weekend":
+        # On a Sunday "this weekend" is the one in progress, not next Saturday
+        days_to_saturday = -1 if today.weekday() == 6 else 5 - today.weekday()
+        saturday = today + timedelta(days=days_to_saturday) + timedelta(weeks=offset)
+        return _day_range(saturday, 2)
+    if kind == "month":
+        first = today.replace(day=1) + relativedelta(months=offset)
+        return _day_range(first, ((first + relativedelta(months=1)) - first).days)
+    if kind == "weekday":
+        days_ahead = (_WEEKDAYS[match.group("weekday")] - today.weekday()) % 7
+        if offset and days_ahead == 0:
+            days_ahead = 7
+        return _day_range(today + timedelta(days=days_ahead))
+    raise ValueError(f"Unsupported date kind: '{kind}'")
+
+
+def parse_date_range(query: str, now: Optional[datetime] = None) -> Optional[DateRangeMatch]:
+    """
+    Parses common English and Italian date-range phrasings ("events next week",
+    "appuntamenti di domani", "next 3 days") into a UTC range. Confidence is 1.0
+    when everything besides the date phrase is filler, lower when other words
+    remain (e.g. a filter on attendees) that only the LLM can interpret.
+    """
+    if not query:
+        return None
+    text = _normalize(query)
+    today = (now or datetime.utcnow()).replace(hour=0, minute=0, second=0, microsecond=0)
+    for pattern, kind, offset in _PATTERNS:
+        match = pattern.search(text)
+        if not match:
+            continue
+        start, end = _resolve(kind, offset, match, today)
+        residual = (text[:match.start()] + " " + text[match.end():]).split()
+        unknown = [word for word in residual if word not in _FILLER_WORDS]
+        confidence = 1.0 if not unknown else round(max(0.1, 0.8 - 0.2 * len(unknown)), 2)
+        return DateRangeMatch(
+            start_date=start.isoformat(timespec="seconds") + "Z",
+            end_date=end.isoformat(timespec="seconds") + "Z",
+            confidence=confidence,
+            phrase=match.group(0)
+        )
+    return None
+
+
+class LocalParserStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "local_hits": self.hits,
+                "llm_fallbacks": self.misses,
+                "local_hit_rate": round(self.hits / total, 4) if total else 0.0
+            }
+
+
+parser_stats = LocalParserStats()
+
+# A local parse avoids an LLM round-trip, so it is reported like a cache hit
+register_cache_stats("local_date_parser", lambda: (parser_stats.hits, parser_stats.misses))
@@ -0,0 +1,194 @@
+import bisect
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from core.logger import logger
+from core.settings import settings
+
+
+def _to_timestamp(value: str) -> float:
+    # Accepts RFC 3339 date-times ("2025-06-01T10:00:00Z") and all-day dates ("2025-06-01")
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _to_rfc3339(timestamp: float) -> str:
+    return datetime.fromtimestamp(int(timestamp), timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+def event_bounds(event: dict) -> tuple:
+    start = event.get('start', {})
+    end = event.get('end', {})
+    start_value = start.get('dateTime') or start.get('date')
+    end_value = end.get('dateTime') or end.get('date') or start_value
+    start_ts = _to_timestamp(start_value)
+    return start_ts, max(start_ts, _to_timestamp(end_value))
+
+
+class CalendarEventStore:
+    """
+    Local copy of one calendar kept current with Google's incremental sync.
+    Range queries use a start-sorted index: events overlapping [t_min, t_max) must
+    start in [t_min - longest_duration, t_max), so a bisect narrows the scan.
+    """
+
+    def __init__(self):
+        self.events = {}
+        self.sync_token = None
+        self.last_sync = 0.0
+        self.stale = True
+        # (start, end) timestamps the last full sync covered; incremental syncs keep it current
+        self.window = None
+        self.lock = threading.Lock()
+        self._index = None
+        self._max_duration = 0.0
+
+    def reset(self):
+        self.events = {}
+        self.sync_token = None
+        self._index = None
+
+    def apply(self, items):
+        for event in items:
+            if event.get('status') == 'cancelled':
+                self.events.pop(event.get('id'), None)
+                continue
+            try:
+                bounds = event_bounds(event)
+            except (TypeError, ValueError):
+                logger.warning(f"[Calendar] Skipping event with unparseable dates: {event.get('id')}")
+                continue
+            self.events[event['id']] = (bounds, event)
+        self._index = None
+
+    def remove(self, event_id):
+        if self.events.pop(event_id, None) is not None:
+            self._index = None
+
+    def _build_index(self):
+        entries = sorted((bounds[0], bounds[1], event_id) for event_id, (bounds, _) in self.events.items())
+        self._index = ([entry[0] for entry in entries], entries)
+        self._max_duration = max((end - start for start, end, _ in entries), default=0.0)
+
+    def query(self, time_min: str, time_max: str, max_results: int) -> list:
+        if self._index is None:
+            self._build_index()
+        starts, entries = self._index
+        t_min = _to_timestamp(time_min)
+        t_max = _to_timestamp(time_max)
+        lo = bisect.bisect_left(starts, t_min - self._max_duration)
+        hi = bisect.bisect_left(starts, t_max)
+        result = []
+        for start, end, event_id in entries[lo:hi]:
+            # Same semantics as the API: ends after timeMin and starts before timeMax
+            if end > t_min or (start == end and start >= t_min):
+                result.append(self.events[event_id][1])
+                if len(result) >= max_results:
+                    break
+        return result
+
+
+class EventCache:
+    """
+    Per-user, per-calendar event stores served locally between syncs. A read syncs
+    the store at most once per sync interval (or right after a local write) using
+    the stored syncToken, so most reads cost no Google API call at all.
+    The first sync only covers a window around now (recurring events are expanded
+    into instances, so an unbounded sync would pull the calendar's whole history
+    and every future occurrence); a query reaching outside the window widens it
+    with a full resync. Stores are per process: a write is visible at once in the
+    worker that made it, other workers see it after their next sync, i.e. up to
+    sync_interval_seconds later.
+    """
+
+    def __init__(self, sync_interval_seconds: int, max_calendars: int, past_days: int, future_days: int):
+        self.sync_interval_seconds = sync_interval_seconds
+        self.max_calendars = max_calendars
+        self.past_seconds = past_days * 86400
+        self.future_seconds = future_days * 86400
+        self._stores = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_store(self, user_id, calendar_id) -> CalendarEventStore:
+        key = (user_id, calendar_id)
+        with self._lock:
+            store = self._stores.get(key)
+            if store is None:
+                store = CalendarEventStore()
+                self._stores[key] = store
+            self._stores.move_to_end(key)
+            while len(self._stores) > self.max_calendars:
+                self._stores.popitem(last=False)
+        return store
+
+    def _sync(self, service, calendar_id, store: CalendarEventStore):
+        params = {'calendarId': calendar_id, 'singleEvents': True, 'maxResults': 2500}
+        if store.sync_token:
+            params['syncToken'] = store.sync_token
+        else:
+            # syncToken cannot be combined with a time range, so the window is only set on full syncs
+            store.reset()
+            params['timeMin'], params['timeMax'] = _to_rfc3339(store.window[0]), _to_rfc3339(store.window[1])
+        items = []
+        try:
+            while True:
+                response = service.events().list(**params).execute()
+                items.extend(response.get('items', []))
+                if 'nextPageToken' not in response:
+                    break
+                params['pageToken'] = response['nextPageToken']
+        except Exception as e:
+            # googleapiclient's HttpError, matched by shape so the client library is only loaded by the service
+            if getattr(getattr(e, 'resp', None), 'status', None) == 410 and store.sync_token:
+                # Sync token expired: Google requires a full resync
+                logger.info(f"[Calendar] Sync token expired for calendar_id={calendar_id}, running full sync")
+                store.sync_token = None
+                return self._sync(service, calendar_id, store)
+            raise
+        store.apply(items)
+        store.sync_token = response.get('nextSyncToken')
+        store.last_sync = time.monotonic()
+        store.stale = False
+        logger.debug("[Calendar] Synced calendar_id=%s: %d changes, %d events cached", calendar_id, len(items), len(store.events))
+
+    def get_events(self, user_id, service, calendar_id, time_min, time_max, max_results) -> list:
+        store = self._get_store(user_id, calendar_id)
+        t_min, t_max = _to_timestamp(time_min), _to_timestamp(time_max)
+        with store.lock:
+            if store.window is None or t_min < store.window[0] or t_max > store.window[1]:
+                now = time.time()
+                start, end = store.window or (now - self.past_seconds, now + self.future_seconds)
+                store.window = (min(start, t_min), max(end, t_max))
+                store.sync_token = None
+                store.stale = True
+            if store.stale or time.monotonic() - store.last_sync >= self.sync_interval_seconds:
+                self._sync(service, calendar_id, store)
+            return store.query(time_min, time_max, max_results)
+
+    def on_event_created(self, user_id, calendar_id, event: dict):
+        store = self._get_store(user_id, calendar_id)
+        with store.lock:
+            store.apply([event])
+            store.stale = True
+
+    def on_event_deleted(self, user_id, calendar_id, event_id):
+        store = self._get_store(user_id, calendar_id)
+        with store.lock:
+            store.remove(event_id)
+            store.stale = True
+
+    def invalidate(self, user_id, calendar_id=None):
+        with self._lock:
+            for key in [k for k in self._stores if k[0] == user_id and calendar_id in (None, k[1])]:
+                del self._stores[key]
+
+
+event_cache = EventCache(
+    sync_interval_seconds=settings.calendar.event_sync_interval_seconds,
+    max_calendars=settings.calendar.event_cache_max_calendars,
+    past_days=settings.calendar.event_sync_past_days,
+    future_days=settings.calendar.event_sync_future_days
+)
@@ -1,8 +1,6 @@
 import os
 import json
 from core.settings import settings
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
 import pickle
 from persistence.db_session import SessionLocal
 from persistence.repositories import UserGoogleTokenRepository
@@ -19,8 +17,10 @@ def get_credentials_from_file(user_id, creds_path):
             creds = pickle.loads(token_blob)
         if not creds or not creds.valid:
             if creds and creds.expired and creds.refresh_token:
+                from google.auth.transport.requests import Request
                 creds.refresh(Request())
             else:
+                from google_auth_oauthlib.flow import InstalledAppFlow
                 flow = InstalledAppFlow.from_client_secrets_file(creds_path, SCOPES)
                 creds = flow.run_local_server(port=8000)
             repo.set_token(user_id, pickle.dumps(creds))
@@ -37,4 +37,12 @@ def get_credentials_from_json(user_id, creds_json_string):
     finally:
         if os.path.exists(creds_path):
             os.remove(creds_path)
-    return creds
\ No newline at end of file
+    return creds
+
+
+def refresh_credentials(user_id, creds):
+    from google.auth.transport.requests import Request
+    creds.refresh(Request())
+    with SessionLocal() as db:
+        UserGoogleTokenRepository(db).set_token(user_id, pickle.dumps(creds))
+    return creds
@@ -1,47 +1,128 @@
-from googleapiclient.discovery import build
 from .google_auth import get_credentials_from_file, get_credentials_from_json
+from .service_cache import calendar_service_cache
+from .event_store import event_cache, event_bounds
+from core.logger import logger
 from core.settings import settings
+from core.tracing import span
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
+from itertools import islice
+import heapq
 
 
 def get_calendar_service(user_id, creds_path=None, creds_json_string=None):
     if creds_path is None and creds_json_string is None:
         creds_path = getattr(settings.google_client_secret, 'credentials_json', None)
     if creds_path:
-        creds = get_credentials_from_file(user_id, creds_path)
+        load_credentials = partial(get_credentials_from_file, user_id, creds_path)
     elif creds_json_string:
-        creds = get_credentials_from_json(user_id, creds_json_string)
+        load_credentials = partial(get_credentials_from_json, user_id, creds_json_string)
     else:
         raise ValueError("You must provide either creds_path or creds_json_string, or set settings.google_client_secret.credentials_json.")
-    service = build('calendar', 'v3', credentials=creds)
-    return service
+    with span("google.service"):
+        return calendar_service_cache.get_service(user_id, load_credentials)
+
+
+def _list_all(list_method, params, max_results=None):
+    # Follows nextPageToken until exhausted or max_results items are collected
+    items = []
+    params = dict(params)
+    while True:
+        if max_results:
+            params['maxResults'] = max_results - len(items)
+        response = list_method(**params).execute()
+        items.extend(response.get('items', []))
+        page_token = response.get('nextPageToken')
+        if not page_token or (max_results and len(items) >= max_results):
+            return items[:max_results] if max_results else items
+        params['pageToken'] = page_token
+
+
+def _fetch_calendar_events(service, user_id, calendar_id, max_results, time_min, time_max):
+    now = datetime.utcnow().replace(microsecond=0).isoformat() + 'Z'
+    time_min = time_min or now
+    time_max = time_max or now
+    with span("google.events", calendar_id=calendar_id, cached=settings.calendar.event_cache_enabled):
+        if settings.calendar.event_cache_enabled:
+            return event_cache.get_events(user_id, service, calendar_id, time_min, time_max, max_results)
+        params = {
+            'calendarId': calendar_id,
+            'singleEvents': True,
+            'orderBy': 'startTime',
+            'timeMin': time_min,
+            'timeMax': time_max
+        }
+        return _list_all(service.events().list, params, max_results)
+
+
+def _event_start(event):
+    try:
+        return event_bounds(event)[0]
+    except (TypeError, ValueError):
+        return float('inf')
 
 
 def fetch_events(user_id, calendar_id='primary', max_results=100, creds_path=None, creds_json_string=None, time_min=None, time_max=None):
     service = get_calendar_service(user_id, creds_path, creds_json_string)
-    params = {
-        'calendarId': calendar_id,
-        'maxResults': max_results,
-        'singleEvents': True,
-        'orderBy': 'startTime'
-    }
-    params['timeMin'] = time_min if time_min else datetime.utcnow().replace(microsecond=0).isoformat() + 'Z'
-    params['timeMax'] = time_max if time_max else datetime.utcnow().replace(microsecond=0).isoformat() + 'Z'
-    if time_min:
-        params['timeMin'] = time_min
-    if time_max:
-        params['timeMax'] = time_max
-    events_result = service.events().list(**params).execute()
-    return events_result.get('items', [])
+    return _fetch_calendar_events(service, user_id, calendar_id, max_results, time_min, time_max)
+
+
+def _error_status(error):
+    # googleapiclient's HttpError carries the response; other failures have no status
+    return getattr(getattr(error, 'resp', None), 'status', None)
+
+
+def query_calendars(service, user_id, calendar_ids, max_results=100, time_min=None, time_max=None):
+    """
+    Fetches events from several calendars concurrently and merges them into a single
+    stream ordered by start time. Each event is tagged with the calendarId it came from.
+    Returns (events, errors): a calendar that fails (e.g. 403 or 404) is reported in
+    errors and the others are still returned; the error is raised only if all fail.
+    """
+    if not calendar_ids:
+        return [], []
+    workers = max(1, min(len(calendar_ids), settings.calendar.multi_calendar_max_workers))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            (calendar_id, pool.submit(contextvars.copy_context().run, _fetch_calendar_events, service, user_id, calendar_id, max_results, time_min, time_max))
+            for calendar_id in calendar_ids
+        ]
+        per_calendar, errors, first_error = [], [], None
+        for calendar_id, future in futures:
+            try:
+                events = future.result()
+            except Exception as e:
+                logger.warning(f"[Calendar] Fetching events of calendar_id={calendar_id} failed: {e}")
+                first_error = first_error or e
+                errors.append({'calendarId': calendar_id, 'status': _error_status(e), 'error': str(e)})
+                continue
+            per_calendar.append([dict(event, calendarId=calendar_id) for event in events])
+    if not per_calendar:
+        raise first_error
+    return list(islice(heapq.merge(*per_calendar, key=_event_start), max_results)), errors
+
+
+def fetch_events_multi(user_id, calendar_ids, max_results=100, creds_path=None, creds_json_string=None, time_min=None, time_max=None):
+    service = get_calendar_service(user_id, creds_path, creds_json_string)
+    return query_calendars(service, user_id, calendar_ids, max_results, time_min, time_max)
+
+
+def list_calendars(user_id, creds_path=None, creds_json_string=None):
+    service = get_calendar_service(user_id, creds_path, creds_json_string)
+    return _list_all(service.calendarList().list, {})
 
 
 def create_event(user_id, event, calendar_id='primary', creds_path=None, creds_json_string=None):
     service = get_calendar_service(user_id, creds_path, creds_json_string)
     created_event = service.events().insert(calendarId=calendar_id, body=event).execute()
+    event_cache.on_event_created(user_id, calendar_id, created_event)
     return created_event
 
 
 def delete_event(user_id, event_id, calendar_id='primary', creds_path=None, creds_json_string=None):
     service = get_calendar_service(user_id, creds_path, creds_json_string)
     service.events().delete(calendarId=calendar_id, eventId=event_id).execute()
+    event_cache.on_event_deleted(user_id, calendar_id, event_id)
     return True
\ No newline at end of file
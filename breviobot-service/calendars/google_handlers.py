@@ -1,9 +1,10 @@
 from flask import jsonify, g
 from core.settings import settings
-from calendars.google_client import fetch_events, create_event, delete_event
-from calendars.utils import parse_date_formula, is_date_formula
+from calendars.google_client import fetch_events, fetch_events_multi, create_event, delete_event, list_calendars
+from calendars.utils import parse_date_formula, is_date_formula, parse_fields, project_fields
+from core.exceptions import ValidationError
 from core.logger import logger
-from toolcalls.registry import register_tool
+from toolcalls.registry import register_tool, invalidate_tool_cache
 
 def fetch_events_for_user(user_id, start_date, end_date, calendar_id='primary', max_results=20):
     creds_path = settings.google_client_secret.credentials_json
@@ -18,32 +19,71 @@ def fetch_events_for_user(user_id, start_date, end_date, calendar_id='primary',
     return events
 
 
+def fetch_events_for_user_multi(user_id, start_date, end_date, calendar_ids, max_results=20):
+    creds_path = settings.google_client_secret.credentials_json
+    if calendar_ids == ['all']:
+        calendar_ids = [c['id'] for c in list_calendars(user_id, creds_path=creds_path)]
+    return fetch_events_multi(
+        user_id,
+        calendar_ids,
+        max_results=max_results,
+        creds_path=creds_path,
+        time_min=start_date,
+        time_max=end_date
+    )
+
+
+def _requested_fields(req):
+    # Optional projection, e.g. ?fields=id,summary,start.dateTime,end.dateTime
+    try:
+        return parse_fields(req.args.get('fields', ''))
+    except ValueError as e:
+        raise ValidationError(str(e))
+
+
 def handle_fetch_events(req):
     user_id = g.current_user['user_id']
     calendar_id = req.args.get('calendar_id', 'primary')
+    # Comma-separated list of calendar ids, or "all" for every calendar of the user
+    calendar_ids = [c.strip() for c in req.args.get('calendar_ids', '').split(',') if c.strip()]
     max_results = int(req.args.get('max_results', 10))
     time_min = req.args.get('time_min')
     time_max = req.args.get('time_max')
+    fields = _requested_fields(req)
 
-    logger.info(f"[Calendar] Fetch events for user_id={user_id}, calendar_id={calendar_id}, max_results={max_results}, time_min={time_min}, time_max={time_max}")
+    logger.info("[Calendar] Fetch events for user_id=%s, calendar_id=%s, calendar_ids=%s, max_results=%s, time_min=%s, time_max=%s", user_id, calendar_id, calendar_ids, max_results, time_min, time_max)
 
     if is_date_formula(time_min):
-        logger.info(f"[Calendar] Parsing time_min formula: {time_min}")
+        logger.info("[Calendar] Parsing time_min formula: %s", time_min)
         time_min = parse_date_formula(time_min)
     if is_date_formula(time_max):
-        logger.info(f"[Calendar] Parsing time_max formula: {time_max}")
+        logger.info("[Calendar] Parsing time_max formula: %s", time_max)
         time_max = parse_date_formula(time_max)
 
+    errors = None
     try:
-        events = fetch_events_for_user(
-            user_id,
-            start_date=time_min,
-            end_date=time_max,
-            calendar_id=calendar_id,
-            max_results=max_results
-        )
-        logger.info(f"[Calendar] Fetched {len(events)} events for user_id={user_id}")
-        return jsonify({'events': events})
+        if calendar_ids:
+            events, errors = fetch_events_for_user_multi(
+                user_id,
+                start_date=time_min,
+                end_date=time_max,
+                calendar_ids=calendar_ids,
+                max_results=max_results
+            )
+        else:
+            events = fetch_events_for_user(
+                user_id,
+                start_date=time_min,
+                end_date=time_max,
+                calendar_id=calendar_id,
+                max_results=max_results
+            )
+        logger.info("[Calendar] Fetched %d events for user_id=%s", len(events), user_id)
+        response = {'events': [project_fields(e, fields) for e in events]}
+        if errors:
+            # Calendars that could not be read; the events of the others are still returned
+            response['errors'] = errors
+        return jsonify(response)
     except Exception as e:
         logger.error(f"[Calendar] Error fetching events for user_id={user_id}: {e}", exc_info=True)
         raise
@@ -53,12 +93,14 @@ def handle_create_event(req):
     user_id = g.current_user['user_id']
     calendar_id = req.args.get('calendar_id', 'primary')
     event_data = req.get_json()
+    fields = _requested_fields(req)
     creds_path = settings.google_client_secret.credentials_json
-    logger.info(f"[Calendar] Creating event for user_id={user_id}, calendar_id={calendar_id}")
+    logger.info("[Calendar] Creating event for user_id=%s, calendar_id=%s", user_id, calendar_id)
     try:
         event = create_event(user_id, event_data, calendar_id=calendar_id, creds_path=creds_path)
-        logger.info(f"[Calendar] Event created for user_id={user_id}, event_id={event.get('id')}")
-        return jsonify({'event': event})
+        invalidate_tool_cache(f"calendar:{user_id}")
+        logger.info("[Calendar] Event created for user_id=%s, event_id=%s", user_id, event.get('id'))
+        return jsonify({'event': project_fields(event, fields)})
     except Exception as e:
         logger.error(f"[Calendar] Error creating event for user_id={user_id}: {e}", exc_info=True)
         raise
@@ -68,10 +110,11 @@ def handle_delete_event(event_id, req):
     user_id = g.current_user['user_id']
     calendar_id = req.args.get('calendar_id', 'primary')
     creds_path = settings.google_client_secret.credentials_json
-    logger.info(f"[Calendar] Deleting event_id={event_id} for user_id={user_id}, calendar_id={calendar_id}")
+    logger.info("[Calendar] Deleting event_id=%s for user_id=%s, calendar_id=%s", event_id, user_id, calendar_id)
     try:
         delete_event(user_id, event_id, calendar_id=calendar_id, creds_path=creds_path)
-        logger.info(f"[Calendar] Event deleted: event_id={event_id} for user_id={user_id}")
+        invalidate_tool_cache(f"calendar:{user_id}")
+        logger.info("[Calendar] Event deleted: event_id=%s for user_id=%s", event_id, user_id)
         return jsonify({'deleted': True})
     except Exception as e:
         logger.error(f"[Calendar] Error deleting event_id={event_id} for user_id={user_id}: {e}", exc_info=True)
@@ -80,23 +123,30 @@ def handle_delete_event(event_id, req):
 
 def handle_list_calendars(req):
     user_id = g.current_user['user_id']
+    fields = _requested_fields(req)
     creds_path = settings.google_client_secret.credentials_json
-    logger.info(f"[Calendar] Listing calendars for user_id={user_id}")
+    logger.info("[Calendar] Listing calendars for user_id=%s", user_id)
     try:
-        from calendars.google_auth import get_credentials_from_file
-        from googleapiclient.discovery import build
-        creds = get_credentials_from_file(user_id, creds_path)
-        service = build('calendar', 'v3', credentials=creds)
-        calendars_result = service.calendarList().list().execute()
-        calendars = calendars_result.get('items', [])
-        logger.info(f"[Calendar] Found {len(calendars)} calendars for user_id={user_id}")
-        return jsonify({'calendars': calendars})
+        calendars = list_calendars(user_id, creds_path=creds_path)
+        logger.info("[Calendar] Found %d calendars for user_id=%s", len(calendars), user_id)
+        return jsonify({'calendars': [project_fields(c, fields) for c in calendars]})
     except Exception as e:
         logger.error(f"[Calendar] Error listing calendars for user_id={user_id}: {e}", exc_info=True)
         raise
 
 
-@register_tool("get_google_calendar_events")
+@register_tool(
+    "get_google_calendar_events",
+    description="Return all Google Calendar events between the specified start and end dates.",
+    param_descriptions={
+        "start_date": "Start date and time (ISO 8601, e.g., 2025-06-01T00:00:00Z)",
+        "end_date": "End date and time (ISO 8601, e.g., 2025-06-07T23:59:59Z)",
+        "calendar_id": "Calendar identifier; 'primary' is the user's main calendar",
+        "max_results": "Maximum number of events to return"
+    },
+    cache_ttl=60,
+    cache_tags=["calendar:{user_id}"]
+)
 def get_google_calendar_events(start_date: str, end_date: str, calendar_id: str = 'primary', max_results: int = 20):
     """
     Tool-callable function to fetch Google Calendar events for the current user between start_date and end_date.
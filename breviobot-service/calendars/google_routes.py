@@ -9,12 +9,13 @@ calendar_bp = Blueprint("calendar_api", __name__)
 calendar_limiter = Limiter(
     app=None,
     key_func=get_remote_address,
-    default_limits=[f"{settings.api.rate_limit} per minute"]
+    default_limits=[f"{settings.api.rate_limit} per minute"],
+    storage_uri=settings.api.rate_limit_storage_uri
 )
 
 @calendar_bp.route("/api/google/calendar/events", methods=["GET"])
 @require_auth
-@calendar_limiter.limit("5 per minute")
+@calendar_limiter.limit("60 per minute")
 def fetch_events():
     return handle_fetch_events(request)
 
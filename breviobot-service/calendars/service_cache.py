@@ -0,0 +1,145 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from core.logger import logger
+from core.settings import settings
+from calendars.google_auth import refresh_credentials
+
+_discovery_doc = None
+
+
+def _get_discovery_doc() -> str:
+    # The bundled discovery document is ~130KB of JSON; read it from disk only once
+    global _discovery_doc
+    if _discovery_doc is None:
+        from googleapiclient.discovery_cache import get_static_doc
+        _discovery_doc = get_static_doc('calendar', 'v3')
+    return _discovery_doc
+
+
+def preload_client():
+    """Imports the client libraries and reads the discovery document ahead of the first request."""
+    import google_auth_httplib2
+    import googleapiclient.discovery
+    _get_discovery_doc()
+
+
+def build_calendar_service(creds):
+    # The Google client libraries are imported on first use so nodes without calendar traffic never load them
+    import httplib2
+    import google_auth_httplib2
+    from googleapiclient.discovery import build_from_document
+    from googleapiclient.http import HttpRequest
+
+    # httplib2 is not thread-safe, so every request gets its own Http instance
+    def build_request(http, *args, **kwargs):
+        new_http = google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http())
+        return HttpRequest(new_http, *args, **kwargs)
+
+    return build_from_document(
+        _get_discovery_doc(),
+        http=google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http()),
+        requestBuilder=build_request,
+        client_options={"api_endpoint": settings.calendar.api_endpoint} if settings.calendar.api_endpoint else None
+    )
+
+
+@dataclass
+class _CacheEntry:
+    credentials: object
+    service: object
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class CalendarServiceCache:
+    """
+    Per-user cache of Google credentials and built Calendar service objects.
+    Credentials are loaded (and refreshed if needed) on the first request only;
+    a background thread refreshes them before they expire and evicts idle users.
+    """
+
+    def __init__(self, refresh_margin_seconds: int, idle_seconds: int, max_entries: int):
+        self.refresh_margin = timedelta(seconds=refresh_margin_seconds)
+        self.idle_seconds = idle_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._user_locks = {}
+        self._stop_event = threading.Event()
+        self._refresh_thread = None
+
+    def _get_user_lock(self, user_id) -> threading.Lock:
+        with self._lock:
+            return self._user_locks.setdefault(user_id, threading.Lock())
+
+    def get_service(self, user_id, load_credentials):
+        entry = self._entries.get(user_id)
+        if entry is not None and entry.credentials.valid:
+            entry.last_used = time.monotonic()
+            return entry.service
+        # Serialize loads per user so concurrent requests do not refresh the same token twice
+        with self._get_user_lock(user_id):
+            entry = self._entries.get(user_id)
+            if entry is not None and entry.credentials.valid:
+                entry.last_used = time.monotonic()
+                return entry.service
+            creds = load_credentials()
+            entry = _CacheEntry(credentials=creds, service=build_calendar_service(creds))
+            with self._lock:
+                self._entries[user_id] = entry
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_entries:
+                    evicted_id, _ = self._entries.popitem(last=False)
+                    self._user_locks.pop(evicted_id, None)
+        self._ensure_refresh_thread()
+        return entry.service
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def _ensure_refresh_thread(self):
+        if self._refresh_thread is not None:
+            return
+        with self._lock:
+            if self._refresh_thread is not None:
+                return
+            self._refresh_thread = threading.Thread(target=self._refresh_loop, name="google-credential-refresh", daemon=True)
+            self._refresh_thread.start()
+
+    def _refresh_loop(self):
+        interval = max(1, min(60, int(self.refresh_margin.total_seconds() / 2)))
+        while not self._stop_event.wait(interval):
+            self.refresh_expiring()
+
+    def refresh_expiring(self):
+        now = time.monotonic()
+        deadline = datetime.utcnow() + self.refresh_margin
+        with self._lock:
+            for user_id in [uid for uid, e in self._entries.items() if now - e.last_used > self.idle_seconds]:
+                del self._entries[user_id]
+                self._user_locks.pop(user_id, None)
+            candidates = [
+                (user_id, entry) for user_id, entry in self._entries.items()
+                if entry.credentials.expiry and entry.credentials.expiry <= deadline and entry.credentials.refresh_token
+            ]
+        for user_id, entry in candidates:
+            try:
+                with self._get_user_lock(user_id):
+                    refresh_credentials(user_id, entry.credentials)
+                logger.debug("[Calendar] Proactively refreshed Google credentials for user_id=%s", user_id)
+            except Exception as e:
+                logger.warning(f"[Calendar] Proactive credential refresh failed for user_id={user_id}: {e}")
+                self.invalidate(user_id)
+
+    def shutdown(self):
+        self._stop_event.set()
+
+
+calendar_service_cache = CalendarServiceCache(
+    refresh_margin_seconds=settings.calendar.credential_refresh_margin_seconds,
+    idle_seconds=settings.calendar.service_cache_idle_seconds,
+    max_entries=settings.calendar.service_cache_max_entries
+)
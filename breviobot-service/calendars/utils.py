@@ -1,34 +1,34 @@
 from datetime import datetime, timedelta
-from dateutil.relativedelta import relativedelta
 import re
 
+# Relative offsets such as "+3D", "-1W" or "2M"; the sign defaults to '+'
+_DATE_FORMULA = re.compile(r'([+-]?)(\d+)([DWMY])', re.IGNORECASE)
+_FIELD_PATH = re.compile(r'[A-Za-z0-9_]+(\.[A-Za-z0-9_]+)*')
+
 def parse_date_formula(formula: str) -> str:
     if not formula:
         raise ValueError("Formula is empty")
     formula = formula.strip()
-    # If no sign, prepend '+' to the formula assuming positive by default
-    if not formula.startswith(('+', '-')):
-        formula = '+' + formula
-    match = re.fullmatch(r'([+-])(\d+)([DWMY])', formula.upper())
+    match = _DATE_FORMULA.fullmatch(formula)
     if not match:
         raise ValueError(f"Invalid formula: '{formula}'")
     
     sign, value_str, unit = match.groups()
     value = int(value_str)
+    unit = unit.upper()
     
     if unit == 'D':
         delta = timedelta(days=value)
     elif unit == 'W':
         delta = timedelta(weeks=value)
-    elif unit == 'M':
-        delta = relativedelta(months=value)
-    elif unit == 'Y':
-        delta = relativedelta(years=value)
+    elif unit in ('M', 'Y'):
+        from dateutil.relativedelta import relativedelta
+        delta = relativedelta(months=value) if unit == 'M' else relativedelta(years=value)
     else:
         raise ValueError(f"Unsupported unit: '{unit}'")
 
     now = datetime.utcnow()
-    result = now + delta if sign == '+' else now - delta
+    result = now - delta if sign == '-' else now + delta
     
     return result.isoformat(timespec="seconds") + 'Z'
 
@@ -36,7 +36,44 @@ def parse_date_formula(formula: str) -> str:
 def is_date_formula(formula: str) -> bool:
     if not formula:
         return False
-    formula = formula.strip()
-    if not formula.startswith(('+', '-')):
-        formula = '+' + formula
-    return bool(re.fullmatch(r'([+-])(\d+)([DWMY])', formula.upper()))
\ No newline at end of file
+    return _DATE_FORMULA.fullmatch(formula.strip()) is not None
+
+
+def parse_fields(raw: str):
+    """
+    "id,start.dateTime,attendees.email" -> {"id": None, "start": {"dateTime": None},
+    "attendees": {"email": None}}, or None when no projection was requested.
+    None marks a field returned whole, so "start,start.dateTime" keeps all of start.
+    """
+    if not raw:
+        return None
+    tree = {}
+    for field in raw.split(','):
+        field = field.strip()
+        if not field:
+            continue
+        if not _FIELD_PATH.fullmatch(field):
+            raise ValueError(f"Invalid field: '{field}'")
+        *parents, leaf = field.split('.')
+        node = tree
+        for key in parents:
+            if key in node and node[key] is None:
+                break
+            node = node.setdefault(key, {})
+        else:
+            node[leaf] = None
+    return tree
+
+
+def project_fields(item, fields):
+    """Copy of item with only the selected fields; lists are projected element by element."""
+    if fields is None:
+        return item
+    if isinstance(item, list):
+        return [project_fields(element, fields) for element in item]
+    if not isinstance(item, dict):
+        return item
+    return {
+        key: item[key] if subfields is None else project_fields(item[key], subfields)
+        for key, subfields in fields.items() if key in item
+    }
@@ -1,5 +1,5 @@
 from core.logger import logger
-from core.prompts import PROMPTS
+from core.prompts import PROMPTS, PromptTemplate
 from core.settings import settings
 
-__all__ = ['logger', 'PROMPTS', 'settings']
+__all__ = ['logger', 'PROMPTS', 'PromptTemplate', 'settings']
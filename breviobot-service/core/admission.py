@@ -0,0 +1,188 @@
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional
+from core.exceptions import OverloadedError
+from core.logger import logger
+from core.metrics import metrics, ADMISSION_WAIT, ADMISSION_REJECTIONS
+from core.settings import settings
+
+REQUEST_CLASSES = ("auth", "short_text", "long_text", "audio", "calendar")
+
+# Blueprint name -> request class; text is split by body size and unlisted
+# endpoints (/health, /ready, /metrics) are never queued
+_BLUEPRINT_CLASSES = {"auth_api": "auth", "usage": "auth", "stt": "audio", "calendar_api": "calendar"}
+
+_SERVICE_EWMA_ALPHA = 0.2
+
+
+@dataclass
+class _Ticket:
+    enqueued_at: float
+    granted: threading.Event = field(default_factory=threading.Event)
+
+
+class _RequestClass:
+    def __init__(self, name: str, weight: float, max_active: int, max_queued: int):
+        self.name = name
+        self.weight = weight
+        self.max_active = max_active
+        self.max_queued = max_queued
+        self.waiting = deque()
+        self.active = 0
+        self.virtual_time = 0.0
+        # Smoothed time a request of this class holds its slot
+        self.service_seconds = 0.0
+        self.counts = {"admitted": 0, "rejected": 0}
+
+
+class AdmissionController:
+    """
+    Bounds the requests a process runs at once and queues the rest per
+    request class. A free slot goes to the waiting class with the lowest
+    virtual time, which advances by 1/weight per admitted request, so under
+    contention classes get slots in proportion to their weights and a burst of
+    uploads cannot starve logins; each class also has its own concurrency cap.
+    A request is rejected with OverloadedError (and a Retry-After hint) when
+    its class queue is full or its expected wait exceeds max_wait_seconds,
+    instead of being left to time out.
+    """
+
+    def __init__(self, slots: int, weights: dict, concurrency: dict, queue_depths: dict, max_wait_seconds: float,
+                 clock=time.monotonic):
+        self.slots = slots
+        self._clock = clock
+        self.max_wait_seconds = max_wait_seconds
+        self._classes = {
+            name: _RequestClass(name, weights[name], min(concurrency[name], slots), queue_depths[name])
+            for name in REQUEST_CLASSES
+        }
+        self._active = 0
+        self._virtual_clock = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, class_name: str) -> float:
+        """Blocks until the request may run; returns the seconds it waited."""
+        request_class = self._classes[class_name]
+        ticket = _Ticket(enqueued_at=self._clock())
+        with self._lock:
+            if len(request_class.waiting) >= request_class.max_queued:
+                self._reject(request_class, "queue_full")
+            if self._expected_wait(request_class) > self.max_wait_seconds:
+                self._reject(request_class, "saturated")
+            if not request_class.waiting:
+                # A class does not bank credit for the time it had nothing queued
+                request_class.virtual_time = max(request_class.virtual_time, self._virtual_clock)
+            request_class.waiting.append(ticket)
+            self._dispatch()
+        if not ticket.granted.wait(self.max_wait_seconds):
+            with self._lock:
+                # Granted between the timeout and taking the lock: the slot is ours
+                if not ticket.granted.is_set():
+                    request_class.waiting.remove(ticket)
+                    self._reject(request_class, "timeout")
+        waited = self._clock() - ticket.enqueued_at
+        ADMISSION_WAIT.observe(waited, class_name)
+        return waited
+
+    def release(self, class_name: str, held_seconds: float):
+        request_class = self._classes[class_name]
+        with self._lock:
+            request_class.active -= 1
+            self._active -= 1
+            if request_class.service_seconds:
+                request_class.service_seconds += _SERVICE_EWMA_ALPHA * (held_seconds - request_class.service_seconds)
+            else:
+                request_class.service_seconds = held_seconds
+            self._dispatch()
+
+    def _dispatch(self):
+        # Called with the lock held
+        while self._active < self.slots:
+            eligible = [c for c in self._classes.values() if c.waiting and c.active < c.max_active]
+            if not eligible:
+                return
+            chosen = min(eligible, key=lambda c: (c.virtual_time, c.waiting[0].enqueued_at))
+            ticket = chosen.waiting.popleft()
+            chosen.active += 1
+            self._active += 1
+            self._virtual_clock = chosen.virtual_time
+            chosen.virtual_time += 1 / chosen.weight
+            chosen.counts["admitted"] += 1
+            ticket.granted.set()
+
+    def _expected_wait(self, request_class: _RequestClass) -> float:
+        if request_class.active < request_class.max_active and self._active < self.slots:
+            return 0.0
+        return request_class.service_seconds * (len(request_class.waiting) + 1) / request_class.max_active
+
+    def _reject(self, request_class: _RequestClass, reason: str):
+        request_class.counts["rejected"] += 1
+        ADMISSION_REJECTIONS.inc(request_class.name, reason)
+        retry_after = max(1, math.ceil(min(self._expected_wait(request_class), self.max_wait_seconds)))
+        logger.warning("[Admission] Rejected %s request (%s), retry after %ss", request_class.name, reason, retry_after)
+        raise OverloadedError(f"Too many {request_class.name.replace('_', ' ')} requests in progress, retry later",
+                              retry_after=retry_after)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                name: dict(c.counts, queued=len(c.waiting), active=c.active, max_active=c.max_active,
+                           service_ms=round(c.service_seconds * 1000, 1))
+                for name, c in self._classes.items()
+            }
+
+
+def classify_request(request) -> Optional[str]:
+    """The request class, or None for requests that bypass admission."""
+    if request.method == "OPTIONS":
+        return None
+    if request.blueprint == "text":
+        # The body is not read here; Content-Length is enough to tell a long document from a question
+        return "long_text" if (request.content_length or 0) > settings.admission.long_text_bytes else "short_text"
+    return _BLUEPRINT_CLASSES.get(request.blueprint)
+
+
+def _admission_gauges():
+    gauges = {}
+    for name, stats in admission.stats().items():
+        gauges[(name, "queued")] = stats["queued"]
+        gauges[(name, "active")] = stats["active"]
+    return gauges
+
+
+admission = AdmissionController(
+    slots=settings.admission.slots,
+    weights=settings.admission.weights,
+    concurrency=settings.admission.concurrency,
+    queue_depths=settings.admission.queue_depths,
+    max_wait_seconds=settings.admission.max_wait_seconds
+)
+
+metrics.register_callback("breviobot_admission_requests", "Requests queued for admission or running, by class",
+                          ("class", "state"), _admission_gauges)
+
+
+def init_admission(app):
+    """Admits every classified request before its view runs; the slot is released at teardown."""
+    if not settings.admission.enabled:
+        return
+
+    from flask import g, request
+
+    @app.before_request
+    def _admit():
+        class_name = classify_request(request)
+        if class_name is None:
+            return
+        admission.acquire(class_name)
+        g._admission = (class_name, time.monotonic())
+
+    @app.teardown_request
+    def _release(error=None):
+        admitted = g.pop("_admission", None)
+        if admitted is not None:
+            class_name, started = admitted
+            admission.release(class_name, time.monotonic() - started)
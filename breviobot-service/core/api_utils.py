@@ -11,4 +11,18 @@ def handle_authentication_error(error):
 
 def handle_validation_error(error):
     logger.error(f"Validation error: {str(error)}")
-    return jsonify({"error": str(error)}), 400
\ No newline at end of file
+    return jsonify({"error": str(error)}), 400
+
+def handle_model_error(error):
+    logger.error(f"Model backend error: {str(error)}")
+    return jsonify({"error": str(error)}), 502
+
+def handle_quota_exceeded_error(error):
+    logger.warning(f"Quota exceeded: {str(error)}")
+    return jsonify({"error": str(error)}), 429
+
+def handle_overloaded_error(error):
+    logger.warning(f"Backend overloaded: {str(error)}")
+    response = jsonify({"error": str(error)})
+    response.headers["Retry-After"] = str(error.retry_after)
+    return response, 503
@@ -0,0 +1,59 @@
+import gzip
+import threading
+from core.logger import logger
+from core.settings import settings
+
+# Bodies worth compressing; audio uploads never come back, everything else is JSON or text
+_COMPRESSIBLE_MIMETYPES = {"application/json", "text/plain", "text/html", "text/csv"}
+
+
+def _load_encoders() -> dict:
+    encoders = {"gzip": lambda data: gzip.compress(data, compresslevel=settings.compression.gzip_level)}
+    # brotli and zstandard are optional; without them the algorithm is simply not offered
+    try:
+        import brotli
+        encoders["br"] = lambda data: brotli.compress(data, quality=settings.compression.brotli_quality)
+    except ImportError:
+        pass
+    try:
+        import zstandard
+        local = threading.local()
+
+        def _zstd(data):
+            # A ZstdCompressor must not be used by two threads at once
+            compressor = getattr(local, "compressor", None)
+            if compressor is None:
+                compressor = local.compressor = zstandard.ZstdCompressor(level=settings.compression.zstd_level)
+            return compressor.compress(data)
+        encoders["zstd"] = _zstd
+    except ImportError:
+        pass
+    return encoders
+
+
+def init_compression(app):
+    """Compresses responses above min_size_bytes with the best encoding the client accepts."""
+    if not settings.compression.enabled:
+        return
+
+    from flask import request
+
+    encoders = _load_encoders()
+    offered = [name for name in settings.compression.algorithms if name in encoders]
+    logger.debug("[Compression] Offering %s", offered)
+
+    @app.after_request
+    def _compress(response):
+        if (response.direct_passthrough or response.is_streamed
+                or response.status_code < 200 or response.status_code in (204, 304)
+                or response.mimetype not in _COMPRESSIBLE_MIMETYPES):
+            return response
+        response.vary.add("Accept-Encoding")
+        if "Content-Encoding" in response.headers or (response.content_length or 0) < settings.compression.min_size_bytes:
+            return response
+        encoding = request.accept_encodings.best_match(offered)
+        if encoding is None:
+            return response
+        response.set_data(encoders[encoding](response.get_data()))
+        response.headers["Content-Encoding"] = encoding
+        return response
@@ -16,6 +16,8 @@ def send_email(to_email, subject, body):
     msg['To'] = to_email
 
     with smtplib.SMTP(smtp_host, smtp_port) as server:
-        server.starttls()
-        server.login(smtp_user, smtp_password)
+        if settings.email.smtp_starttls:
+            server.starttls()
+        if smtp_user:
+            server.login(smtp_user, smtp_password)
         server.sendmail(from_email, [to_email], msg.as_string())
@@ -9,3 +9,13 @@ class ValidationError(Exception):
 class AuthenticationError(Exception):
     """Raised when authentication fails"""
     pass
+
+class QuotaExceededError(Exception):
+    """Raised when a user exceeds a usage quota"""
+    pass
+
+class OverloadedError(Exception):
+    """Raised when a backend queue is full; retry_after is a hint in seconds"""
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
@@ -0,0 +1,58 @@
+import dataclasses
+import decimal
+import json
+import uuid
+from datetime import date
+import orjson
+from flask.json.provider import JSONProvider
+from werkzeug.http import http_date
+
+# Same output as Flask's default provider: sorted keys, compact, non-string keys as strings
+_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def _default(o):
+    # Types orjson leaves to us, serialized as Flask's default provider does
+    if isinstance(o, date):
+        return http_date(o)
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if dataclasses.is_dataclass(o):
+        return dataclasses.asdict(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def _dumps_bytes(obj) -> bytes:
+    try:
+        return orjson.dumps(obj, default=_default, option=_OPTIONS)
+    except orjson.JSONEncodeError:
+        # Compact separators match orjson's output
+        return json.dumps(obj, default=_default, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class OrjsonProvider(JSONProvider):
+    """
+    Flask JSON provider backed by orjson. Responses are written straight to
+    bytes; calls passing json.dumps keyword arguments (indent, cls, ...) and
+    values orjson cannot encode (integers beyond 64 bits) fall back to the
+    standard library.
+    """
+
+    def dumps(self, obj, **kwargs) -> str:
+        if kwargs:
+            kwargs.setdefault("default", _default)
+            kwargs.setdefault("sort_keys", True)
+            return json.dumps(obj, **kwargs)
+        return _dumps_bytes(obj).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return json.loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(_dumps_bytes(obj) + b"\n",
+                                        mimetype="application/json")
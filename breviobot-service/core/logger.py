@@ -1,27 +1,176 @@
+import atexit
+import contextvars
+import copy
+import json
 import logging
+import os
+import queue
+import random
 import sys
-from logging.handlers import RotatingFileHandler
+import time
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from typing import Optional
+from core.settings import settings
 
-def setup_logger(name: str, log_file: Optional[str] = None, level: int = logging.INFO) -> logging.Logger:
+# Set per request by core.tracing so every log line can be correlated with its request
+request_id_var = contextvars.ContextVar("request_id", default="-")
+
+_SERVICE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s'
+
+class RequestIdFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+@lru_cache(maxsize=512)
+def _module_path(pathname: str) -> str:
+    # "/srv/breviobot-service/calendars/google_client.py" -> "calendars.google_client"
+    relative = os.path.relpath(os.path.abspath(pathname), _SERVICE_ROOT)
+    if relative.startswith('..'):
+        return ''
+    return os.path.splitext(relative)[0].replace(os.sep, '.')
+
+def _level(name: str) -> int:
+    level = logging.getLevelName(name)
+    return level if isinstance(level, int) else logging.INFO
+
+class ModuleFilter(logging.Filter):
+    """
+    Applies per-module levels and samples INFO/DEBUG records of noisy modules.
+    All modules share one logger, so the emitting module is resolved from the
+    record's path; a key matches the module and everything below it.
+    """
+
+    def __init__(self, default_level: int, module_levels: dict, sample_rates: dict):
+        super().__init__()
+        self.default_level = default_level
+        self.module_levels = {module: _level(name) for module, name in module_levels.items()}
+        self.sample_rates = dict(sample_rates)
+        self._resolved = {}
+
+    def _lookup(self, table: dict, module: str, default):
+        while module:
+            if module in table:
+                return table[module]
+            module = module.rpartition('.')[0]
+        return default
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        module = _module_path(record.pathname)
+        resolved = self._resolved.get(module)
+        if resolved is None:
+            resolved = self._resolved[module] = (
+                self._lookup(self.module_levels, module, self.default_level),
+                self._lookup(self.sample_rates, module, 1.0)
+            )
+        level, sample_rate = resolved
+        if record.levelno < level:
+            return False
+        if record.levelno < logging.WARNING and sample_rate < 1.0 and random.random() >= sample_rate:
+            return False
+        record.module_path = module
+        return True
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, module, request_id, message and exc when present."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "module": getattr(record, "module_path", record.module),
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage()
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class _BackgroundQueueHandler(QueueHandler):
+    """
+    Hands records to the listener thread. The message and traceback are
+    rendered here, since arguments may change once the caller moves on, but
+    formatting and I/O happen on the listener. Records are dropped rather
+    than blocking the request when the queue is full, and counted in
+    breviobot_log_records_dropped_total.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+_pipelines = {}
+
+def _restart_after_fork():
+    # The listener thread does not survive fork() and the queue's lock may have
+    # been held by it, so each child process starts with a fresh queue and thread
+    for queue_handler, listener in _pipelines.values():
+        fresh_queue = queue.Queue(maxsize=settings.logging.queue_size)
+        queue_handler.queue = listener.queue = fresh_queue
+        # Worker counters are summed by /metrics, so a child does not inherit the parent's drops
+        queue_handler.dropped = 0
+        listener._thread = None
+        listener.start()
+
+os.register_at_fork(after_in_child=_restart_after_fork)
+
+def dropped_records() -> dict:
+    """Records dropped because the log queue was full, per configured logger."""
+    return {name: queue_handler.dropped for name, (queue_handler, _) in _pipelines.items()}
+
+def setup_logger(name: str, log_file: Optional[str] = None, level: Optional[int] = None) -> logging.Logger:
     logger = logging.getLogger(name)
-    logger.setLevel(level)
-    
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    
+    if name in _pipelines:
+        # Already configured; adding handlers again would duplicate every line
+        return logger
+
+    config = settings.logging
+    default_level = level if level is not None else _level(config.level)
+    module_filter = ModuleFilter(default_level, config.module_levels, config.info_sample_rates)
+    # The logger lets through the most verbose configured level; ModuleFilter narrows it per module
+    logger.setLevel(min([default_level, *module_filter.module_levels.values()]))
+    logger.propagate = False
+
+    formatter = JsonFormatter() if config.format == 'json' else logging.Formatter(_TEXT_FORMAT)
+    handlers = [logging.StreamHandler(sys.stdout)]
+    log_file = log_file or config.file_path
     if log_file:
-        file_handler = RotatingFileHandler(
+        handlers.append(RotatingFileHandler(
             log_file, maxBytes=10485760, backupCount=5
-        )
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
-    
+        ))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    queue_handler = _BackgroundQueueHandler(queue.Queue(maxsize=config.queue_size))
+    # Filters run on the calling thread, where the request id context is set
+    queue_handler.addFilter(RequestIdFilter())
+    queue_handler.addFilter(module_filter)
+    logger.addHandler(queue_handler)
+
+    listener = QueueListener(queue_handler.queue, *handlers)
+    listener.start()
+    atexit.register(listener.stop)
+    _pipelines[name] = (queue_handler, listener)
     return logger
 
 logger = setup_logger('breviobot')
@@ -0,0 +1,364 @@
+import fcntl
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from core.logger import logger, dropped_records
+from core.settings import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+RATE_BUCKETS = (1, 5, 10, 20, 40, 80, 160, 320)
+RATIO_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0)
+
+# Counters and histograms of exited workers, kept so the sums never decrease
+_RETIRED_FILE = "retired.json"
+
+
+def _read_snapshot(path: str) -> dict:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, registry, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._registry = registry
+        registry.register(self)
+
+    def _slots(self, labelvalues: tuple) -> list:
+        # Each thread updates its own shard, so the hot path takes no lock;
+        # shards are only summed when metrics are collected
+        shard = self._registry.shard()
+        key = (self.name, labelvalues)
+        slots = shard.get(key)
+        if slots is None:
+            slots = shard[key] = [0.0] * self._width()
+        return slots
+
+    def _width(self) -> int:
+        return 1
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, *labelvalues, amount: float = 1.0):
+        self._slots(labelvalues)[0] += amount
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, registry, name: str, documentation: str, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        super().__init__(registry, name, documentation, labelnames)
+
+    def _width(self) -> int:
+        # One slot per bucket, one for +Inf, then sum
+        return len(self.buckets) + 2
+
+    def observe(self, value: float, *labelvalues):
+        slots = self._slots(labelvalues)
+        slots[bisect_left(self.buckets, value)] += 1
+        slots[-1] += value
+
+
+class MetricsRegistry:
+    """
+    Minimal Prometheus registry. Counters and histograms are sharded per
+    thread; the shard of a finished thread is folded into a retired total, so
+    servers that start a thread per request do not accumulate shards. Values
+    other components already keep (cache hits, queue depth, breaker state) are
+    read by callbacks at scrape time so they cost nothing per request. With a
+    multiprocess directory configured, every worker periodically writes its
+    totals there and /metrics sums the counters and histograms of all
+    workers, with those of exited workers folded into a retained total so the
+    sums never decrease; gauges keep one series per worker under a pid label,
+    since a sum of states means nothing. Ratios are derived after summing.
+    """
+
+    def __init__(self, multiprocess_dir: str, flush_interval_seconds: float):
+        self.multiprocess_dir = multiprocess_dir
+        self.flush_interval_seconds = flush_interval_seconds
+        self._metrics = {}
+        self._callbacks = {}
+        self._ratios = []
+        self._shards = []
+        self._retired = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._flusher_pid = None
+
+    def register(self, metric: _Metric):
+        self._metrics[metric.name] = metric
+
+    def shard(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._retire_finished_shards()
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def _retire_finished_shards(self):
+        # Called with the lock held; a finished thread can no longer write to its shard
+        live = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                live.append((thread, shard))
+                continue
+            for key, slots in shard.items():
+                current = self._retired.get(key)
+                self._retired[key] = list(slots) if current is None else [a + b for a, b in zip(current, slots)]
+        self._shards = live
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return Counter(self, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames=(), buckets=LATENCY_BUCKETS) -> Histogram:
+        return Histogram(self, name, documentation, labelnames, buckets)
+
+    def register_callback(self, name: str, documentation: str, labelnames, callback, metric_type: str = "gauge"):
+        """callback() returns {labelvalues tuple: value}; several callbacks may feed one family."""
+        family = self._callbacks.setdefault(name, (documentation, metric_type, tuple(labelnames), []))
+        family[3].append(callback)
+
+    def register_ratio(self, name: str, documentation: str, hits_name: str, misses_name: str):
+        """Gauge hits / (hits + misses), computed per label set from the summed counters."""
+        self._ratios.append((name, documentation, hits_name, misses_name))
+
+    def _local_snapshot(self) -> dict:
+        totals = {}
+        with self._lock:
+            self._retire_finished_shards()
+            shards = [dict(self._retired)] + [shard for _, shard in self._shards]
+        for shard in shards:
+            for (name, labelvalues), slots in list(shard.items()):
+                key = json.dumps([name, list(labelvalues)])
+                current = totals.get(key)
+                totals[key] = list(slots) if current is None else [a + b for a, b in zip(current, slots)]
+        pid = [str(os.getpid())] if self.multiprocess_dir else []
+        for name, (_, metric_type, _, callbacks) in self._callbacks.items():
+            for callback in callbacks:
+                try:
+                    values = callback()
+                except Exception as e:
+                    logger.warning(f"[Metrics] Callback for '{name}' failed: {e}")
+                    continue
+                for labelvalues, value in values.items():
+                    labels = [str(v) for v in labelvalues] + (pid if metric_type == "gauge" else [])
+                    totals[json.dumps([name, labels])] = [float(value)]
+        return totals
+
+    def ensure_flusher(self):
+        # Started per process, after any fork, on the first request
+        if not self.multiprocess_dir or self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        os.makedirs(self.multiprocess_dir, exist_ok=True)
+        threading.Thread(target=self._flush_loop, name="metrics-flusher", daemon=True).start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval_seconds)
+            try:
+                self._write_snapshot()
+            except Exception as e:
+                logger.warning(f"[Metrics] Could not write metrics snapshot: {e}")
+
+    def _write_snapshot(self):
+        path = os.path.join(self.multiprocess_dir, f"{os.getpid()}.json")
+        fd, tmp_path = tempfile.mkstemp(dir=self.multiprocess_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(self._local_snapshot(), f)
+        os.replace(tmp_path, path)
+
+    def _collect(self) -> dict:
+        totals = self._local_snapshot()
+        if not self.multiprocess_dir or not os.path.isdir(self.multiprocess_dir):
+            return totals
+        for snapshot in self._worker_snapshots():
+            for key, slots in snapshot.items():
+                current = totals.get(key)
+                totals[key] = slots if current is None else [a + b for a, b in zip(current, slots)]
+        return totals
+
+    def _worker_snapshots(self) -> list:
+        # Summed counters must not go down when a worker is recycled, or Prometheus sees a reset,
+        # so the snapshots of exited workers are folded into one retained file. Folding and reading
+        # happen under one lock across workers, so a snapshot is never counted twice or missed.
+        retired_path = os.path.join(self.multiprocess_dir, _RETIRED_FILE)
+        with open(os.path.join(self.multiprocess_dir, _RETIRED_FILE + ".lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            retired = _read_snapshot(retired_path)
+            live, exited = [], []
+            for filename in os.listdir(self.multiprocess_dir):
+                if not filename.endswith(".json") or filename == _RETIRED_FILE:
+                    continue
+                pid = int(filename[:-5])
+                if pid == os.getpid():
+                    continue
+                path = os.path.join(self.multiprocess_dir, filename)
+                try:
+                    os.kill(pid, 0)
+                except ProcessLookupError:
+                    exited.append(path)
+                    continue
+                except PermissionError:
+                    pass
+                live.append(_read_snapshot(path))
+            if exited:
+                for path in exited:
+                    for key, slots in _read_snapshot(path).items():
+                        # Gauges describe a process that is gone
+                        if self._callbacks.get(json.loads(key)[0], (None, None))[1] == "gauge":
+                            continue
+                        current = retired.get(key)
+                        retired[key] = slots if current is None else [a + b for a, b in zip(current, slots)]
+                fd, tmp_path = tempfile.mkstemp(dir=self.multiprocess_dir, suffix=".tmp")
+                with os.fdopen(fd, "w") as f:
+                    json.dump(retired, f)
+                os.replace(tmp_path, retired_path)
+                for path in exited:
+                    os.remove(path)
+        return [retired] + live
+
+    def _callback_labelnames(self, metric_type: str, labelnames: tuple) -> tuple:
+        return labelnames + ("pid",) if metric_type == "gauge" and self.multiprocess_dir else labelnames
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        by_name = {}
+        for key, slots in self._collect().items():
+            name, labelvalues = json.loads(key)
+            by_name.setdefault(name, []).append((labelvalues, slots))
+        for name, _, hits_name, misses_name in self._ratios:
+            hits = {tuple(labels): slots[0] for labels, slots in by_name.get(hits_name, [])}
+            misses = {tuple(labels): slots[0] for labels, slots in by_name.get(misses_name, [])}
+            by_name[name] = [
+                (list(labels), [hits.get(labels, 0.0) / total])
+                for labels in set(hits) | set(misses)
+                if (total := hits.get(labels, 0.0) + misses.get(labels, 0.0))
+            ]
+        families = [(m.name, m.documentation, m.type, m.labelnames, getattr(m, "buckets", None)) for m in self._metrics.values()]
+        families += [(name, doc, metric_type, self._callback_labelnames(metric_type, labelnames), None)
+                     for name, (doc, metric_type, labelnames, _) in self._callbacks.items()]
+        families += [(name, doc, "gauge", self._callbacks[hits_name][2], None) for name, doc, hits_name, _ in self._ratios]
+        lines = []
+        for name, documentation, metric_type, labelnames, buckets in families:
+            samples = by_name.get(name)
+            if not samples:
+                continue
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labelvalues, slots in sorted(samples):
+                labels = list(zip(labelnames, labelvalues))
+                if metric_type != "histogram":
+                    lines.append(f"{name}{_labels(labels)} {_number(slots[0])}")
+                    continue
+                cumulative = 0.0
+                for bound, count in zip(buckets + (math.inf,), slots[:-1]):
+                    cumulative += count
+                    le = "+Inf" if bound == math.inf else _number(bound)
+                    lines.append(f"{name}_bucket{_labels(labels + [('le', le)])} {_number(cumulative)}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(slots[-1])}")
+                lines.append(f"{name}_count{_labels(labels)} {_number(cumulative)}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(pairs) -> str:
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+metrics = MetricsRegistry(
+    multiprocess_dir=settings.metrics.multiprocess_dir,
+    flush_interval_seconds=settings.metrics.flush_interval_seconds
+)
+
+REQUEST_DURATION = metrics.histogram(
+    "breviobot_http_request_duration_seconds", "HTTP request latency by route", ("blueprint", "route", "method", "status"))
+MODEL_CALL_DURATION = metrics.histogram(
+    "breviobot_model_call_duration_seconds", "Model call latency by backend", ("backend", "model"))
+MODEL_TTFT = metrics.histogram(
+    "breviobot_model_time_to_first_token_seconds", "Time to first generated token (model load + prompt evaluation)", ("backend", "model"))
+MODEL_TOKENS_PER_SECOND = metrics.histogram(
+    "breviobot_model_tokens_per_second", "Generation throughput in completion tokens per second", ("backend", "model"), RATE_BUCKETS)
+WHISPER_RTF = metrics.histogram(
+    "breviobot_whisper_real_time_factor", "Transcription time divided by audio duration", ("mode",), RATIO_BUCKETS)
+RATE_LIMIT_REJECTIONS = metrics.counter(
+    "breviobot_rate_limit_rejections_total", "Requests rejected by the rate limiter", ("blueprint", "route"))
+DB_POOL_WAIT = metrics.histogram(
+    "breviobot_db_pool_wait_seconds", "Time spent checking a connection out of the database pool")
+ADMISSION_WAIT = metrics.histogram(
+    "breviobot_admission_wait_seconds", "Time requests spent queued for admission", ("class",))
+ADMISSION_REJECTIONS = metrics.counter(
+    "breviobot_admission_rejections_total", "Requests rejected by admission control", ("class", "reason"))
+
+
+def register_cache_stats(cache: str, snapshot):
+    """snapshot() returns (hits, misses) for the cache; exported as counters plus a hit ratio."""
+    metrics.register_callback("breviobot_cache_hits_total", "Cache hits", ("cache",),
+                              lambda: {(cache,): snapshot()[0]}, metric_type="counter")
+    metrics.register_callback("breviobot_cache_misses_total", "Cache misses", ("cache",),
+                              lambda: {(cache,): snapshot()[1]}, metric_type="counter")
+
+
+metrics.register_ratio("breviobot_cache_hit_ratio", "Cache hit ratio across all workers",
+                       "breviobot_cache_hits_total", "breviobot_cache_misses_total")
+# Registered here rather than in core.logger, which is imported by this module
+metrics.register_callback("breviobot_log_records_dropped_total", "Log records dropped because the log queue was full",
+                          ("logger",), lambda: {(name,): dropped for name, dropped in dropped_records().items()},
+                          metric_type="counter")
+
+
+def init_metrics(app):
+    """Times every request and serves /metrics (unauthenticated, for the scraper)."""
+    if not settings.metrics.enabled:
+        return
+
+    from flask import Response, g, request
+    from flask_limiter import RateLimitExceeded
+
+    @app.before_request
+    def _start_timer():
+        metrics.ensure_flusher()
+        g._metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _observe_request(response):
+        started = g.pop("_metrics_started", None)
+        if started is not None and request.endpoint != "metrics":
+            route = request.url_rule.rule if request.url_rule else "unmatched"
+            REQUEST_DURATION.observe(time.perf_counter() - started, request.blueprint or "", route,
+                                     request.method, str(response.status_code))
+        return response
+
+    @app.errorhandler(RateLimitExceeded)
+    def _rate_limited(error):
+        RATE_LIMIT_REJECTIONS.inc(request.blueprint or "", request.url_rule.rule if request.url_rule else "unmatched")
+        return error
+
+    @app.route("/metrics", endpoint="metrics")
+    def _metrics():
+        return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
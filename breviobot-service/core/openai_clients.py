@@ -0,0 +1,34 @@
+import os
+import threading
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_openai_client(api_key: str, timeout: float):
+    """
+    Process-wide OpenAI client per key and timeout. The SDK client is
+    thread-safe and keeps a pool of HTTP connections, so requests reuse warm
+    connections instead of opening a new TLS session each time.
+    """
+    key = (api_key, timeout)
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                # Imported on first use; the SDK is slow to import
+                from openai import OpenAI
+                # Retries are handled by resilient_call, not the SDK
+                client = _clients[key] = OpenAI(api_key=api_key, timeout=timeout, max_retries=0)
+    return client
+
+
+def _reset_after_fork():
+    # Pooled sockets must not be shared with the parent process
+    global _clients_lock
+    _clients.clear()
+    _clients_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
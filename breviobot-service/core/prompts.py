@@ -1,3 +1,7 @@
+import threading
+from datetime import datetime, date
+from typing import Optional
+
 PROMPTS: dict[str, str] = {
     "it": 
         """
@@ -61,3 +65,32 @@ PROMPTS: dict[str, str] = {
 
          """
 }
+
+
+class PromptTemplate:
+    """
+    A prompt split into a static prefix and a volatile suffix. The prefix is kept
+    byte-identical across requests so provider-side prompt-prefix caching keeps
+    hitting; the suffix (e.g. today's date) is rendered per request and memoized
+    for the current UTC day.
+    """
+
+    def __init__(self, prefix: str, suffix: str = ""):
+        self.prefix = prefix
+        self.suffix = suffix
+        self._lock = threading.Lock()
+        self._day = None
+        self._rendered = {}
+
+    def render(self, today: Optional[date] = None, **values) -> str:
+        today = today or datetime.utcnow().date()
+        key = (today,) + tuple(sorted(values.items()))
+        with self._lock:
+            if self._day != today:
+                self._day = today
+                self._rendered = {}
+            rendered = self._rendered.get(key)
+            if rendered is None:
+                rendered = self.prefix + self.suffix.format(today=today, **values)
+                self._rendered[key] = rendered
+        return rendered
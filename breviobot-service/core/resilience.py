@@ -0,0 +1,196 @@
+import math
+import random
+import threading
+import time
+from core.exceptions import OverloadedError
+from core.logger import logger
+from core.settings import settings
+from core.tracing import span
+from core.metrics import metrics
+
+# Status codes worth retrying: throttling and upstream failures
+_TRANSIENT_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(OverloadedError):
+    """Raised without calling the backend while its circuit breaker is open"""
+    pass
+
+
+def _status_code(error):
+    # openai.APIStatusError exposes status_code; requests.HTTPError carries the response
+    status = getattr(error, "status_code", None)
+    if status is None and getattr(error, "response", None) is not None:
+        status = getattr(error.response, "status_code", None)
+    return status
+
+
+def is_transient(error: Exception) -> bool:
+    """Timeouts, connection failures, throttling and 5xx responses; not client errors."""
+    if isinstance(error, OverloadedError):
+        return False
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    status = _status_code(error)
+    if status is not None:
+        return status in _TRANSIENT_STATUS_CODES
+    # openai.APITimeoutError / APIConnectionError and requests.Timeout / ConnectionError
+    names = {cls.__name__ for cls in type(error).__mro__}
+    return bool(names & {"APITimeoutError", "APIConnectionError", "Timeout", "ConnectionError"})
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive transient failures and rejects
+    calls for reset_seconds. Then a single trial call is let through
+    (half-open): any answer from the backend, including a client error,
+    closes the breaker; a transient failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self._counts = {"successes": 0, "failures": 0, "retries": 0, "rejected": 0, "opened": 0}
+
+    def _transition(self, state: str):
+        if state != self.state:
+            log = logger.warning if state == self.OPEN else logger.info
+            log(f"[Resilience] Circuit '{self.name}' {self.state} -> {state}")
+            self.state = state
+
+    def before_call(self):
+        with self._lock:
+            if self.state == self.OPEN:
+                remaining = self.reset_seconds - (time.monotonic() - self._opened_at)
+                if remaining > 0:
+                    self._counts["rejected"] += 1
+                    raise CircuitOpenError(f"Backend '{self.name}' is unavailable, retry later",
+                                           retry_after=max(1, math.ceil(remaining)))
+                self._transition(self.HALF_OPEN)
+            if self.state == self.HALF_OPEN:
+                if self._trial_in_flight:
+                    self._counts["rejected"] += 1
+                    raise CircuitOpenError(f"Backend '{self.name}' is recovering, retry later", retry_after=1)
+                self._trial_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self._counts["successes"] += 1
+            self._consecutive_failures = 0
+            self._trial_in_flight = False
+            self._transition(self.CLOSED)
+
+    def record_failure(self, transient: bool):
+        with self._lock:
+            self._trial_in_flight = False
+            if not transient:
+                # The backend answered; a bad request (a 400 from user input) says nothing bad
+                # about its health, so it resets the count like a success, also on a trial call
+                self._consecutive_failures = 0
+                self._transition(self.CLOSED)
+                return
+            self._counts["failures"] += 1
+            self._consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._counts["opened"] += 1
+                self._transition(self.OPEN)
+
+    def record_skipped(self):
+        # The call never reached the backend (e.g. a full local queue): no verdict either way
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_retry(self):
+        with self._lock:
+            self._counts["retries"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._counts, state=self.state, consecutive_failures=self._consecutive_failures)
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(backend: str) -> CircuitBreaker:
+    with _breakers_lock:
+        breaker = _breakers.get(backend)
+        if breaker is None:
+            breaker = _breakers[backend] = CircuitBreaker(
+                backend,
+                failure_threshold=settings.resilience.breaker_failure_threshold,
+                reset_seconds=settings.resilience.breaker_reset_seconds
+            )
+        return breaker
+
+
+def breaker_stats() -> dict:
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {name: breaker.stats() for name, breaker in breakers.items()}
+
+
+def backend_timeout(backend: str) -> float:
+    """Per-backend timeout in seconds, derived from settings.app.request_timeout."""
+    multiplier = settings.resilience.timeout_multipliers.get(backend, 1.0)
+    return settings.app.request_timeout * multiplier
+
+
+def resilient_call(backend: str, func, *args, **kwargs):
+    """
+    Calls func through the backend's circuit breaker, retrying transient
+    failures up to settings.resilience.max_retries times with full-jitter
+    exponential backoff. func must be safe to call again (e.g. reopen files).
+    """
+    breaker = get_breaker(backend)
+    max_retries = settings.resilience.max_retries
+    base_delay = settings.resilience.retry_base_delay_ms / 1000
+    max_delay = settings.resilience.retry_max_delay_ms / 1000
+    attempt = 0
+    with span(f"{backend}.call") as call_span:
+        while True:
+            if call_span:
+                call_span.set_attribute("attempts", attempt + 1)
+            breaker.before_call()
+            try:
+                result = func(*args, **kwargs)
+            except OverloadedError:
+                breaker.record_skipped()
+                raise
+            except Exception as e:
+                transient = is_transient(e)
+                breaker.record_failure(transient)
+                if not transient or attempt >= max_retries or breaker.state == CircuitBreaker.OPEN:
+                    raise
+                attempt += 1
+                breaker.record_retry()
+                delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+                logger.warning(f"[Resilience] '{backend}' call failed ({e}); retry {attempt}/{max_retries} in {delay:.2f}s")
+                time.sleep(delay)
+                continue
+            breaker.record_success()
+            return result
+
+
+_BREAKER_STATE_VALUES = {CircuitBreaker.CLOSED: 0, CircuitBreaker.HALF_OPEN: 1, CircuitBreaker.OPEN: 2}
+
+metrics.register_callback(
+    "breviobot_circuit_breaker_state", "Circuit breaker state per backend (0 closed, 1 half-open, 2 open)", ("backend",),
+    lambda: {(name,): _BREAKER_STATE_VALUES[stats["state"]] for name, stats in breaker_stats().items()}
+)
+metrics.register_callback(
+    "breviobot_circuit_breaker_rejections_total", "Calls rejected by an open circuit breaker", ("backend",),
+    lambda: {(name,): stats["rejected"] for name, stats in breaker_stats().items()}, metric_type="counter"
+)
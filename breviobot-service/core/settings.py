@@ -13,13 +13,17 @@ class AppSettings:
     request_timeout: int
     debug_mode: bool
     database_url: str
+    ollama_url: str
 
 @dataclass
 class APISettings:
     host: str
     port: int
     rate_limit: int
+    rate_limit_enabled: bool
+    rate_limit_storage_uri: str
     cors_origins: list[str]
+    blueprints: list[str]
 
 @dataclass
 class AudioSettings:
@@ -31,6 +35,7 @@ class AudioSettings:
 class WhisperSettings:
     use_api: bool
     model_size: str
+    cpu_threads: int
 
 @dataclass 
 class AuthSettings:
@@ -38,6 +43,7 @@ class AuthSettings:
     token_expiry_minutes: int
     refresh_token_expiry_minutes: int
     enable_auth: bool
+    token_store_compaction_seconds: int
 
 @dataclass
 class EmailSettings:
@@ -45,9 +51,164 @@ class EmailSettings:
     smtp_port: int
     smtp_user: str
     smtp_password: str
+    smtp_starttls: bool
     from_email: str
     from_name: str
 
+@dataclass
+class UsageSettings:
+    daily_token_quota: int
+    monthly_token_quota: int
+    daily_audio_seconds_quota: int
+    monthly_audio_seconds_quota: int
+    flush_interval_seconds: int
+    flush_batch_size: int
+
+@dataclass
+class CalendarSettings:
+    credential_refresh_margin_seconds: int
+    service_cache_idle_seconds: int
+    service_cache_max_entries: int
+    event_cache_enabled: bool
+    event_sync_interval_seconds: int
+    event_cache_max_calendars: int
+    event_sync_past_days: int
+    event_sync_future_days: int
+    multi_calendar_max_workers: int
+    api_endpoint: str
+
+@dataclass
+class ToolCallSettings:
+    max_rounds: int
+    max_parallel_tools: int
+    local_parser_enabled: bool
+    local_parser_min_confidence: float
+    result_cache_max_entries: int
+
+@dataclass
+class SessionSettings:
+    max_sessions: int
+    idle_ttl_seconds: int
+    max_turns: int
+    max_summary_chars: int
+
+@dataclass
+class SummaryDedupSettings:
+    enabled: bool
+    embedding_backend: str
+    embedding_model: str
+    similarity_threshold: float
+    max_entries_per_user: int
+    max_users: int
+    min_words: int
+
+@dataclass
+class ModelSettings:
+    ollama_models: list[str]
+    ollama_discovery_enabled: bool
+    ollama_discovery_ttl_seconds: int
+    ollama_discovery_timeout_seconds: float
+    ollama_default_context_window: int
+    latency_ewma_alpha: float
+
+@dataclass
+class RoutingSettings:
+    local_max_input_tokens: int
+    local_languages: list[str]
+    local_max_queue_depth: int
+    local_model: str
+    remote_model: str
+
+@dataclass
+class OllamaSchedulerSettings:
+    parallel_slots: int
+    max_queue_depth: int
+    batch_window_ms: int
+    keep_alive: str
+    max_consecutive_batches: int
+    max_model_wait_ms: int
+
+@dataclass
+class ResilienceSettings:
+    max_retries: int
+    retry_base_delay_ms: int
+    retry_max_delay_ms: int
+    breaker_failure_threshold: int
+    breaker_reset_seconds: float
+    timeout_multipliers: Dict[str, float]
+
+@dataclass
+class TracingSettings:
+    enabled: bool
+    exporter: str
+    file_path: str
+    otlp_endpoint: str
+    service_name: str
+    slow_request_ms: int
+
+@dataclass
+class MetricsSettings:
+    enabled: bool
+    multiprocess_dir: str
+    flush_interval_seconds: float
+
+@dataclass
+class WarmupSettings:
+    enabled: bool
+    whisper_model_sizes: list[str]
+    ollama_models: list[str]
+    db_connections: int
+    openai: bool
+    google: bool
+
+@dataclass
+class LoggingSettings:
+    level: str
+    format: str
+    file_path: str
+    module_levels: Dict[str, str]
+    info_sample_rates: Dict[str, float]
+    queue_size: int
+
+@dataclass
+class ServerSettings:
+    workers: int
+    threads: int
+    preload: bool
+    max_requests: int
+    max_requests_jitter: int
+    timeout: int
+    graceful_timeout: int
+    keepalive: int
+
+@dataclass
+class AdmissionSettings:
+    enabled: bool
+    slots: int
+    weights: Dict[str, float]
+    concurrency: Dict[str, int]
+    queue_depths: Dict[str, int]
+    max_wait_seconds: float
+    long_text_bytes: int
+
+@dataclass
+class CompressionSettings:
+    enabled: bool
+    min_size_bytes: int
+    algorithms: list[str]
+    gzip_level: int
+    brotli_quality: int
+    zstd_level: int
+
+def _parse_mapping(raw: str, cast) -> dict:
+    # "calendars=DEBUG,text.handlers=WARNING" -> {"calendars": "DEBUG", "text.handlers": "WARNING"}
+    mapping = {}
+    for item in raw.split(','):
+        if '=' in item:
+            key, value = item.split('=', 1)
+            mapping[key.strip()] = cast(value.strip())
+    return mapping
+
 class Settings:
     def __init__(self) -> None:
         load_dotenv()
@@ -59,13 +220,19 @@ class Settings:
             max_input_length=int(os.getenv('BREVIOBOT_MAX_INPUT_LENGTH', '4000')),
             request_timeout=int(os.getenv('BREVIOBOT_REQUEST_TIMEOUT', '30')),
             debug_mode=os.getenv('BREVIOBOT_DEBUG_MODE', 'False').lower() == 'true',
-            database_url=os.getenv('BREVIOBOT_DATABASE_URL', 'sqlite:///./breviobot.db')
+            database_url=os.getenv('BREVIOBOT_DATABASE_URL', 'sqlite:///./breviobot.db'),
+            ollama_url=os.getenv('BREVIOBOT_OLLAMA_URL', 'http://localhost:11434')
         )
 
         self.api = APISettings(
             host=os.getenv('BREVIOBOT_HOST', '0.0.0.0'),            port=int(os.getenv('BREVIOBOT_PORT', '8000')),
             rate_limit=int(os.getenv('BREVIOBOT_RATE_LIMIT', '100')),
-            cors_origins=os.getenv('BREVIOBOT_CORS_ORIGINS', '*').split(',')
+            rate_limit_enabled=os.getenv('BREVIOBOT_RATE_LIMIT_ENABLED', 'true').lower() == 'true',
+            # Counters are per process with memory://; with several workers use a shared store (redis://...)
+            rate_limit_storage_uri=os.getenv('BREVIOBOT_RATE_LIMIT_STORAGE_URI', 'memory://'),
+            cors_origins=os.getenv('BREVIOBOT_CORS_ORIGINS', '*').split(','),
+            # Per-role deployments register a subset, e.g. "auth,text" on nodes without transcription
+            blueprints=[b.strip() for b in os.getenv('BREVIOBOT_BLUEPRINTS', 'auth,stt,text,calendar,usage').split(',') if b.strip()]
         )
         
         self.audio = AudioSettings(
@@ -76,14 +243,17 @@ class Settings:
         
         self.whisper = WhisperSettings(
             use_api=os.getenv('BREVIOBOT_WHISPER_USE_API', 'True').lower() == 'true',
-            model_size=os.getenv('BREVIOBOT_WHISPER_MODEL_SIZE', 'base')
+            model_size=os.getenv('BREVIOBOT_WHISPER_MODEL_SIZE', 'base'),
+            # 0 keeps the CTranslate2 default; serve.py splits the cores between workers when unset
+            cpu_threads=int(os.getenv('BREVIOBOT_WHISPER_CPU_THREADS', '0'))
         )
         
         self.auth = AuthSettings(
             secret_key=os.getenv('BREVIOBOT_JWT_SECRET_KEY', ''),
             token_expiry_minutes=int(os.getenv('BREVIOBOT_JWT_EXPIRY_MINUTES', '1')),
             refresh_token_expiry_minutes=int(os.getenv('BREVIOBOT_JWT_REFRESH_EXPIRY_MINUTES', '43200')),
-            enable_auth=os.getenv('BREVIOBOT_ENABLE_AUTH', 'true').lower() == 'true'
+            enable_auth=os.getenv('BREVIOBOT_ENABLE_AUTH', 'true').lower() == 'true',
+            token_store_compaction_seconds=int(os.getenv('BREVIOBOT_TOKEN_STORE_COMPACTION_SECONDS', '300'))
         )
 
         self.email = EmailSettings(
@@ -91,10 +261,206 @@ class Settings:
             smtp_port=int(os.getenv('BREVIOBOT_SMTP_PORT', '587')),
             smtp_user=os.getenv('BREVIOBOT_SMTP_USER', ''),
             smtp_password=os.getenv('BREVIOBOT_SMTP_PASSWORD', ''),
+            smtp_starttls=os.getenv('BREVIOBOT_SMTP_STARTTLS', 'true').lower() == 'true',
             from_email=os.getenv('BREVIOBOT_EMAIL_FROM', ''),
             from_name=os.getenv('BREVIOBOT_EMAIL_FROM_NAME', 'BrevioBot')
         )
 
+        # A quota of 0 disables the corresponding limit
+        self.usage = UsageSettings(
+            daily_token_quota=int(os.getenv('BREVIOBOT_QUOTA_DAILY_TOKENS', '0')),
+            monthly_token_quota=int(os.getenv('BREVIOBOT_QUOTA_MONTHLY_TOKENS', '0')),
+            daily_audio_seconds_quota=int(os.getenv('BREVIOBOT_QUOTA_DAILY_AUDIO_SECONDS', '0')),
+            monthly_audio_seconds_quota=int(os.getenv('BREVIOBOT_QUOTA_MONTHLY_AUDIO_SECONDS', '0')),
+            flush_interval_seconds=int(os.getenv('BREVIOBOT_USAGE_FLUSH_INTERVAL_SECONDS', '10')),
+            flush_batch_size=int(os.getenv('BREVIOBOT_USAGE_FLUSH_BATCH_SIZE', '100'))
+        )
+
+        self.calendar = CalendarSettings(
+            credential_refresh_margin_seconds=int(os.getenv('BREVIOBOT_GOOGLE_REFRESH_MARGIN_SECONDS', '300')),
+            service_cache_idle_seconds=int(os.getenv('BREVIOBOT_GOOGLE_SERVICE_CACHE_IDLE_SECONDS', '3600')),
+            service_cache_max_entries=int(os.getenv('BREVIOBOT_GOOGLE_SERVICE_CACHE_MAX_ENTRIES', '1000')),
+            event_cache_enabled=os.getenv('BREVIOBOT_GOOGLE_EVENT_CACHE_ENABLED', 'true').lower() == 'true',
+            event_sync_interval_seconds=int(os.getenv('BREVIOBOT_GOOGLE_EVENT_SYNC_INTERVAL_SECONDS', '60')),
+            event_cache_max_calendars=int(os.getenv('BREVIOBOT_GOOGLE_EVENT_CACHE_MAX_CALENDARS', '1000')),
+            # Window of the first full sync around now; a query outside it widens it with a full resync
+            event_sync_past_days=int(os.getenv('BREVIOBOT_GOOGLE_EVENT_SYNC_PAST_DAYS', '30')),
+            event_sync_future_days=int(os.getenv('BREVIOBOT_GOOGLE_EVENT_SYNC_FUTURE_DAYS', '180')),
+            multi_calendar_max_workers=int(os.getenv('BREVIOBOT_GOOGLE_MULTI_CALENDAR_MAX_WORKERS', '8')),
+            # Overrides https://www.googleapis.com, e.g. to point at a local stand-in for benchmarks
+            api_endpoint=os.getenv('BREVIOBOT_GOOGLE_API_ENDPOINT', '')
+        )
+
+        self.toolcalls = ToolCallSettings(
+            max_rounds=int(os.getenv('BREVIOBOT_TOOLCALL_MAX_ROUNDS', '3')),
+            max_parallel_tools=int(os.getenv('BREVIOBOT_TOOLCALL_MAX_PARALLEL_TOOLS', '4')),
+            local_parser_enabled=os.getenv('BREVIOBOT_LOCAL_DATE_PARSER_ENABLED', 'true').lower() == 'true',
+            local_parser_min_confidence=float(os.getenv('BREVIOBOT_LOCAL_DATE_PARSER_MIN_CONFIDENCE', '0.9')),
+            result_cache_max_entries=int(os.getenv('BREVIOBOT_TOOL_CACHE_MAX_ENTRIES', '512'))
+        )
+
+        self.sessions = SessionSettings(
+            max_sessions=int(os.getenv('BREVIOBOT_SESSION_MAX_SESSIONS', '1000')),
+            idle_ttl_seconds=int(os.getenv('BREVIOBOT_SESSION_IDLE_TTL_SECONDS', '1800')),
+            max_turns=int(os.getenv('BREVIOBOT_SESSION_MAX_TURNS', '4')),
+            max_summary_chars=int(os.getenv('BREVIOBOT_SESSION_MAX_SUMMARY_CHARS', '2000'))
+        )
+
+        # embedding_backend: "local" (offline hashing embedder), "openai" or "ollama". Off by default:
+        # a reused summary belongs to another input, so enable it with a semantic embedder where
+        # users send the same emails again
+        self.summary_dedup = SummaryDedupSettings(
+            enabled=os.getenv('BREVIOBOT_SUMMARY_DEDUP_ENABLED', 'false').lower() == 'true',
+            embedding_backend=os.getenv('BREVIOBOT_SUMMARY_DEDUP_EMBEDDING_BACKEND', 'local'),
+            embedding_model=os.getenv('BREVIOBOT_SUMMARY_DEDUP_EMBEDDING_MODEL', ''),
+            similarity_threshold=float(os.getenv('BREVIOBOT_SUMMARY_DEDUP_THRESHOLD', '0.92')),
+            max_entries_per_user=int(os.getenv('BREVIOBOT_SUMMARY_DEDUP_MAX_ENTRIES_PER_USER', '200')),
+            max_users=int(os.getenv('BREVIOBOT_SUMMARY_DEDUP_MAX_USERS', '1000')),
+            min_words=int(os.getenv('BREVIOBOT_SUMMARY_DEDUP_MIN_WORDS', '20'))
+        )
+
+        # ollama_models are always registered, even when discovery is disabled or Ollama is down
+        self.models = ModelSettings(
+            ollama_models=[m for m in os.getenv('BREVIOBOT_OLLAMA_MODELS', 'llama3').split(',') if m],
+            ollama_discovery_enabled=os.getenv('BREVIOBOT_OLLAMA_DISCOVERY_ENABLED', 'true').lower() == 'true',
+            ollama_discovery_ttl_seconds=int(os.getenv('BREVIOBOT_OLLAMA_DISCOVERY_TTL_SECONDS', '300')),
+            ollama_discovery_timeout_seconds=float(os.getenv('BREVIOBOT_OLLAMA_DISCOVERY_TIMEOUT_SECONDS', '2')),
+            ollama_default_context_window=int(os.getenv('BREVIOBOT_OLLAMA_DEFAULT_CONTEXT_WINDOW', '8192')),
+            latency_ewma_alpha=float(os.getenv('BREVIOBOT_MODEL_LATENCY_EWMA_ALPHA', '0.2'))
+        )
+
+        # Used by model="auto"; an empty local/remote model means the fastest Ollama / cheapest OpenAI backend
+        self.routing = RoutingSettings(
+            local_max_input_tokens=int(os.getenv('BREVIOBOT_ROUTER_LOCAL_MAX_INPUT_TOKENS', '1000')),
+            local_languages=os.getenv('BREVIOBOT_ROUTER_LOCAL_LANGUAGES', 'en,it').split(','),
+            local_max_queue_depth=int(os.getenv('BREVIOBOT_ROUTER_LOCAL_MAX_QUEUE_DEPTH', '4')),
+            local_model=os.getenv('BREVIOBOT_ROUTER_LOCAL_MODEL', ''),
+            remote_model=os.getenv('BREVIOBOT_ROUTER_REMOTE_MODEL', '')
+        )
+
+        # parallel_slots should match the Ollama server's OLLAMA_NUM_PARALLEL; serve.py splits it between workers
+        self.ollama = OllamaSchedulerSettings(
+            parallel_slots=int(os.getenv('BREVIOBOT_OLLAMA_PARALLEL_SLOTS', '4')),
+            max_queue_depth=int(os.getenv('BREVIOBOT_OLLAMA_MAX_QUEUE_DEPTH', '32')),
+            batch_window_ms=int(os.getenv('BREVIOBOT_OLLAMA_BATCH_WINDOW_MS', '10')),
+            keep_alive=os.getenv('BREVIOBOT_OLLAMA_KEEP_ALIVE', '5m'),
+            # The loaded model gives up its slots after this many batches in a row, or sooner
+            # once another model's oldest request has waited max_model_wait_ms
+            max_consecutive_batches=int(os.getenv('BREVIOBOT_OLLAMA_MAX_CONSECUTIVE_BATCHES', '4')),
+            max_model_wait_ms=int(os.getenv('BREVIOBOT_OLLAMA_MAX_MODEL_WAIT_MS', '2000'))
+        )
+
+        # Backend timeouts are request_timeout times the backend's multiplier
+        self.resilience = ResilienceSettings(
+            max_retries=int(os.getenv('BREVIOBOT_RETRY_MAX_RETRIES', '2')),
+            retry_base_delay_ms=int(os.getenv('BREVIOBOT_RETRY_BASE_DELAY_MS', '200')),
+            retry_max_delay_ms=int(os.getenv('BREVIOBOT_RETRY_MAX_DELAY_MS', '2000')),
+            breaker_failure_threshold=int(os.getenv('BREVIOBOT_BREAKER_FAILURE_THRESHOLD', '5')),
+            breaker_reset_seconds=float(os.getenv('BREVIOBOT_BREAKER_RESET_SECONDS', '30')),
+            timeout_multipliers={
+                "openai": 1.0,
+                "ollama": float(os.getenv('BREVIOBOT_OLLAMA_TIMEOUT_MULTIPLIER', '4')),
+                "whisper_api": float(os.getenv('BREVIOBOT_WHISPER_API_TIMEOUT_MULTIPLIER', '4'))
+            }
+        )
+
+        # exporter: "none", "file" (OTLP/JSON lines) or "otlp" (OTLP/HTTP collector)
+        self.tracing = TracingSettings(
+            enabled=os.getenv('BREVIOBOT_TRACING_ENABLED', 'true').lower() == 'true',
+            exporter=os.getenv('BREVIOBOT_TRACING_EXPORTER', 'none'),
+            file_path=os.getenv('BREVIOBOT_TRACING_FILE', 'traces/spans.jsonl'),
+            otlp_endpoint=os.getenv('BREVIOBOT_TRACING_OTLP_ENDPOINT', 'http://localhost:4318/v1/traces'),
+            service_name=os.getenv('BREVIOBOT_TRACING_SERVICE_NAME', 'breviobot-service'),
+            slow_request_ms=int(os.getenv('BREVIOBOT_SLOW_REQUEST_MS', '2000'))
+        )
+
+        # With several worker processes, point multiprocess_dir at a directory shared by all of them
+        self.metrics = MetricsSettings(
+            enabled=os.getenv('BREVIOBOT_METRICS_ENABLED', 'true').lower() == 'true',
+            multiprocess_dir=os.getenv('BREVIOBOT_METRICS_DIR', ''),
+            flush_interval_seconds=float(os.getenv('BREVIOBOT_METRICS_FLUSH_INTERVAL_SECONDS', '5'))
+        )
+
+        # Module keys are dotted paths inside the service ("calendars", "text.handlers");
+        # sample rates keep that fraction of INFO and DEBUG records, warnings are never sampled
+        self.logging = LoggingSettings(
+            level=os.getenv('BREVIOBOT_LOG_LEVEL', 'INFO').upper(),
+            format=os.getenv('BREVIOBOT_LOG_FORMAT', 'json'),
+            file_path=os.getenv('BREVIOBOT_LOG_FILE', ''),
+            module_levels=_parse_mapping(os.getenv('BREVIOBOT_LOG_LEVELS', ''), str.upper),
+            info_sample_rates=_parse_mapping(os.getenv('BREVIOBOT_LOG_SAMPLE_RATES', ''), float),
+            queue_size=int(os.getenv('BREVIOBOT_LOG_QUEUE_SIZE', '10000'))
+        )
+
+        # Whisper sizes default to the configured local model; Ollama models to the static list
+        self.warmup = WarmupSettings(
+            enabled=os.getenv('BREVIOBOT_WARMUP_ENABLED', 'true').lower() == 'true',
+            whisper_model_sizes=[m.strip() for m in os.getenv(
+                'BREVIOBOT_WARMUP_WHISPER_MODELS', '' if self.whisper.use_api else self.whisper.model_size
+            ).split(',') if m.strip()],
+            ollama_models=[m.strip() for m in os.getenv(
+                'BREVIOBOT_WARMUP_OLLAMA_MODELS', ','.join(self.models.ollama_models)
+            ).split(',') if m.strip()],
+            db_connections=int(os.getenv('BREVIOBOT_WARMUP_DB_CONNECTIONS', '5')),
+            openai=os.getenv('BREVIOBOT_WARMUP_OPENAI', 'true').lower() == 'true',
+            google=os.getenv('BREVIOBOT_WARMUP_GOOGLE', 'true').lower() == 'true'
+        )
+
+        # Production launcher (serve.py): processes scale transcription across cores, threads cover
+        # requests waiting on LLM and Google calls; workers are recycled after max_requests (plus jitter).
+        # One worker by default: conversation sessions live in the worker that created them, so more
+        # workers need sticky routing for /api/text/ask and a shared rate-limit store
+        self.server = ServerSettings(
+            workers=int(os.getenv('BREVIOBOT_WORKERS', '1')),
+            threads=int(os.getenv('BREVIOBOT_THREADS', '8')),
+            preload=os.getenv('BREVIOBOT_PRELOAD', 'true').lower() == 'true',
+            max_requests=int(os.getenv('BREVIOBOT_MAX_REQUESTS', '1000')),
+            max_requests_jitter=int(os.getenv('BREVIOBOT_MAX_REQUESTS_JITTER', '100')),
+            timeout=int(os.getenv('BREVIOBOT_WORKER_TIMEOUT', '120')),
+            graceful_timeout=int(os.getenv('BREVIOBOT_GRACEFUL_TIMEOUT', '30')),
+            keepalive=int(os.getenv('BREVIOBOT_KEEPALIVE', '5'))
+        )
+
+        # Request classes: auth, short_text, long_text, audio, calendar. slots bounds the requests a
+        # process runs at once; audio and long_text may only take part of them, so quick requests
+        # always find a slot. Mappings override the defaults per class, e.g. "audio=2,long_text=2"
+        admission_slots = int(os.getenv('BREVIOBOT_ADMISSION_SLOTS', str(self.server.threads)))
+        self.admission = AdmissionSettings(
+            enabled=os.getenv('BREVIOBOT_ADMISSION_ENABLED', 'true').lower() == 'true',
+            slots=admission_slots,
+            weights=dict(
+                {"auth": 4.0, "short_text": 3.0, "calendar": 2.0, "long_text": 1.0, "audio": 1.0},
+                **_parse_mapping(os.getenv('BREVIOBOT_ADMISSION_WEIGHTS', ''), float)
+            ),
+            concurrency=dict(
+                {"auth": admission_slots, "short_text": admission_slots, "calendar": admission_slots,
+                 "long_text": max(1, admission_slots // 4), "audio": max(1, admission_slots // 4)},
+                **_parse_mapping(os.getenv('BREVIOBOT_ADMISSION_CONCURRENCY', ''), int)
+            ),
+            queue_depths=dict(
+                {"auth": 32, "short_text": 32, "calendar": 16, "long_text": 8, "audio": 4},
+                **_parse_mapping(os.getenv('BREVIOBOT_ADMISSION_QUEUE_DEPTHS', ''), int)
+            ),
+            max_wait_seconds=float(os.getenv('BREVIOBOT_ADMISSION_MAX_WAIT_SECONDS', '10')),
+            long_text_bytes=int(os.getenv('BREVIOBOT_ADMISSION_LONG_TEXT_BYTES', '2048'))
+        )
+        # A class with no slots could never be admitted and has no expected wait to report
+        invalid = [name for name, limit in self.admission.concurrency.items() if limit < 1]
+        if self.admission.slots < 1 or invalid:
+            raise ValueError("Configuration errors: BREVIOBOT_ADMISSION_SLOTS and BREVIOBOT_ADMISSION_CONCURRENCY "
+                             f"must be at least 1 (got slots={self.admission.slots}, invalid classes={invalid})")
+
+        # algorithms in server preference order; br and zstd are only offered when the brotli and
+        # zstandard packages are installed. Levels favour speed, responses are compressed per request
+        self.compression = CompressionSettings(
+            enabled=os.getenv('BREVIOBOT_COMPRESSION_ENABLED', 'true').lower() == 'true',
+            min_size_bytes=int(os.getenv('BREVIOBOT_COMPRESSION_MIN_SIZE', '1024')),
+            algorithms=[a.strip() for a in os.getenv('BREVIOBOT_COMPRESSION_ALGORITHMS', 'zstd,br,gzip').split(',') if a.strip()],
+            gzip_level=int(os.getenv('BREVIOBOT_COMPRESSION_GZIP_LEVEL', '5')),
+            brotli_quality=int(os.getenv('BREVIOBOT_COMPRESSION_BROTLI_QUALITY', '4')),
+            zstd_level=int(os.getenv('BREVIOBOT_COMPRESSION_ZSTD_LEVEL', '3'))
+        )
+
         self.google_client_secret = SimpleNamespace(
             credentials_json=os.getenv('GOOGLE_CLIENT_SECRET_PATH', '')
         )
@@ -0,0 +1,231 @@
+import contextvars
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Optional
+import requests
+from core.logger import logger, request_id_var
+from core.settings import settings
+
+_current_trace = contextvars.ContextVar("breviobot_trace", default=None)
+_current_span = contextvars.ContextVar("breviobot_span", default=None)
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int
+    end_ns: int = 0
+    attributes: dict = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+
+@dataclass
+class Trace:
+    trace_id: str
+    request_id: str
+    spans: list = field(default_factory=list)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+
+def current_request_id() -> Optional[str]:
+    trace = _current_trace.get()
+    return trace.request_id if trace else None
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Times a stage of the current request. Outside a request (or with tracing
+    disabled) nothing is recorded. Spans nest through contextvars; worker
+    threads must run under contextvars.copy_context() to join the trace.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+    parent = _current_span.get()
+    current = Span(
+        name=name,
+        trace_id=trace.trace_id,
+        span_id=uuid.uuid4().hex[:16],
+        parent_id=parent.span_id if parent else None,
+        start_ns=time.time_ns(),
+        attributes=attributes
+    )
+    token = _current_span.set(current)
+    try:
+        yield current
+    except Exception as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        _current_span.reset(token)
+        with trace.lock:
+            trace.spans.append(current)
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(spans: list) -> dict:
+    """OTLP/JSON ExportTraceServiceRequest for a list of spans."""
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": settings.tracing.service_name}}]},
+        "scopeSpans": [{
+            "scope": {"name": "breviobot"},
+            "spans": [{
+                "traceId": s.trace_id,
+                "spanId": s.span_id,
+                **({"parentSpanId": s.parent_id} if s.parent_id else {}),
+                "name": s.name,
+                "kind": 2 if s.parent_id is None else 1,
+                "startTimeUnixNano": str(s.start_ns),
+                "endTimeUnixNano": str(s.end_ns),
+                "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+                "status": {"code": 2, "message": s.error} if s.error else {"code": 1}
+            } for s in spans]
+        }]
+    }]}
+
+
+class SpanExporter:
+    """
+    Exports finished traces from a background thread so requests never wait
+    on disk or network I/O. "file" appends one OTLP/JSON document per line;
+    "otlp" posts to an OTLP/HTTP collector (e.g. http://localhost:4318/v1/traces).
+    Traces are dropped when the queue is full.
+    """
+
+    def __init__(self, mode: str, file_path: str, endpoint: str, max_queue: int = 1000):
+        self.mode = mode
+        self.file_path = file_path
+        self.endpoint = endpoint
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def export(self, spans: list):
+        if self.mode == "none":
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                self._thread.start()
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < 100:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            except Exception as e:
+                logger.warning(f"[Tracing] Span export failed: {e}")
+
+    def _write(self, batch: list):
+        if self.mode == "file":
+            directory = os.path.dirname(self.file_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.file_path, "a", encoding="utf-8") as f:
+                for spans in batch:
+                    f.write(json.dumps(to_otlp(spans)) + "\n")
+        elif self.mode == "otlp":
+            spans = [s for trace_spans in batch for s in trace_spans]
+            requests.post(self.endpoint, json=to_otlp(spans), timeout=5).raise_for_status()
+
+
+span_exporter = SpanExporter(
+    mode=settings.tracing.exporter,
+    file_path=settings.tracing.file_path,
+    endpoint=settings.tracing.otlp_endpoint
+)
+
+
+def _breakdown(trace: Trace, root: Span) -> str:
+    stages = sorted((s for s in trace.spans if s is not root), key=lambda s: s.start_ns)
+    depth = {root.span_id: 0}
+    lines = []
+    for s in stages:
+        depth[s.span_id] = depth.get(s.parent_id, 0) + 1
+        error = f" error={s.error}" if s.error else ""
+        lines.append(f"{'  ' * depth[s.span_id]}{s.name} {s.duration_ms:.1f}ms "
+                     f"(+{(s.start_ns - root.start_ns) / 1e6:.1f}ms){error}")
+    return "\n".join(lines)
+
+
+def init_tracing(app):
+    """Opens a root span per request and propagates the request id to logs and the response."""
+    if not settings.tracing.enabled:
+        return
+
+    from flask import g, request
+
+    @app.before_request
+    def _start_trace():
+        request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+        trace = Trace(trace_id=uuid.uuid4().hex, request_id=request_id[:64])
+        g._trace_tokens = (_current_trace.set(trace), request_id_var.set(trace.request_id))
+        g._trace_root = span(f"{request.method} {request.url_rule.rule if request.url_rule else request.path}",
+                             **{"http.method": request.method, "http.target": request.path, "request.id": trace.request_id})
+        g._trace_root_span = g._trace_root.__enter__()
+
+    @app.after_request
+    def _add_request_id(response):
+        request_id = current_request_id()
+        if request_id:
+            response.headers["X-Request-ID"] = request_id
+        root = g.get("_trace_root_span")
+        if root is not None:
+            root.set_attribute("http.status_code", response.status_code)
+        return response
+
+    @app.teardown_request
+    def _finish_trace(error=None):
+        root_cm = g.pop("_trace_root", None)
+        if root_cm is None:
+            return
+        root = g.pop("_trace_root_span")
+        trace = _current_trace.get()
+        if error is not None:
+            root.error = f"{type(error).__name__}: {error}"
+        root_cm.__exit__(None, None, None)
+        trace_token, request_id_token = g.pop("_trace_tokens")
+        _current_trace.reset(trace_token)
+        if root.duration_ms >= settings.tracing.slow_request_ms:
+            logger.warning(f"Slow request {root.name} took {root.duration_ms:.1f}ms "
+                           f"(request id {trace.request_id}):\n{_breakdown(trace, root)}")
+        span_exporter.export(list(trace.spans))
+        request_id_var.reset(request_id_token)
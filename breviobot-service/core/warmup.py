@@ -0,0 +1,176 @@
+import os
+import threading
+import time
+from core.logger import logger
+from core.metrics import metrics
+from core.settings import settings
+
+
+class Warmup:
+    """
+    Startup steps that load models and open pools before traffic arrives.
+    start() runs them on a background thread; /ready answers 503 until they
+    have finished. Launchers call start() after forking; under any other WSGI
+    server the first request (typically the readiness probe) starts it. A failed step is logged and reported but does not keep the
+    process unready: its backend is then loaded lazily on first use.
+    State is per process, so a forked worker warms up again.
+    """
+
+    def __init__(self):
+        self._steps = {}
+        self._results = {}
+        self._state = "pending"
+        self._lock = threading.Lock()
+
+    def step(self, name: str):
+        def decorator(func):
+            self._steps[name] = func
+            return func
+        return decorator
+
+    def run(self, names=None):
+        """Runs the given steps (all by default) on the calling thread."""
+        for name in names or list(self._steps):
+            started = time.perf_counter()
+            try:
+                detail = self._steps[name]()
+            except Exception as e:
+                logger.warning(f"[Warmup] Step '{name}' failed: {e}")
+                result = {"ok": False, "error": str(e)}
+            else:
+                result = {"ok": True, "detail": detail}
+            result["ms"] = round((time.perf_counter() - started) * 1000, 1)
+            with self._lock:
+                self._results[name] = result
+            logger.info("[Warmup] %s finished in %.0fms", name, result["ms"])
+
+    def start(self):
+        if self._state != "pending":
+            return
+        with self._lock:
+            if self._state != "pending":
+                return
+            self._state = "running"
+        if not settings.warmup.enabled:
+            self._finish()
+            return
+        threading.Thread(target=self._run_all, name="warmup", daemon=True).start()
+
+    def _run_all(self):
+        try:
+            self.run()
+        finally:
+            self._finish()
+
+    def _finish(self):
+        with self._lock:
+            self._state = "ready"
+
+    def _reset_after_fork(self):
+        self._lock = threading.Lock()
+        self._state = "pending"
+
+    @property
+    def ready(self) -> bool:
+        return self._state == "ready" or not settings.warmup.enabled
+
+    def status(self) -> dict:
+        with self._lock:
+            return {"status": "ready" if self.ready else self._state, "steps": dict(self._results)}
+
+
+warmup = Warmup()
+os.register_at_fork(after_in_child=warmup._reset_after_fork)
+
+
+@warmup.step("database")
+def _open_db_pool():
+    from persistence.db_session import engine
+    # Checked out together so the pool ends up holding that many open connections; beyond
+    # pool_size they would be overflow connections, closed again at check-in
+    pool_size = engine.pool.size() if hasattr(engine.pool, "size") else 1
+    connections = [engine.connect() for _ in range(min(settings.warmup.db_connections, pool_size))]
+    try:
+        for connection in connections:
+            connection.exec_driver_sql("SELECT 1")
+    finally:
+        for connection in connections:
+            connection.close()
+    return {"connections": len(connections)}
+
+
+@warmup.step("whisper")
+def _load_whisper_models():
+    if "stt" not in settings.api.blueprints or not settings.warmup.whisper_model_sizes:
+        return {"skipped": True}
+    from stt.transcribers import get_whisper_model
+    for model_size in settings.warmup.whisper_model_sizes:
+        get_whisper_model(model_size)
+    return {"models": settings.warmup.whisper_model_sizes}
+
+
+@warmup.step("ollama")
+def _pin_ollama_models():
+    if "text" not in settings.api.blueprints:
+        return {"skipped": True}
+    from text.model_registry import model_registry
+    from text.ollama_scheduler import ollama_scheduler
+    if settings.models.ollama_discovery_enabled:
+        model_registry.discover_ollama()
+    pinned = []
+    for model in settings.warmup.ollama_models:
+        try:
+            ollama_scheduler.preload(model)
+            pinned.append(model)
+        except Exception as e:
+            logger.warning(f"[Warmup] Could not preload Ollama model '{model}': {e}")
+    return {"models": pinned}
+
+
+@warmup.step("openai")
+def _open_openai_connections():
+    enabled = {"text", "stt"} & set(settings.api.blueprints)
+    if not settings.warmup.openai or not enabled or not settings.is_openai_configured():
+        return {"skipped": True}
+    from core.openai_clients import get_openai_client
+    from core.resilience import backend_timeout
+    backends = (["openai"] if "text" in enabled else []) + (["whisper_api"] if "stt" in enabled else [])
+    for backend in backends:
+        # Any cheap call leaves an open TLS connection in the client's pool
+        get_openai_client(settings.app.openai_api_key, backend_timeout(backend)).models.list()
+    return {"clients": backends}
+
+
+@warmup.step("google")
+def _load_google_client():
+    if not settings.warmup.google or not {"calendar", "text"} & set(settings.api.blueprints):
+        return {"skipped": True}
+    from calendars.service_cache import preload_client
+    preload_client()
+    return {}
+
+
+metrics.register_callback("breviobot_ready", "1 once startup warmup has finished", (),
+                          lambda: {(): 1 if warmup.ready else 0})
+
+
+def init_warmup(app):
+    """Serves /health (liveness) and /ready (warmup finished); both unauthenticated."""
+    from flask import jsonify
+
+    @app.before_request
+    def _start_warmup():
+        warmup.start()
+
+    @app.route("/health", endpoint="health")
+    def _health():
+        return jsonify({"status": "ok"})
+
+    @app.route("/ready", endpoint="ready")
+    def _ready():
+        status = warmup.status()
+        if warmup.ready:
+            return jsonify(status)
+        response = jsonify(status)
+        response.headers["Retry-After"] = "1"
+        return response, 503
@@ -0,0 +1,34 @@
+"""Add usage_records table
+
+Revision ID: 005_add_usage_records_table
+Revises: 004_add_user_google_tokens_table
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005_add_usage_records_table'
+down_revision = '004_add_user_google_tokens_table'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'usage_records',
+        sa.Column('id', sa.Integer(), primary_key=True, index=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('endpoint', sa.String(), nullable=False),
+        sa.Column('model', sa.String(), nullable=True),
+        sa.Column('prompt_tokens', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('completion_tokens', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('audio_seconds', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(), nullable=False)
+    )
+    op.create_index('ix_usage_records_user_id', 'usage_records', ['user_id'])
+    op.create_index('ix_usage_records_created_at', 'usage_records', ['created_at'])
+
+def downgrade():
+    op.drop_index('ix_usage_records_created_at', table_name='usage_records')
+    op.drop_index('ix_usage_records_user_id', table_name='usage_records')
+    op.drop_table('usage_records')
@@ -0,0 +1,34 @@
+"""Add refresh_tokens table
+
+Revision ID: 006_add_refresh_tokens_table
+Revises: 005_add_usage_records_table
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006_add_refresh_tokens_table'
+down_revision = '005_add_usage_records_table'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'refresh_tokens',
+        sa.Column('id', sa.Integer(), primary_key=True, index=True),
+        sa.Column('jti', sa.String(), nullable=False),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('revoked_at', sa.DateTime(), nullable=True),
+        sa.Column('replaced_by', sa.String(), nullable=True)
+    )
+    op.create_index('ix_refresh_tokens_jti', 'refresh_tokens', ['jti'], unique=True)
+    op.create_index('ix_refresh_tokens_user_id', 'refresh_tokens', ['user_id'])
+    op.create_index('ix_refresh_tokens_expires_at', 'refresh_tokens', ['expires_at'])
+
+def downgrade():
+    op.drop_index('ix_refresh_tokens_expires_at', table_name='refresh_tokens')
+    op.drop_index('ix_refresh_tokens_user_id', table_name='refresh_tokens')
+    op.drop_index('ix_refresh_tokens_jti', table_name='refresh_tokens')
+    op.drop_table('refresh_tokens')
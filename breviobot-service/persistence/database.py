@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, LargeBinary, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, LargeBinary, ForeignKey, Float, DateTime
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
@@ -20,3 +20,23 @@ class UserGoogleToken(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey('users.id'), unique=True, nullable=False)
     token = Column(LargeBinary, nullable=False)
+
+class UsageRecord(Base):
+    __tablename__ = 'usage_records'
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey('users.id'), index=True, nullable=False)
+    endpoint = Column(String, nullable=False)
+    model = Column(String, nullable=True)
+    prompt_tokens = Column(Integer, nullable=False, default=0)
+    completion_tokens = Column(Integer, nullable=False, default=0)
+    audio_seconds = Column(Float, nullable=False, default=0.0)
+    created_at = Column(DateTime, index=True, nullable=False)
+
+class RefreshToken(Base):
+    __tablename__ = 'refresh_tokens'
+    id = Column(Integer, primary_key=True, index=True)
+    jti = Column(String, unique=True, index=True, nullable=False)
+    user_id = Column(Integer, ForeignKey('users.id'), index=True, nullable=False)
+    expires_at = Column(DateTime, index=True, nullable=False)
+    revoked_at = Column(DateTime, nullable=True)
+    replaced_by = Column(String, nullable=True)  # JTI of the token issued on rotation
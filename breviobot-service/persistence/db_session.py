@@ -1,13 +1,40 @@
+import os
+import time
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
 from .database import Base
 from core.settings import settings
+from core.metrics import metrics, DB_POOL_WAIT
 
 DATABASE_URL = settings.app.database_url
 
+def _timed_pool_class(pool_class):
+    # Checkout wait is not exposed by pool events, so connect is timed in a subclass of the
+    # dialect's pool; dispose() recreates the pool from its class, so forked workers keep it
+    class TimedPool(pool_class):
+        def connect(self):
+            started = time.perf_counter()
+            try:
+                return super().connect()
+            finally:
+                DB_POOL_WAIT.observe(time.perf_counter() - started)
+
+    TimedPool.__name__ = f"Timed{pool_class.__name__}"
+    return TimedPool
+
+_url = make_url(DATABASE_URL)
 engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
+    DATABASE_URL,
+    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {},
+    poolclass=_timed_pool_class(_url.get_dialect().get_pool_class(_url))
 )
+metrics.register_callback("breviobot_db_pool_checked_out", "Database connections currently checked out", (),
+                          lambda: {(): engine.pool.checkedout()} if hasattr(engine.pool, "checkedout") else {})
+
+# A forked worker must not reuse sockets opened by its parent; close=False leaves them to the parent
+os.register_at_fork(after_in_child=lambda: engine.dispose(close=False))
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def init_db():
@@ -1,4 +1,5 @@
-from .database import UserDB, UserGoogleToken
+from .database import UserDB, UserGoogleToken, UsageRecord, RefreshToken
+from sqlalchemy import func
 import bcrypt
 
 class UserRepository:
@@ -53,4 +54,82 @@ class UserGoogleTokenRepository:
         else:
             record = UserGoogleToken(user_id=user_id, token=token_blob)
             self.db.add(record)
-        self.db.commit()
\ No newline at end of file
+        self.db.commit()
+
+class UsageRepository:
+    def __init__(self, db):
+        self.db = db
+
+    def add_many(self, records):
+        self.db.bulk_save_objects([UsageRecord(**record) for record in records])
+        self.db.commit()
+
+    def get_totals(self, user_id, since) -> dict:
+        row = self.db.query(
+            func.coalesce(func.sum(UsageRecord.prompt_tokens), 0),
+            func.coalesce(func.sum(UsageRecord.completion_tokens), 0),
+            func.coalesce(func.sum(UsageRecord.audio_seconds), 0.0)
+        ).filter(UsageRecord.user_id == user_id, UsageRecord.created_at >= since).one()
+        return {
+            "prompt_tokens": int(row[0]),
+            "completion_tokens": int(row[1]),
+            "audio_seconds": float(row[2])
+        }
+
+class RefreshTokenRepository:
+    def __init__(self, db):
+        self.db = db
+
+    def get(self, jti) -> 'RefreshToken | None':
+        return self.db.query(RefreshToken).filter_by(jti=jti).first()
+
+    def add(self, jti, user_id, expires_at):
+        self.db.add(RefreshToken(jti=jti, user_id=user_id, expires_at=expires_at))
+        self.db.commit()
+
+    def revoke(self, jti, revoked_at, replaced_by=None) -> bool:
+        # Conditional update so concurrent rotations of the same token cannot both succeed
+        updated = self.db.query(RefreshToken).filter(
+            RefreshToken.jti == jti,
+            RefreshToken.revoked_at.is_(None)
+        ).update({"revoked_at": revoked_at, "replaced_by": replaced_by}, synchronize_session=False)
+        self.db.commit()
+        return updated > 0
+
+    def revoke_all_for_user(self, user_id, revoked_at) -> list:
+        query = self.db.query(RefreshToken).filter(
+            RefreshToken.user_id == user_id,
+            RefreshToken.revoked_at.is_(None)
+        )
+        jtis = [record.jti for record in query.all()]
+        query.update({"revoked_at": revoked_at}, synchronize_session=False)
+        self.db.commit()
+        return jtis
+
+    def revoke_descendants(self, jti, revoked_at) -> list:
+        # Follows the rotation chain from jti and revokes the tokens still active in it
+        jtis = []
+        record = self.get(jti)
+        while record is not None and record.replaced_by:
+            record = self.get(record.replaced_by)
+            if record is not None and record.revoked_at is None:
+                jtis.append(record.jti)
+        if jtis:
+            self.db.query(RefreshToken).filter(
+                RefreshToken.jti.in_(jtis),
+                RefreshToken.revoked_at.is_(None)
+            ).update({"revoked_at": revoked_at}, synchronize_session=False)
+            self.db.commit()
+        return jtis
+
+    def get_revoked_jtis(self, now) -> list:
+        rows = self.db.query(RefreshToken.jti).filter(
+            RefreshToken.revoked_at.isnot(None),
+            RefreshToken.expires_at > now
+        ).all()
+        return [row[0] for row in rows]
+
+    def delete_expired(self, now) -> int:
+        deleted = self.db.query(RefreshToken).filter(RefreshToken.expires_at <= now).delete(synchronize_session=False)
+        self.db.commit()
+        return deleted
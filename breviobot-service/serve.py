@@ -0,0 +1,119 @@
+"""
+Production launcher: serves create_app() with gunicorn, using worker
+processes for CPU-bound transcription and threads per worker for requests
+that wait on LLM, Google and SMTP calls. Settings come from BREVIOBOT_*
+(see ServerSettings); run from the service root:
+
+    BREVIOBOT_WORKERS=4 BREVIOBOT_THREADS=8 python serve.py
+
+With preload enabled the app is built once in the master and workers fork
+from it, sharing its imported modules and heap copy-on-write. Signals to the
+master: HUP re-reads the configuration and gracefully replaces the workers,
+TERM drains in-flight requests (up to graceful_timeout) and exits. A
+preloaded master keeps its code across HUP, so deploy new code with USR2
+(starts a new master) followed by TERM to the old one.
+
+State that is still per process when running several workers: conversation
+sessions (/api/text/ask follow-ups must reach the worker holding the
+session) and, unless BREVIOBOT_RATE_LIMIT_STORAGE_URI points at a shared
+store such as Redis, rate-limit counters. BREVIOBOT_WORKERS therefore
+defaults to 1. The Ollama parallel slots are divided between the workers.
+"""
+import gc
+import os
+import tempfile
+from gunicorn.app.base import BaseApplication
+from core.logger import logger
+from core.metrics import metrics
+from core.settings import settings
+
+
+def _preload_shared_state():
+    # Only what survives a fork: imports, files on disk and immutable documents.
+    # Models, pools and connections are opened by each worker's warmup.
+    if "stt" in settings.api.blueprints:
+        from stt.transcribers import prefetch_whisper_model
+        for model_size in settings.warmup.whisper_model_sizes:
+            try:
+                prefetch_whisper_model(model_size)
+            except Exception as e:
+                logger.warning(f"[Server] Could not prefetch Whisper model '{model_size}': {e}")
+    if {"stt", "text"} & set(settings.api.blueprints):
+        import openai  # noqa: F401
+    if settings.warmup.google and {"calendar", "text"} & set(settings.api.blueprints):
+        from calendars.service_cache import preload_client
+        preload_client()
+
+
+def when_ready(server):
+    if settings.server.preload:
+        _preload_shared_state()
+    # Objects allocated so far are never collected; keeping the collector from touching
+    # them keeps their pages shared between the master and the workers
+    gc.freeze()
+    logger.info("[Server] Listening on %s:%s with %s workers x %s threads (%s admission slots)",
+                settings.api.host, settings.api.port, settings.server.workers, _worker_threads(),
+                settings.admission.slots if settings.admission.enabled else "no")
+
+
+def post_fork(server, worker):
+    from core.warmup import warmup
+    warmup.start()
+
+
+def _worker_threads() -> int:
+    # Requests waiting for admission park on their own thread, so a worker needs one
+    # per queue position on top of the threads that run requests
+    if not settings.admission.enabled:
+        return settings.server.threads
+    return settings.server.threads + sum(settings.admission.queue_depths.values())
+
+
+class BrevioBotApplication(BaseApplication):
+    def __init__(self):
+        self.options = {
+            "bind": f"{settings.api.host}:{settings.api.port}",
+            "workers": settings.server.workers,
+            "threads": _worker_threads(),
+            "worker_class": "gthread",
+            "preload_app": settings.server.preload,
+            "max_requests": settings.server.max_requests,
+            "max_requests_jitter": settings.server.max_requests_jitter,
+            "timeout": settings.server.timeout,
+            "graceful_timeout": settings.server.graceful_timeout,
+            "keepalive": settings.server.keepalive,
+            "when_ready": when_ready,
+            "post_fork": post_fork
+        }
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from server import create_app
+        return create_app()
+
+
+def main():
+    if not settings.whisper.cpu_threads:
+        # Workers transcribe in parallel, so each gets its share of the cores
+        settings.whisper.cpu_threads = max(1, (os.cpu_count() or 1) // settings.server.workers)
+    # Every worker runs its own Ollama scheduler; together they should not exceed the server's slots
+    settings.ollama.parallel_slots = max(1, settings.ollama.parallel_slots // settings.server.workers)
+    if settings.server.workers > 1:
+        if settings.api.rate_limit_storage_uri.startswith("memory://"):
+            logger.warning("[Server] Rate limits are counted per worker; set BREVIOBOT_RATE_LIMIT_STORAGE_URI "
+                           "to a shared store so they apply across the %s workers", settings.server.workers)
+        if "text" in settings.api.blueprints:
+            logger.warning("[Server] Conversation sessions live in the worker that created them; "
+                           "route /api/text/ask follow-ups to the same worker or run a single worker")
+    if settings.server.workers > 1 and not settings.metrics.multiprocess_dir:
+        # /metrics is served by one worker at a time and has to see all of them
+        metrics.multiprocess_dir = settings.metrics.multiprocess_dir = tempfile.mkdtemp(prefix="breviobot-metrics-")
+    BrevioBotApplication().run()
+
+
+if __name__ == "__main__":
+    main()
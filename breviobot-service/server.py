@@ -1,7 +1,11 @@
-from auth.routes import auth_bp, auth_limiter
-from stt.routes import stt_bp, stt_limiter
-from text.routes import text_bp, text_limiter
-from calendars.google_routes import calendar_bp, calendar_limiter
+import importlib
+from auth.token_store import refresh_token_store
+from core.tracing import init_tracing
+from core.metrics import init_metrics
+from core.warmup import init_warmup, warmup
+from core.admission import init_admission
+from core.compression import init_compression
+from core.json_provider import OrjsonProvider
 from flask import Flask, jsonify
 from flask_cors import CORS
 from core.settings import settings
@@ -9,14 +13,38 @@ from core.exceptions import ValidationError
 from core.api_utils import (
     handle_validation_error,
     handle_general_error,
-    handle_authentication_error
+    handle_authentication_error,
+    handle_quota_exceeded_error,
+    handle_overloaded_error,
+    handle_model_error
 )
-from core.exceptions import AuthenticationError
+from core.exceptions import AuthenticationError, QuotaExceededError, OverloadedError, ModelError
 from flask_jwt_extended import JWTManager
 from datetime import timedelta
 
-if __name__ == "__main__":
+# Name used in BREVIOBOT_BLUEPRINTS -> (module, blueprint, limiter); only enabled modules are imported
+BLUEPRINTS = {
+    "auth": ("auth.routes", "auth_bp", "auth_limiter"),
+    "stt": ("stt.routes", "stt_bp", "stt_limiter"),
+    "text": ("text.routes", "text_bp", "text_limiter"),
+    "calendar": ("calendars.google_routes", "calendar_bp", "calendar_limiter"),
+    "usage": ("usage.routes", "usage_bp", "usage_limiter")
+}
+
+def _load_blueprints(names) -> list:
+    unknown = [name for name in names if name not in BLUEPRINTS]
+    if unknown:
+        raise ValueError(f"Unknown blueprints in BREVIOBOT_BLUEPRINTS: {', '.join(unknown)}")
+    loaded = []
+    for name in names:
+        module_name, blueprint, limiter = BLUEPRINTS[name]
+        module = importlib.import_module(module_name)
+        loaded.append((getattr(module, blueprint), getattr(module, limiter)))
+    return loaded
+
+def create_app() -> Flask:
     app = Flask(__name__)
+    app.json = OrjsonProvider(app)
     CORS(app, origins=settings.api.cors_origins)
 
     jwt = JWTManager(app)
@@ -33,21 +61,50 @@ if __name__ == "__main__":
     def invalid_token_callback(error):
         return jsonify({"error": "Invalid token"}), 401
 
+    @jwt.revoked_token_loader
+    def revoked_token_callback(jwt_header, jwt_payload):
+        return jsonify({"error": "Token has been revoked"}), 401
+
+    @jwt.token_in_blocklist_loader
+    def check_if_token_revoked(jwt_header, jwt_payload):
+        # Only refresh tokens are tracked; access tokens are short-lived
+        if jwt_payload.get("type") != "refresh" or not refresh_token_store.is_revoked(jwt_payload["jti"]):
+            return False
+        refresh_token_store.handle_revoked_use(jwt_payload["jti"], int(jwt_payload["sub"]))
+        return True
+
     @jwt.unauthorized_loader
     def missing_token_callback(error):
         return jsonify({"error": "Authorization token is required"}), 401
 
-    auth_limiter.init_app(app)
-    stt_limiter.init_app(app)
-    text_limiter.init_app(app)
-    calendar_limiter.init_app(app)
+    # Registered first so the root span covers the other request hooks
+    init_tracing(app)
+    init_metrics(app)
+    # After the metrics hook is registered, so it runs first and request timings include it
+    init_compression(app)
+    init_warmup(app)
 
-    app.register_blueprint(auth_bp)
-    app.register_blueprint(stt_bp)
-    app.register_blueprint(text_bp)
-    app.register_blueprint(calendar_bp)
+    blueprints = _load_blueprints(settings.api.blueprints)
+    app.config["RATELIMIT_ENABLED"] = settings.api.rate_limit_enabled
+    for _, limiter in blueprints:
+        limiter.init_app(app)
+    # After the limiters, so rate-limited requests are rejected before they queue for a slot
+    init_admission(app)
+
+    for blueprint, _ in blueprints:
+        app.register_blueprint(blueprint)
 
     app.errorhandler(AuthenticationError)(handle_authentication_error)
     app.errorhandler(ValidationError)(handle_validation_error)
+    app.errorhandler(QuotaExceededError)(handle_quota_exceeded_error)
+    app.errorhandler(OverloadedError)(handle_overloaded_error)
+    app.errorhandler(ModelError)(handle_model_error)
     app.errorhandler(Exception)(handle_general_error)
-    app.run(host="0.0.0.0", port=8000, debug=True)
+
+    return app
+
+if __name__ == "__main__":
+    # Development server; serve.py runs the app under gunicorn
+    app = create_app()
+    warmup.start()
+    app.run(host=settings.api.host, port=settings.api.port, debug=settings.app.debug_mode)
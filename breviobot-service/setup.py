@@ -13,6 +13,8 @@ setup(
         "pydantic>=2.0.0",
         "faster-whisper>=0.9.0",
         "requests>=2.31.0",
-        "bcrypt>=4.0.0"
+        "bcrypt>=4.0.0",
+        "orjson>=3.8.0",
+        "gunicorn>=22.0.0"
     ]
 )
@@ -8,6 +8,10 @@ from core.settings import settings
 from auth.authenticators import require_auth
 from core.logger import logger
 from stt.transcribers import WhisperAPITranscriber, WhisperLocalTranscriber
+from usage.accounting import usage_tracker
+from core.tracing import span
+from core.metrics import WHISPER_RTF
+import time
 
 @dataclass
 class TranscribeRequest:
@@ -45,6 +49,9 @@ def handle_transcribe_request(request_files, request_form):
     if request_data.use_api and not settings.is_openai_configured():
         raise ValidationError("OpenAI API key not configured for Whisper API transcription")
     
+    user_id = g.current_user.get('user_id') if hasattr(g, 'current_user') else None
+    usage_tracker.check_quota(user_id, audio=True)
+
     user_info = f" for user: {g.current_user['username']}" if hasattr(g, 'current_user') else ""
     logger.info(f"Processing transcription request{user_info} - use_api: {request_data.use_api}, model_size: {request_data.model_size}")
     
@@ -54,17 +61,30 @@ def handle_transcribe_request(request_files, request_form):
     os.makedirs(settings.audio.temp_dir, exist_ok=True)
     
     try:
-        request_data.file.save(temp_path)
+        with span("stt.save_upload"):
+            request_data.file.save(temp_path)
         
         file_size_mb = os.path.getsize(temp_path) / (1024 * 1024)
         if file_size_mb > settings.audio.max_file_size:
             raise ValidationError(f"File size exceeds maximum limit of {settings.audio.max_file_size}MB")
         
-        if request_data.use_api:
-            transcriber = WhisperAPITranscriber()
-        else:
-            transcriber = WhisperLocalTranscriber(request_data.model_size)
-        text = transcriber.transcribe(temp_path)
+        with span("stt.transcriber_init", use_api=request_data.use_api):
+            if request_data.use_api:
+                transcriber = WhisperAPITranscriber()
+            else:
+                transcriber = WhisperLocalTranscriber(request_data.model_size)
+        with span("stt.transcribe"):
+            started = time.perf_counter()
+            text = transcriber.transcribe(temp_path)
+        if transcriber.audio_seconds:
+            WHISPER_RTF.observe((time.perf_counter() - started) / transcriber.audio_seconds,
+                                "api" if request_data.use_api else "local")
+        usage_tracker.record(
+            user_id,
+            "transcribe",
+            model="whisper-1" if request_data.use_api else request_data.model_size,
+            audio_seconds=transcriber.audio_seconds
+        )
         
         logger.info(f"Successfully transcribed audio{user_info}")
         return jsonify({"text": text})
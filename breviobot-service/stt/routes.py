@@ -10,7 +10,8 @@ stt_bp = Blueprint("stt", __name__)
 stt_limiter = Limiter(
     app=None,
     key_func=get_remote_address,
-    default_limits=[f"{settings.api.rate_limit} per minute"]
+    default_limits=[f"{settings.api.rate_limit} per minute"],
+    storage_uri=settings.api.rate_limit_storage_uri
 )
 
 
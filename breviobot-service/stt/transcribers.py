@@ -1,14 +1,75 @@
 import os
+import threading
 from pathlib import Path
-import openai
-from faster_whisper import WhisperModel
 from abc import ABC, abstractmethod
 from core.settings import settings
 from core.logger import logger
+from core.resilience import resilient_call, backend_timeout
+from core.openai_clients import get_openai_client
+
+_models = {}
+_models_lock = threading.Lock()
+
+
+def _whisper_model(model_size: str, device: str, compute_type: str):
+    # faster_whisper pulls in CTranslate2, numpy and PyAV, so it is only imported once a local model is needed
+    from faster_whisper import WhisperModel
+    return WhisperModel(model_size, device=device, compute_type=compute_type,
+                        cpu_threads=settings.whisper.cpu_threads)
+
+
+def _load_whisper_model(model_size: str):
+    device_configs = [
+        ("cuda", "float16"),
+        ("cpu", "int8")
+    ]
+    for device, compute_type in device_configs:
+        try:
+            model = _whisper_model(model_size, device, compute_type)
+            print(f"Whisper initialized with {device.upper()} acceleration ({compute_type})")
+            return model
+        except Exception as e:
+            print(f"Failed to initialize with {device}: {str(e)}")
+            error_msg = str(e).lower()
+            if any(keyword in error_msg for keyword in ['cuda', 'cublas', 'cudnn', 'dll']):
+                print(f"CUDA library issue detected, trying next configuration...")
+            continue
+    raise RuntimeError("Failed to initialize Whisper with any device configuration")
+
+
+def get_whisper_model(model_size: str, cpu_only: bool = False):
+    """
+    Returns the model shared by all requests of this process, loading it on
+    first use or at warmup. cpu_only replaces a model whose GPU runtime failed.
+    """
+    with _models_lock:
+        model = None if cpu_only else _models.get(model_size)
+        if model is None:
+            model = _whisper_model(model_size, "cpu", "int8") if cpu_only else _load_whisper_model(model_size)
+            _models[model_size] = model
+        return model
+
+
+def prefetch_whisper_model(model_size: str) -> str:
+    """
+    Imports faster_whisper and downloads the weights into the local cache
+    without loading them. Used before forking: a loaded model owns CTranslate2
+    threads, which a forked child would not inherit.
+    """
+    from faster_whisper.utils import download_model
+    if os.path.isdir(model_size):
+        return model_size
+    return download_model(model_size)
+
+
+def loaded_whisper_models() -> list:
+    with _models_lock:
+        return list(_models)
+
 
 class AbstractTranscriber(ABC):
     def __init__(self):
-        pass
+        self.audio_seconds = None
 
     @abstractmethod
     def transcribe(self, audio: bytes) -> str:
@@ -18,27 +79,8 @@ class AbstractTranscriber(ABC):
 class WhisperLocalTranscriber(AbstractTranscriber):
     def __init__(self, model_size="base"):
         super().__init__()
-
-        device_configs = [
-            ("cuda", "float16"),
-            ("cpu", "int8")
-        ]
-        
-        self.model = None
         self.model_size = model_size
-        for device, compute_type in device_configs:
-            try:
-                self.model = WhisperModel(model_size, device=device, compute_type=compute_type)
-                print(f"Whisper initialized with {device.upper()} acceleration ({compute_type})")
-                break
-            except Exception as e:
-                print(f"Failed to initialize with {device}: {str(e)}")
-                error_msg = str(e).lower()
-                if any(keyword in error_msg for keyword in ['cuda', 'cublas', 'cudnn', 'dll']):
-                    print(f"CUDA library issue detected, trying next configuration...")
-                continue
-        if self.model is None:
-            raise RuntimeError("Failed to initialize Whisper with any device configuration")
+        self.model = get_whisper_model(model_size)
 
     def transcribe(self, audio_path: str) -> str:
         audio_path = Path(audio_path)
@@ -46,16 +88,18 @@ class WhisperLocalTranscriber(AbstractTranscriber):
             raise FileNotFoundError(f"Audio file not found: {audio_path}")
 
         try:
-            segments, _ = self.model.transcribe(str(audio_path))
+            segments, info = self.model.transcribe(str(audio_path))
+            self.audio_seconds = info.duration
             return " ".join([segment.text for segment in segments])
         except Exception as e:
             error_msg = str(e).lower()
             if any(keyword in error_msg for keyword in ['cuda', 'cublas', 'cudnn', 'dll']):
                 logger.warning(f"CUDA runtime error during transcription: {e}")
                 logger.info("Reinitializing with CPU fallback...")
-                self.model = WhisperModel(self.model_size, device="cpu", compute_type="int8")
+                self.model = get_whisper_model(self.model_size, cpu_only=True)
                 logger.info("Reinitialized with CPU, retrying transcription...")
-                segments, _ = self.model.transcribe(str(audio_path))
+                segments, info = self.model.transcribe(str(audio_path))
+                self.audio_seconds = info.duration
                 return " ".join([segment.text for segment in segments])
             else:
                 logger.error(f"Error during local transcription: {e}", exc_info=True)
@@ -69,17 +113,25 @@ class WhisperAPITranscriber(AbstractTranscriber):
         if not settings.is_openai_configured():
             raise ValueError("BREVIOBOT_OPENAI_API_KEY environment variable not configured - set BREVIOBOT_OPENAI_API_KEY environment variable")
         self.api_key = settings.app.openai_api_key
-        openai.api_key = self.api_key
+        self.client = get_openai_client(self.api_key, backend_timeout("whisper_api"))
 
     def transcribe(self, audio_path: str) -> str:
         audio_path = Path(audio_path)
         if not audio_path.exists():
             raise FileNotFoundError(f"Audio file not found: {audio_path}")
 
-        try:
+        def request():
+            # The file is reopened on every attempt so retries upload it from the start
             with open(audio_path, "rb") as audio_file:
-                result = openai.Audio.transcribe("whisper-1", audio_file)
-                return result["text"]
+                # verbose_json includes the audio duration used for usage accounting
+                return self.client.audio.transcriptions.create(
+                    model="whisper-1", file=audio_file, response_format="verbose_json"
+                )
+
+        try:
+            result = resilient_call("whisper_api", request)
+            self.audio_seconds = getattr(result, "duration", None)
+            return result.text
         except Exception as e:
             logger.error(f"Error during API transcription: {e}", exc_info=True)
             raise
\ No newline at end of file
@@ -0,0 +1,17 @@
+import os
+import sys
+import tempfile
+
+# Tests import the service modules the way server.py does, from the service root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings are read at import time, so the environment is fixed before any service module is imported
+os.environ.update({
+    "BREVIOBOT_DATABASE_URL": f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='breviobot-tests-'), 'test.db')}",
+    "BREVIOBOT_JWT_SECRET_KEY": "test-secret-key-0123456789abcdef",
+    "BREVIOBOT_ENABLE_AUTH": "true",
+    "BREVIOBOT_RATE_LIMIT_ENABLED": "false",
+    "BREVIOBOT_WARMUP_ENABLED": "false",
+    "BREVIOBOT_OLLAMA_DISCOVERY_ENABLED": "false",
+    "BREVIOBOT_LOG_LEVEL": "WARNING"
+})
@@ -0,0 +1,146 @@
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+import pytest
+from core import admission as admission_module
+from core.admission import REQUEST_CLASSES, AdmissionController
+from core.exceptions import OverloadedError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        # Every reading moves time on, so tickets get distinct, ordered enqueue times
+        self.now += 0.001
+        return self.now
+
+
+def _controller(slots=1, weights=None, concurrency=None, queue_depths=None, max_wait_seconds=5.0):
+    return AdmissionController(
+        slots=slots,
+        weights=dict({name: 1.0 for name in REQUEST_CLASSES}, **(weights or {})),
+        concurrency=dict({name: slots for name in REQUEST_CLASSES}, **(concurrency or {})),
+        queue_depths=dict({name: 8 for name in REQUEST_CLASSES}, **(queue_depths or {})),
+        max_wait_seconds=max_wait_seconds,
+        clock=FakeClock()
+    )
+
+
+def _wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.001)
+
+
+def _enqueue(controller, class_name, granted: queue.Queue):
+    """Starts a request that blocks in acquire(); returns once it is queued."""
+    queued = controller.stats()[class_name]["queued"]
+    threading.Thread(target=lambda: (controller.acquire(class_name), granted.put(class_name)), daemon=True).start()
+    _wait_until(lambda: controller.stats()[class_name]["queued"] > queued)
+
+
+def test_slots_go_to_classes_in_proportion_to_their_weights():
+    controller = _controller(weights={"short_text": 3.0, "long_text": 1.0})
+    controller.acquire("auth")
+    granted = queue.Queue()
+    for _ in range(4):
+        _enqueue(controller, "short_text", granted)
+    for _ in range(4):
+        _enqueue(controller, "long_text", granted)
+
+    order = []
+    running = "auth"
+    for _ in range(8):
+        controller.release(running, 0.1)
+        running = granted.get(timeout=2)
+        order.append(running)
+
+    assert order[:4] == ["short_text", "long_text", "short_text", "short_text"]
+    assert order.count("long_text") == 4
+
+
+def test_class_concurrency_cap_leaves_slots_to_other_classes():
+    controller = _controller(slots=2, concurrency={"audio": 1})
+    controller.acquire("audio")
+    granted = queue.Queue()
+    _enqueue(controller, "audio", granted)
+
+    controller.acquire("auth")
+    assert controller.stats()["audio"]["active"] == 1
+    assert granted.empty()
+
+
+def test_release_dispatches_the_next_waiting_request():
+    controller = _controller()
+    controller.acquire("calendar")
+    granted = queue.Queue()
+    _enqueue(controller, "calendar", granted)
+    assert granted.empty()
+
+    controller.release("calendar", 0.2)
+
+    assert granted.get(timeout=2) == "calendar"
+    stats = controller.stats()["calendar"]
+    assert (stats["active"], stats["queued"], stats["admitted"]) == (1, 0, 2)
+
+
+def test_full_queue_is_rejected():
+    controller = _controller(queue_depths={"audio": 1})
+    controller.acquire("audio")
+    _enqueue(controller, "audio", queue.Queue())
+
+    with pytest.raises(OverloadedError) as error:
+        controller.acquire("audio")
+    assert error.value.retry_after >= 1
+    assert controller.stats()["audio"]["rejected"] == 1
+
+
+def test_saturated_class_is_rejected_with_its_expected_wait_as_retry_after():
+    controller = _controller(max_wait_seconds=3.0)
+    controller.acquire("long_text")
+    controller.release("long_text", 4.0)
+    controller.acquire("long_text")
+
+    # One request holding the only slot for ~4s: the next one would wait longer than max_wait_seconds
+    with pytest.raises(OverloadedError) as error:
+        controller.acquire("long_text")
+    assert error.value.retry_after == 3
+    assert controller.stats()["long_text"]["queued"] == 0
+
+
+def test_request_not_granted_in_time_is_withdrawn_and_rejected():
+    controller = _controller(max_wait_seconds=0.05)
+    controller.acquire("short_text")
+
+    with pytest.raises(OverloadedError):
+        controller.acquire("short_text")
+
+    stats = controller.stats()["short_text"]
+    assert (stats["queued"], stats["active"], stats["rejected"]) == (0, 1, 1)
+
+
+def test_grant_racing_the_timeout_keeps_the_slot(monkeypatch):
+    controller = _controller()
+    controller.acquire("auth")
+
+    class LateGrant(threading.Event):
+        def wait(self, timeout=None):
+            # The slot is granted just after the wait has timed out
+            controller.release("auth", 0.1)
+            return False
+
+    @dataclass
+    class LateTicket:
+        enqueued_at: float
+        granted: threading.Event = field(default_factory=LateGrant)
+
+    monkeypatch.setattr(admission_module, "_Ticket", LateTicket)
+
+    controller.acquire("auth")
+
+    stats = controller.stats()["auth"]
+    assert (stats["active"], stats["queued"], stats["rejected"]) == (1, 0, 0)
@@ -0,0 +1,53 @@
+from datetime import datetime
+import pytest
+from calendars.date_parser import parse_date_range
+
+SUNDAY = datetime(2026, 10, 25, 15, 30)
+WEDNESDAY = datetime(2026, 10, 21, 9, 0)
+
+
+def _day(value: str, end: bool = False) -> str:
+    return f"{value}T23:59:59Z" if end else f"{value}T00:00:00Z"
+
+
+@pytest.mark.parametrize("now, query, start, end", [
+    (SUNDAY, "today", "2026-10-25", "2026-10-25"),
+    (SUNDAY, "what's on today?", "2026-10-25", "2026-10-25"),
+    (SUNDAY, "today's meetings", "2026-10-25", "2026-10-25"),
+    (SUNDAY, "tomorrow", "2026-10-26", "2026-10-26"),
+    (SUNDAY, "yesterday", "2026-10-24", "2026-10-24"),
+    (SUNDAY, "l'altro ieri", "2026-10-23", "2026-10-23"),
+    (SUNDAY, "appuntamenti di dopodomani", "2026-10-27", "2026-10-27"),
+    (SUNDAY, "this weekend", "2026-10-24", "2026-10-25"),
+    (SUNDAY, "questo fine settimana", "2026-10-24", "2026-10-25"),
+    (SUNDAY, "next weekend", "2026-10-31", "2026-11-01"),
+    (WEDNESDAY, "this weekend", "2026-10-24", "2026-10-25"),
+    (WEDNESDAY, "next weekend", "2026-10-31", "2026-11-01"),
+    (SUNDAY, "last 7 days", "2026-10-19", "2026-10-25"),
+    (SUNDAY, "next 7 days", "2026-10-25", "2026-10-31"),
+    (SUNDAY, "ultimi 3 giorni", "2026-10-23", "2026-10-25"),
+    (SUNDAY, "prossimi tre giorni", "2026-10-25", "2026-10-27"),
+    (SUNDAY, "next 2 weeks", "2026-10-25", "2026-11-07"),
+    (SUNDAY, "this week", "2026-10-19", "2026-10-25"),
+    (WEDNESDAY, "next week", "2026-10-26", "2026-11-01"),
+    (WEDNESDAY, "settimana scorsa", "2026-10-12", "2026-10-18"),
+    (WEDNESDAY, "this month", "2026-10-01", "2026-10-31"),
+    (WEDNESDAY, "mese prossimo", "2026-11-01", "2026-11-30"),
+    (WEDNESDAY, "friday", "2026-10-23", "2026-10-23"),
+    (WEDNESDAY, "next wednesday", "2026-10-28", "2026-10-28"),
+    (WEDNESDAY, "lunedì", "2026-10-26", "2026-10-26"),
+])
+def test_parse_date_range(now, query, start, end):
+    match = parse_date_range(query, now=now)
+    assert (match.start_date, match.end_date) == (_day(start), _day(end, end=True))
+    assert match.confidence == 1.0
+
+
+@pytest.mark.parametrize("query", ["meetings with Anna tomorrow", "tomorrow's standup in room 4"])
+def test_other_words_lower_the_confidence(query):
+    assert parse_date_range(query, now=SUNDAY).confidence < 1.0
+
+
+@pytest.mark.parametrize("query", ["", "meetings with Anna", "schedule a call"])
+def test_queries_without_a_date_phrase(query):
+    assert parse_date_range(query, now=SUNDAY) is None
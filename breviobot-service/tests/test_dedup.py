@@ -0,0 +1,42 @@
+import pytest
+from text.dedup import HashingEmbedder, SummaryIndex, normalize_text
+
+MEETING = ("Hi team, the quarterly planning review is scheduled for Monday 10am in the main conference room. "
+           "Please bring the updated revenue forecast, the supplier delay report and your hiring plans for next "
+           "quarter. Attendance is mandatory for all team leads.")
+
+
+def _index():
+    return SummaryIndex(HashingEmbedder(), threshold=0.92, max_entries_per_user=10, max_users=10, min_words=20)
+
+
+def _reused(index, original, candidate):
+    index.add(1, index.key(original), "en", "gpt-4.1-mini", "summary of the original")
+    key = index.key(candidate)
+    return key is not None and index.find(1, key, "en", "gpt-4.1-mini") is not None
+
+
+def test_normalize_text_drops_signature_and_quoted_reply():
+    text = "Hello Anna,\nSee you  Monday.\n> On Friday Bob wrote:\n> old text\n--\nAnna Rossi\nACME"
+    assert normalize_text(text) == "hello anna, see you monday."
+
+
+def test_same_email_with_other_signature_and_quote_is_reused():
+    original = MEETING + "\n--\nAnna Rossi\nHead of Finance"
+    candidate = "> Earlier: can we move it?\n" + MEETING + "\n--\nSent from my phone"
+    assert _reused(_index(), original, candidate)
+
+
+@pytest.mark.parametrize("candidate", [
+    MEETING.replace("Monday 10am", "Friday 4pm"),
+    MEETING.replace("10am", "10pm"),
+    MEETING.replace("is mandatory", "is not mandatory"),
+    MEETING.replace("quarterly planning review", "quarterly planning review (room 12)"),
+])
+def test_near_miss_with_other_date_number_or_negation_is_not_reused(candidate):
+    assert _reused(_index(), MEETING, candidate) is False
+
+
+def test_short_replies_are_not_deduplicated():
+    index = _index()
+    assert index.key("Sounds good, see you then.\n> quoted thread A") is None
@@ -0,0 +1,78 @@
+import json
+import pytest
+from googleapiclient.discovery import build_from_document
+from googleapiclient.http import HttpMockSequence
+from calendars import google_client
+from calendars.service_cache import _get_discovery_doc
+from core.settings import settings
+
+
+def _event(event_id, start):
+    return {"id": event_id, "start": {"dateTime": start}, "end": {"dateTime": start}}
+
+
+def _page(items, next_page_token=None):
+    body = {"items": items}
+    if next_page_token:
+        body["nextPageToken"] = next_page_token
+    return {"status": "200"}, json.dumps(body)
+
+
+def _service(responses):
+    return build_from_document(_get_discovery_doc(), http=HttpMockSequence(responses))
+
+
+@pytest.fixture(autouse=True)
+def _uncached_sequential(monkeypatch):
+    # One worker keeps the calls in calendar order, matching the mocked response sequence
+    monkeypatch.setattr(settings.calendar, "event_cache_enabled", False)
+    monkeypatch.setattr(settings.calendar, "multi_calendar_max_workers", 1)
+
+
+def test_query_calendars_follows_pages_and_merges_by_start():
+    service = _service([
+        _page([_event("a1", "2025-06-01T09:00:00Z"), _event("a2", "2025-06-03T09:00:00Z")], "next"),
+        _page([_event("a3", "2025-06-05T09:00:00Z")]),
+        _page([_event("b1", "2025-06-02T09:00:00Z"), _event("b2", "2025-06-04T09:00:00Z")]),
+    ])
+
+    events, errors = google_client.query_calendars(service, 1, ["a", "b"], max_results=10,
+                                                   time_min="2025-06-01T00:00:00Z", time_max="2025-06-30T00:00:00Z")
+
+    assert [e["id"] for e in events] == ["a1", "b1", "a2", "b2", "a3"]
+    assert [e["calendarId"] for e in events] == ["a", "b", "a", "b", "a"]
+    assert errors == []
+
+
+def test_query_calendars_stops_at_max_results():
+    service = _service([
+        _page([_event("a1", "2025-06-01T09:00:00Z"), _event("a2", "2025-06-03T09:00:00Z")], "next"),
+        _page([_event("b1", "2025-06-02T09:00:00Z")]),
+    ])
+
+    events, _ = google_client.query_calendars(service, 1, ["a", "b"], max_results=2,
+                                              time_min="2025-06-01T00:00:00Z", time_max="2025-06-30T00:00:00Z")
+
+    assert [e["id"] for e in events] == ["a1", "b1"]
+
+
+def test_query_calendars_returns_partial_results_when_a_calendar_fails():
+    service = _service([
+        _page([_event("a1", "2025-06-01T09:00:00Z")]),
+        ({"status": "404"}, json.dumps({"error": {"code": 404, "message": "Not Found"}})),
+    ])
+
+    events, errors = google_client.query_calendars(service, 1, ["a", "missing"], max_results=10,
+                                                   time_min="2025-06-01T00:00:00Z", time_max="2025-06-30T00:00:00Z")
+
+    assert [e["id"] for e in events] == ["a1"]
+    assert [(e["calendarId"], e["status"]) for e in errors] == [("missing", 404)]
+
+
+def test_query_calendars_raises_when_every_calendar_fails():
+    service = _service([({"status": "403"}, json.dumps({"error": {"code": 403, "message": "Forbidden"}}))])
+
+    with pytest.raises(Exception) as raised:
+        google_client.query_calendars(service, 1, ["private"], max_results=10,
+                                      time_min="2025-06-01T00:00:00Z", time_max="2025-06-30T00:00:00Z")
+    assert raised.value.resp.status == 403
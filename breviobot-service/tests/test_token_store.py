@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+import pytest
+from auth.token_store import refresh_token_store
+from core.users import User
+from persistence.db_session import SessionLocal, init_db
+from persistence.repositories import RefreshTokenRepository, UserRepository
+from server import create_app
+
+PASSWORD = "token-store-password"
+
+
+@pytest.fixture(scope="module")
+def client():
+    init_db()
+    app = create_app()
+    with SessionLocal() as db:
+        UserRepository(db).create(User(id=0, username="tokens", email="tokens@example.com", password=PASSWORD),
+                                  is_verified=True)
+    return app.test_client()
+
+
+def _login(client) -> str:
+    response = client.post("/api/auth/login", json={"username": "tokens", "password": PASSWORD})
+    assert response.status_code == 200
+    return response.json["refresh_token"]
+
+
+def _refresh(client, refresh_token: str):
+    return client.post("/api/auth/refresh", headers={"Authorization": f"Bearer {refresh_token}"})
+
+
+def test_rotation_issues_a_new_token_and_revokes_the_old_one(client):
+    first = _login(client)
+    response = _refresh(client, first)
+    assert response.status_code == 200
+    second = response.json["refresh_token"]
+    assert second != first
+
+    assert _refresh(client, first).status_code == 401
+    assert _refresh(client, second).status_code == 401, "replaying the old token revokes its successor"
+
+
+def test_replay_revokes_only_the_replayed_family(client):
+    replayed_family = _login(client)
+    other_family = _login(client)
+    successor = _refresh(client, replayed_family).json["refresh_token"]
+
+    assert _refresh(client, replayed_family).status_code == 401
+    assert _refresh(client, successor).status_code == 401
+    # The user's other session keeps working
+    response = _refresh(client, other_family)
+    assert response.status_code == 200
+    assert _refresh(client, response.json["refresh_token"]).status_code == 200
+
+
+def test_replay_of_an_already_revoked_family_revokes_nothing_more(client):
+    first = _login(client)
+    second = _refresh(client, first).json["refresh_token"]
+    third = _refresh(client, second).json["refresh_token"]
+    assert _refresh(client, first).status_code == 401
+    other = _login(client)
+
+    assert _refresh(client, second).status_code == 401
+    assert _refresh(client, third).status_code == 401
+    assert _refresh(client, other).status_code == 200
+
+
+def test_compaction_deletes_expired_rows_and_loads_revocations_from_other_workers(client):
+    _login(client)
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        repo = RefreshTokenRepository(db)
+        user_id = UserRepository(db).get(username="tokens").id
+        repo.add("expired-jti", user_id, now - timedelta(minutes=1))
+        repo.revoke("expired-jti", now - timedelta(minutes=2))
+        # Revoked directly in the database, as another worker would
+        repo.add("foreign-jti", user_id, now + timedelta(days=1))
+        repo.revoke("foreign-jti", now)
+    assert not refresh_token_store.is_revoked("foreign-jti")
+
+    refresh_token_store.compact()
+
+    with SessionLocal() as db:
+        assert RefreshTokenRepository(db).get("expired-jti") is None
+    assert not refresh_token_store.is_revoked("expired-jti")
+    assert refresh_token_store.is_revoked("foreign-jti")
@@ -0,0 +1,200 @@
+import math
+import re
+import threading
+import zlib
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from operator import mul
+from typing import Optional
+import requests
+from core.logger import logger
+from core.settings import settings
+from core.metrics import register_cache_stats
+
+_SIGNATURE_DELIMITER = re.compile(r"^--\s*$", re.MULTILINE)
+_WORD = re.compile(r"\w+")
+# Tokens a lexically close email can differ in while meaning something else: numbers
+# (times, dates, amounts), day and month names, am/pm and negations (English and Italian)
+_SALIENT = re.compile(
+    r"\d+|(?<=\d)(?:am|pm)\b|n't\b|\b(?:not|no|never|none|nor|cannot|non|mai|nessun[oa]?|niente|nulla|am|pm"
+    r"|monday|tuesday|wednesday|thursday|friday|saturday|sunday"
+    r"|luned[iì]|marted[iì]|mercoled[iì]|gioved[iì]|venerd[iì]|sabato|domenica"
+    r"|january|february|march|april|may|june|july|august|september|october|november|december"
+    r"|gennaio|febbraio|marzo|aprile|maggio|giugno|luglio|agosto|settembre|ottobre|novembre|dicembre"
+    r"|today|tomorrow|yesterday|oggi|domani|ieri)\b"
+)
+
+
+def normalize_text(text: str) -> str:
+    # Drop the signature block and quoted replies, which vary between copies of the same email
+    text = _SIGNATURE_DELIMITER.split(text, maxsplit=1)[0]
+    lines = [line for line in text.splitlines() if not line.lstrip().startswith(">")]
+    return " ".join(" ".join(lines).lower().split())
+
+
+def salient_tokens(normalized: str) -> tuple:
+    """The tokens two inputs must share exactly, in order, for one to reuse the other's summary."""
+    return tuple(_SALIENT.findall(normalized))
+
+
+def _unit(vector: list) -> list:
+    norm = math.sqrt(sum(x * x for x in vector))
+    return [x / norm for x in vector] if norm else vector
+
+
+class HashingEmbedder:
+    """
+    Dependency-free embedder: words and character trigrams are hashed into a
+    fixed number of buckets. It only captures lexical overlap, which is what
+    near-duplicate inputs share, and runs offline.
+    """
+
+    def __init__(self, dimensions: int = 512):
+        self.dimensions = dimensions
+
+    def embed(self, text: str) -> list:
+        vector = [0.0] * self.dimensions
+        for word in _WORD.findall(text):
+            vector[zlib.crc32(word.encode("utf-8")) % self.dimensions] += 1.0
+        for i in range(len(text) - 2):
+            vector[zlib.crc32(text[i:i + 3].encode("utf-8")) % self.dimensions] += 0.5
+        return vector
+
+
+class OpenAIEmbedder:
+    def __init__(self, api_key: str, model: str = "text-embedding-3-small"):
+        self.api_key = api_key
+        self.model = model
+        self.client = None
+
+    def embed(self, text: str) -> list:
+        if self.client is None:
+            from openai import OpenAI
+            self.client = OpenAI(api_key=self.api_key)
+        response = self.client.embeddings.create(model=self.model, input=text)
+        return response.data[0].embedding
+
+
+class OllamaEmbedder:
+    def __init__(self, base_url: str, model: str = "nomic-embed-text"):
+        self.url = f"{base_url.rstrip('/')}/api/embeddings"
+        self.model = model
+
+    def embed(self, text: str) -> list:
+        response = requests.post(
+            self.url,
+            json={"model": self.model, "prompt": text},
+            timeout=settings.app.request_timeout
+        )
+        response.raise_for_status()
+        return response.json()["embedding"]
+
+
+def create_embedder(backend: str, model: str = ""):
+    if backend == "local":
+        return HashingEmbedder()
+    if backend == "openai":
+        return OpenAIEmbedder(settings.app.openai_api_key, model or "text-embedding-3-small")
+    if backend == "ollama":
+        return OllamaEmbedder(settings.app.ollama_url, model or "nomic-embed-text")
+    raise ValueError(f"Unsupported embedding backend: '{backend}'")
+
+
+@dataclass
+class DedupKey:
+    vector: list
+    salient: tuple
+
+
+@dataclass
+class SummaryMatch:
+    summary: str
+    similarity: float
+
+
+class SummaryIndex:
+    """
+    Per-user vector index of recently summarized inputs. Each user keeps at
+    most max_entries_per_user vectors (oldest dropped first) and at most
+    max_users indexes are held (least recently used dropped first). Lookups
+    are a brute-force cosine scan, which is cheap at these sizes.
+
+    Similarity alone does not tell "Monday 10am" from "Friday 4pm" or "is"
+    from "is not", so a summary is only reused when the numbers, dates and
+    negations of both inputs match exactly. Inputs shorter than min_words
+    once signatures and quotes are dropped are never deduplicated: short
+    replies to different threads look alike and are cheap to summarize.
+    """
+
+    def __init__(self, embedder, threshold: float, max_entries_per_user: int, max_users: int, min_words: int = 0):
+        self.embedder = embedder
+        self.threshold = threshold
+        self.min_words = min_words
+        self.max_entries_per_user = max_entries_per_user
+        self.max_users = max_users
+        self._indexes = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, text: str) -> Optional[DedupKey]:
+        normalized = normalize_text(text)
+        if len(normalized.split()) < self.min_words:
+            return None
+        try:
+            vector = _unit(self.embedder.embed(normalized))
+        except Exception as e:
+            # Deduplication is an optimization; a failing embedder must not fail the request
+            logger.warning(f"[SummaryDedup] Embedding failed, skipping deduplication: {e}")
+            return None
+        return DedupKey(vector=vector, salient=salient_tokens(normalized))
+
+    def find(self, user_id, key: DedupKey, language: str, model: str) -> Optional[SummaryMatch]:
+        best = None
+        with self._lock:
+            entries = list(self._indexes.get(user_id, ()))
+        for entry_key, entry_language, entry_model, summary in entries:
+            if (entry_language != language or entry_model != model or entry_key.salient != key.salient
+                    or len(entry_key.vector) != len(key.vector)):
+                continue
+            similarity = sum(map(mul, key.vector, entry_key.vector))
+            if similarity >= self.threshold and (best is None or similarity > best.similarity):
+                best = SummaryMatch(summary=summary, similarity=round(similarity, 4))
+        with self._lock:
+            if best:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return best
+
+    def add(self, user_id, key: DedupKey, language: str, model: str, summary: str):
+        with self._lock:
+            entries = self._indexes.get(user_id)
+            if entries is None:
+                entries = self._indexes[user_id] = deque(maxlen=self.max_entries_per_user)
+            self._indexes.move_to_end(user_id)
+            entries.append((key, language, model, summary))
+            while len(self._indexes) > self.max_users:
+                self._indexes.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "users": len(self._indexes),
+                "entries": sum(len(entries) for entries in self._indexes.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0
+            }
+
+
+summary_index = SummaryIndex(
+    embedder=create_embedder(settings.summary_dedup.embedding_backend, settings.summary_dedup.embedding_model),
+    threshold=settings.summary_dedup.similarity_threshold,
+    max_entries_per_user=settings.summary_dedup.max_entries_per_user,
+    max_users=settings.summary_dedup.max_users,
+    min_words=settings.summary_dedup.min_words
+)
+
+register_cache_stats("summary_dedup", lambda: (summary_index.hits, summary_index.misses))
@@ -1,15 +1,26 @@
 from dataclasses import dataclass
+from typing import Optional
 from core.exceptions import ValidationError
 from core.settings import settings
 from core.logger import logger
+from core.resilience import breaker_stats
+from core.tracing import span
 from text.summarizers import TextSummarizer
 from core.prompts import PROMPTS
 from flask import jsonify, g
-from openai import OpenAI
 from calendars.google_handlers import handle_fetch_events
-from toolcalls.prompts import INIT_GOOGLE_CALENDAR_TOOLCALL_PROMPT
-from toolcalls.registry import dispatch_tool_call
+from toolcalls.prompts import INIT_GOOGLE_CALENDAR_TOOLCALL_TEMPLATE, INIT_TOOL_ROUTER_TEMPLATE
+from toolcalls.registry import dispatch_tool_call, get_tool_cache_stats
+from toolcalls.router import run_tool_conversation
 from text.clients import LLMClientFactory
+from usage.accounting import usage_tracker
+from calendars.date_parser import parse_date_range, parser_stats
+from text.sessions import conversation_store
+from text.dedup import summary_index
+from text.model_registry import model_registry
+from text.model_router import model_router, AUTO_MODEL
+from text.ollama_scheduler import ollama_scheduler
+from toolcalls.prompts import CONVERSATION_SUMMARY_PROMPT
 import json
 
 @dataclass
@@ -36,6 +47,7 @@ class SummarizeRequest:
 class AskRequest:
     query: str
     model: str
+    session_id: Optional[str] = None
 
     @classmethod
     def from_json(cls, data: dict) -> 'AskRequest':
@@ -43,45 +55,56 @@ class AskRequest:
             raise ValidationError("Query field is required")
         if not data.get("model"):
             raise ValidationError("Model field is required")
-        return cls(query=data["query"], model=data["model"])
+        return cls(query=data["query"], model=data["model"], session_id=data.get("session_id"))
 
 def handle_summarize_request(request_json):
     request_data = SummarizeRequest.from_json(request_json or {})
     
-    if request_data.model.startswith("gpt") and not settings.is_openai_configured():
-        raise ValidationError("OpenAI API key not configured for GPT models")
+    if request_data.model != AUTO_MODEL:
+        backend = model_registry.get(request_data.model)
+        if backend.provider == "openai" and not settings.is_openai_configured():
+            raise ValidationError("OpenAI API key not configured for GPT models")
+    user_id = g.current_user.get('user_id') if hasattr(g, 'current_user') else None
     user_info = f" for user: {g.current_user['username']}" if hasattr(g, 'current_user') else ""
     logger.info(f"Processing summarization request{user_info} for language: {request_data.language}, model: {request_data.model}")
     
+    with span("text.dedup_lookup"):
+        # Anonymous requests (auth disabled) have no index of their own, so they are never deduplicated
+        dedup_key = summary_index.key(request_data.text) if settings.summary_dedup.enabled and user_id is not None else None
+        match = summary_index.find(user_id, dedup_key, request_data.language, request_data.model) if dedup_key else None
+    if match:
+        logger.info(f"Reusing summary of a near-duplicate input{user_info} (similarity {match.similarity})")
+        return jsonify({"summary": match.summary, "reused": True, "similarity": match.similarity})
+
+    usage_tracker.check_quota(user_id, tokens=True)
+    model = request_data.model
+    if model == AUTO_MODEL:
+        try:
+            with span("text.route_model"):
+                model = model_router.route(request_data.text, request_data.language, PROMPTS.get(request_data.language, "")).model
+        except ValueError as e:
+            raise ValidationError(str(e))
+
     summarizer = TextSummarizer(settings.app.openai_api_key, PROMPTS)
-    result = summarizer.summarize_text(
-        request_data.text,
-        request_data.model,
-        request_data.language
-    )
+    with model_router.track(model), span("text.summarize", model=model):
+        result = summarizer.summarize_text(
+            request_data.text,
+            model,
+            request_data.language
+        )
+    usage_tracker.record(user_id, "summarize", model=model, **(summarizer.last_usage or {}))
+    if dedup_key is not None:
+        summary_index.add(user_id, dedup_key, request_data.language, request_data.model, result)
     
     logger.info(f"Successfully generated summary{user_info}")
-    return jsonify({"summary": result})
-
-def handle_ask_request(request_json):
-    user_info = f" for user: {g.current_user['username']}" if hasattr(g, 'current_user') else ""
-    logger.info(f"Processing ask request{user_info}")
-
-    request_data = AskRequest.from_json(request_json or {})
-
-    system_prompt = INIT_GOOGLE_CALENDAR_TOOLCALL_PROMPT
-    api_key = settings.app.openai_api_key
-    if not api_key:
-        raise ValidationError("OpenAI API key is required for this call")
+    with span("response.serialize"):
+        return jsonify({"summary": result, "model": model})
 
+def _ask_with_json_toolcall(client, query):
+    # Fallback for backends without native tool-calling: one JSON tool call per request
+    client.system_prompt = INIT_GOOGLE_CALENDAR_TOOLCALL_TEMPLATE.render()
     try:
-        client = LLMClientFactory.create(request_data.model, system_prompt, api_key)
-    except Exception as e:
-        logger.error(f"Failed to create LLM client: {e}", exc_info=True)
-        raise ValidationError(str(e))
-
-    try:
-        response = client.call(request_data.query)
+        response = client.call(query)
     except Exception as e:
         logger.error(f"LLM call failed: {e}", exc_info=True)
         raise ValidationError("LLM did not return a valid response.")
@@ -99,6 +122,111 @@ def handle_ask_request(request_json):
     except Exception as e:
         logger.error(f"Tool-call dispatch failed: {e}", exc_info=True)
         raise ValidationError(f"Tool-call dispatch failed: {e}")
+    return {
+        "answer": None,
+        "tool_calls": [{"name": tool_name, "arguments": json.dumps(parameters), "result": result}]
+    }
+
+def _ask_with_local_parser(query):
+    # Simple date-range questions are answered without an LLM round-trip
+    match = parse_date_range(query)
+    if not match or match.confidence < settings.toolcalls.local_parser_min_confidence:
+        return None
+    parameters = {"start_date": match.start_date, "end_date": match.end_date}
+    logger.info(f"Ask request resolved locally: '{match.phrase}' -> {parameters}")
+    try:
+        result = dispatch_tool_call("get_google_calendar_events", parameters)
+    except Exception as e:
+        logger.error(f"Tool-call dispatch failed: {e}", exc_info=True)
+        raise ValidationError(f"Tool-call dispatch failed: {e}")
+    return {
+        "answer": None,
+        "tool_calls": [{"name": "get_google_calendar_events", "arguments": json.dumps(parameters), "result": result}]
+    }
+
+def _describe_result(result):
+    # Compact assistant turn for the session history; tool payloads are not kept
+    if result.get("answer"):
+        return result["answer"]
+    calls = ", ".join(f"{call['name']}({call['arguments']})" for call in result.get("tool_calls", []))
+    return f"[Called {calls}]"
+
+def _session_summarizer(model, api_key, user_id):
+    def summarize(previous_summary, turns):
+        client = LLMClientFactory.create(model, CONVERSATION_SUMMARY_PROMPT, api_key)
+        transcript = "\n".join(f"{turn['role']}: {turn['content']}" for turn in turns)
+        summary = client.call(f"Existing summary: {previous_summary or '(none)'}\n\nNew messages:\n{transcript}")
+        usage_tracker.record(user_id, "ask_session_summary", model=model, **(client.last_usage or {}))
+        return summary
+    return summarize
 
+def _run_ask(client, query, session):
+    if client.supports_native_tools:
+        # Only the rolling summary and the last few turns are sent, not the full history
+        return run_tool_conversation(client, query, history=session.context_messages())
+    return _ask_with_json_toolcall(client, query)
+
+def handle_ask_request(request_json):
+    user_info = f" for user: {g.current_user['username']}" if hasattr(g, 'current_user') else ""
+    logger.info(f"Processing ask request{user_info}")
+
+    request_data = AskRequest.from_json(request_json or {})
+    user_id = g.current_user.get('user_id') if hasattr(g, 'current_user') else None
+    api_key = settings.app.openai_api_key
+    summarize = _session_summarizer(request_data.model, api_key, user_id)
+
+    # The session is only looked up (or created, possibly evicting another) once the request will be served
+    if settings.toolcalls.local_parser_enabled:
+        with span("ask.local_parser"):
+            result = _ask_with_local_parser(request_data.query)
+        parser_stats.record(result is not None)
+        if result is not None:
+            session = conversation_store.get_or_create(request_data.session_id, user_id)
+            conversation_store.append_turn(session, request_data.query, _describe_result(result), summarize)
+            logger.info(f"Successfully handled ask request{user_info}")
+            return jsonify(dict(result, session_id=session.session_id))
+
+    usage_tracker.check_quota(user_id, tokens=True)
+
+    if not api_key:
+        raise ValidationError("OpenAI API key is required for this call")
+
+    try:
+        with span("ask.client_init", model=request_data.model):
+            client = LLMClientFactory.create(request_data.model, INIT_TOOL_ROUTER_TEMPLATE.render(), api_key)
+    except Exception as e:
+        logger.error(f"Failed to create LLM client: {e}", exc_info=True)
+        raise ValidationError(str(e))
+
+    session = conversation_store.get_or_create(request_data.session_id, user_id)
+    try:
+        with span("ask.tool_conversation", native=client.supports_native_tools):
+            result = _run_ask(client, request_data.query, session)
+    finally:
+        usage_tracker.record(user_id, "ask", model=request_data.model, **(client.last_usage or {}))
+
+    conversation_store.append_turn(session, request_data.query, _describe_result(result), summarize)
     logger.info(f"Successfully handled ask request{user_info}")
-    return jsonify(result)
+    with span("response.serialize"):
+        return jsonify(dict(result, session_id=session.session_id))
+
+def handle_end_session_request(session_id):
+    user_id = g.current_user.get('user_id') if hasattr(g, 'current_user') else None
+    if not conversation_store.end(session_id, user_id):
+        raise ValidationError("Unknown or expired conversation session")
+    return jsonify({"deleted": True})
+
+def handle_ask_stats_request():
+    return jsonify({
+        "local_date_parser": parser_stats.snapshot(),
+        "tool_cache": get_tool_cache_stats()
+    })
+
+def handle_list_models_request():
+    return jsonify({
+        "models": [backend.to_dict() for backend in model_registry.backends()],
+        "breakers": breaker_stats()
+    })
+
+def handle_ollama_stats_request():
+    return jsonify(ollama_scheduler.stats())
@@ -0,0 +1,281 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+import requests
+from core.logger import logger
+from core.metrics import MODEL_CALL_DURATION, MODEL_TOKENS_PER_SECOND
+from core.settings import settings
+
+# (context window, USD per 1K input tokens, USD per 1K output tokens), matched by longest prefix
+_OPENAI_FAMILIES = {
+    "gpt-4.1-nano": (1047576, 0.0001, 0.0004),
+    "gpt-4.1-mini": (1047576, 0.0004, 0.0016),
+    "gpt-4.1": (1047576, 0.002, 0.008),
+    "gpt-4.5-preview": (128000, 0.075, 0.15),
+    "gpt-4o-mini": (128000, 0.00015, 0.0006),
+    "gpt-4o": (128000, 0.0025, 0.01),
+    "chatgpt-4o-latest": (128000, 0.005, 0.015),
+    "gpt-4-turbo": (128000, 0.01, 0.03),
+    "gpt-4-1106-preview": (128000, 0.01, 0.03),
+    "gpt-4-0125-preview": (128000, 0.01, 0.03),
+    "gpt-4": (8192, 0.03, 0.06),
+    "gpt-3.5-turbo": (16385, 0.0005, 0.0015),
+}
+
+# Chat-completion models retrieved with get https://api.openai.com/v1/models
+_OPENAI_MODELS = [
+    "gpt-4-1106-preview",
+    "gpt-4-turbo-preview",
+    "gpt-4-turbo-2024-04-09",
+    "gpt-4-turbo",
+    "gpt-4",
+    "gpt-4-0613",
+    "gpt-4-0125-preview",
+    "chatgpt-4o-latest",
+    "gpt-4.1-nano",
+    "gpt-4.1-nano-2025-04-14",
+    "gpt-4.1-mini",
+    "gpt-4.1-mini-2025-04-14",
+    "gpt-4.1",
+    "gpt-4.1-2025-04-14",
+    "gpt-4.5-preview",
+    "gpt-4.5-preview-2025-02-27",
+    "gpt-4o",
+    "gpt-4o-2024-05-13",
+    "gpt-4o-2024-08-06",
+    "gpt-4o-2024-11-20",
+    "gpt-4o-mini",
+    "gpt-4o-mini-2024-07-18",
+    "gpt-3.5-turbo",
+    "gpt-3.5-turbo-16k",
+    "gpt-3.5-turbo-1106",
+    "gpt-3.5-turbo-0125",
+]
+
+
+@dataclass
+class ModelBackend:
+    name: str
+    provider: str
+    context_window: int
+    supports_streaming: bool = True
+    supports_tools: bool = False
+    input_cost_per_1k: float = 0.0
+    output_cost_per_1k: float = 0.0
+    # Seconds per call: a prior until calls are measured, then an exponential moving average
+    latency_seconds: float = 1.0
+    latency_samples: int = 0
+    discovered: bool = False
+
+    def estimated_cost(self, prompt_tokens: int, completion_tokens: int) -> float:
+        return (prompt_tokens * self.input_cost_per_1k + completion_tokens * self.output_cost_per_1k) / 1000
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "provider": self.provider,
+            "context_window": self.context_window,
+            "supports_streaming": self.supports_streaming,
+            "supports_tools": self.supports_tools,
+            "input_cost_per_1k": self.input_cost_per_1k,
+            "output_cost_per_1k": self.output_cost_per_1k,
+            "latency_seconds": round(self.latency_seconds, 4),
+            "latency_samples": self.latency_samples,
+            "discovered": self.discovered
+        }
+
+
+def _openai_backend(name: str) -> ModelBackend:
+    # Models newer than the table are priced like gpt-4o until they are added
+    family = max((prefix for prefix in _OPENAI_FAMILIES if name.startswith(prefix)), key=len, default="gpt-4o")
+    context_window, input_cost, output_cost = _OPENAI_FAMILIES[family]
+    return ModelBackend(
+        name=name,
+        provider="openai",
+        context_window=context_window,
+        supports_tools=True,
+        input_cost_per_1k=input_cost,
+        output_cost_per_1k=output_cost,
+        latency_seconds=2.0
+    )
+
+
+def _ollama_backend(name: str, context_window: Optional[int] = None, discovered: bool = False) -> ModelBackend:
+    return ModelBackend(
+        name=name,
+        provider="ollama",
+        context_window=context_window or settings.models.ollama_default_context_window,
+        latency_seconds=5.0,
+        discovered=discovered
+    )
+
+
+class ModelRegistry:
+    """
+    Catalog of the models the service can call, with their capabilities.
+    OpenAI models come from a static table; Ollama models are discovered from
+    the local server's /api/tags at warmup and then refreshed once per
+    discovery TTL by a background thread, never on a request. A name the
+    registry does not know is served by OpenAI if it starts with "gpt" and by
+    Ollama otherwise, with default capabilities, so new OpenAI models and
+    models pulled since the last discovery (or while Ollama was unreachable)
+    keep working. Call latencies are measured so callers can pick the fastest
+    (or cheapest) suitable backend.
+    """
+
+    def __init__(self, ollama_url: str, discovery_ttl_seconds: int, discovery_timeout_seconds: float,
+                 static_ollama_models: list, latency_alpha: float):
+        self.ollama_url = ollama_url.rstrip("/")
+        self.discovery_ttl_seconds = discovery_ttl_seconds
+        self.discovery_timeout_seconds = discovery_timeout_seconds
+        self.latency_alpha = latency_alpha
+        self._backends = {}
+        self._lock = threading.Lock()
+        self._last_discovery = None
+        self._refresh_thread = None
+        for name in _OPENAI_MODELS:
+            self.register(_openai_backend(name))
+        for name in static_ollama_models:
+            self.register(_ollama_backend(name))
+
+    def register(self, backend: ModelBackend):
+        with self._lock:
+            self._backends[backend.name.lower()] = backend
+
+    def _register_discovered(self, name: str, context_window: Optional[int]):
+        backend = _ollama_backend(name, context_window, discovered=True)
+        with self._lock:
+            known = self._backends.get(name.lower())
+            if known:
+                # Keep measured latency across re-discoveries
+                backend.latency_seconds, backend.latency_samples = known.latency_seconds, known.latency_samples
+            self._backends[name.lower()] = backend
+
+    def _context_length(self, name: str) -> Optional[int]:
+        # /api/tags does not report the context window; /api/show does, keyed by architecture
+        response = requests.post(f"{self.ollama_url}/api/show", json={"model": name}, timeout=self.discovery_timeout_seconds)
+        response.raise_for_status()
+        for key, value in (response.json().get("model_info") or {}).items():
+            if key.endswith(".context_length"):
+                return int(value)
+        return None
+
+    def discover_ollama(self) -> int:
+        self._last_discovery = time.monotonic()
+        try:
+            response = requests.get(f"{self.ollama_url}/api/tags", timeout=self.discovery_timeout_seconds)
+            response.raise_for_status()
+            models = response.json().get("models", [])
+        except Exception as e:
+            logger.warning(f"[Models] Ollama model discovery failed: {e}")
+            return 0
+        for model in models:
+            name = model["name"]
+            try:
+                context_window = self._context_length(name)
+            except Exception as e:
+                logger.warning(f"[Models] Could not read context window of '{name}': {e}")
+                context_window = None
+            self._register_discovered(name, context_window)
+            if name.endswith(":latest"):
+                # "llama3" and "llama3:latest" are the same model for Ollama
+                self._register_discovered(name[:-len(":latest")], context_window)
+        logger.info(f"[Models] Discovered {len(models)} Ollama model(s)")
+        return len(models)
+
+    def _ensure_refresh_thread(self):
+        if self._refresh_thread is not None or not settings.models.ollama_discovery_enabled:
+            return
+        with self._lock:
+            if self._refresh_thread is not None:
+                return
+            self._refresh_thread = threading.Thread(target=self._refresh_loop, name="ollama-discovery", daemon=True)
+            self._refresh_thread.start()
+
+    def _refresh_loop(self):
+        while True:
+            since = None if self._last_discovery is None else time.monotonic() - self._last_discovery
+            if since is not None and since < self.discovery_ttl_seconds:
+                time.sleep(self.discovery_ttl_seconds - since)
+                continue
+            try:
+                self.discover_ollama()
+            except Exception as e:
+                logger.warning(f"[Models] Ollama model discovery failed: {e}")
+
+    def get(self, name: str) -> Optional[ModelBackend]:
+        if not name:
+            return None
+        self._ensure_refresh_thread()
+        with self._lock:
+            backend = self._backends.get(name.lower())
+        if backend is not None:
+            return backend
+        # Unknown names are routed as before the registry existed: "gpt*" to OpenAI, the rest to Ollama
+        if name.lower().startswith("gpt"):
+            return _openai_backend(name)
+        return _ollama_backend(name)
+
+    def resolve(self, name: str) -> ModelBackend:
+        backend = self.get(name)
+        if backend is None:
+            raise ValueError("Model must be specified")
+        return backend
+
+    def names(self, provider: Optional[str] = None) -> list:
+        with self._lock:
+            return sorted(b.name for b in self._backends.values() if provider is None or b.provider == provider)
+
+    def backends(self) -> list:
+        with self._lock:
+            return sorted(self._backends.values(), key=lambda b: (b.provider, b.name))
+
+    def record_latency(self, name: str, seconds: float, completion_tokens: int = None):
+        backend = self._backends.get(name.lower())
+        provider = backend.provider if backend else "unknown"
+        MODEL_CALL_DURATION.observe(seconds, provider, name)
+        # Ollama throughput comes from its own eval timings (see ollama_scheduler), which exclude queueing
+        if completion_tokens and seconds > 0 and provider != "ollama":
+            MODEL_TOKENS_PER_SECOND.observe(completion_tokens / seconds, provider, name)
+        with self._lock:
+            backend = self._backends.get(name.lower())
+            if backend is None:
+                return
+            if backend.latency_samples == 0:
+                backend.latency_seconds = seconds
+            else:
+                backend.latency_seconds += self.latency_alpha * (seconds - backend.latency_seconds)
+            backend.latency_samples += 1
+
+    def select(self, min_context_tokens: int = 0, streaming: bool = False, tools: bool = False,
+               providers: Optional[list] = None, strategy: str = "cheapest") -> Optional[ModelBackend]:
+        """
+        Returns the cheapest (or fastest) backend whose context window fits
+        min_context_tokens and that has the requested capabilities. OpenAI
+        backends are only candidates when an API key is configured.
+        """
+        candidates = [
+            b for b in self.backends()
+            if b.context_window >= min_context_tokens
+            and (b.supports_streaming or not streaming)
+            and (b.supports_tools or not tools)
+            and (providers is None or b.provider in providers)
+            and (b.provider != "openai" or settings.is_openai_configured())
+        ]
+        if not candidates:
+            return None
+        if strategy == "fastest":
+            return min(candidates, key=lambda b: (b.latency_seconds, b.estimated_cost(1000, 1000)))
+        if strategy == "cheapest":
+            return min(candidates, key=lambda b: (b.estimated_cost(1000, 1000), b.latency_seconds))
+        raise ValueError(f"Unsupported selection strategy: '{strategy}'")
+
+
+model_registry = ModelRegistry(
+    ollama_url=settings.app.ollama_url,
+    discovery_ttl_seconds=settings.models.ollama_discovery_ttl_seconds,
+    discovery_timeout_seconds=settings.models.ollama_discovery_timeout_seconds,
+    static_ollama_models=settings.models.ollama_models,
+    latency_alpha=settings.models.latency_ewma_alpha
+)
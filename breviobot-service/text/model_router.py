@@ -0,0 +1,117 @@
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from core.logger import logger
+from core.settings import settings
+from text.model_registry import model_registry
+from usage.accounting import estimate_tokens
+
+AUTO_MODEL = "auto"
+
+
+@dataclass
+class RoutingDecision:
+    model: str
+    reason: str
+    input_tokens: int
+
+
+class ModelRouter:
+    """
+    Picks a concrete model for model="auto". Short inputs in a language the
+    local model handles go to Ollama unless its queue is long enough that a
+    remote call would finish first; everything else goes to OpenAI. Queue
+    depth is the number of in-flight calls started through track().
+    """
+
+    def __init__(self, local_max_input_tokens: int, local_languages: list, local_max_queue_depth: int,
+                 local_model: str, remote_model: str):
+        self.local_max_input_tokens = local_max_input_tokens
+        self.local_languages = set(local_languages)
+        self.local_max_queue_depth = local_max_queue_depth
+        self.local_model = local_model
+        self.remote_model = remote_model
+        self._in_flight = defaultdict(int)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def track(self, model: str):
+        with self._lock:
+            self._in_flight[model] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_flight[model] -= 1
+
+    def queue_depth(self, model: str) -> int:
+        with self._lock:
+            return self._in_flight[model]
+
+    def _expected_wait(self, backend) -> float:
+        # Calls to one local model are effectively serialized
+        if backend.provider == "ollama":
+            return backend.latency_seconds * (self.queue_depth(backend.name) + 1)
+        return backend.latency_seconds
+
+    def _local_backend(self, required_tokens: int):
+        if self.local_model:
+            backend = model_registry.get(self.local_model)
+            return backend if backend and backend.context_window >= required_tokens else None
+        candidates = [
+            b for b in model_registry.backends()
+            if b.provider == "ollama" and b.context_window >= required_tokens
+        ]
+        return min(candidates, key=self._expected_wait, default=None)
+
+    def _remote_backend(self, required_tokens: int):
+        if not settings.is_openai_configured():
+            return None
+        if self.remote_model:
+            backend = model_registry.get(self.remote_model)
+            return backend if backend and backend.context_window >= required_tokens else None
+        return model_registry.select(min_context_tokens=required_tokens, providers=["openai"], strategy="cheapest")
+
+    def route(self, text: str, language: str, system_prompt: str = "") -> RoutingDecision:
+        input_tokens = estimate_tokens(system_prompt) + estimate_tokens(text)
+        # Leave room for the summary itself
+        required_tokens = input_tokens + max(256, input_tokens // 4)
+        local = self._local_backend(required_tokens)
+        remote = self._remote_backend(required_tokens)
+
+        if local and not remote:
+            decision = RoutingDecision(local.name, "no remote backend available", input_tokens)
+        elif remote and not local:
+            decision = RoutingDecision(remote.name, "no local backend fits the input", input_tokens)
+        elif not local and not remote:
+            raise ValueError("No model backend can handle this request")
+        elif estimate_tokens(text) > self.local_max_input_tokens:
+            decision = RoutingDecision(remote.name, f"input above {self.local_max_input_tokens} tokens", input_tokens)
+        elif language not in self.local_languages:
+            decision = RoutingDecision(remote.name, f"language '{language}' not served locally", input_tokens)
+        elif self.queue_depth(local.name) >= self.local_max_queue_depth:
+            decision = RoutingDecision(remote.name, f"local queue depth {self.queue_depth(local.name)}", input_tokens)
+        elif local.latency_samples and remote.latency_samples and self._expected_wait(local) > self._expected_wait(remote):
+            decision = RoutingDecision(
+                remote.name,
+                f"local expected wait {self._expected_wait(local):.2f}s > remote {self._expected_wait(remote):.2f}s",
+                input_tokens
+            )
+        else:
+            decision = RoutingDecision(local.name, "short input", input_tokens)
+
+        logger.info(
+            f"[ModelRouter] auto -> {decision.model} ({decision.reason}; "
+            f"~{decision.input_tokens} tokens, language={language})"
+        )
+        return decision
+
+
+model_router = ModelRouter(
+    local_max_input_tokens=settings.routing.local_max_input_tokens,
+    local_languages=settings.routing.local_languages,
+    local_max_queue_depth=settings.routing.local_max_queue_depth,
+    local_model=settings.routing.local_model,
+    remote_model=settings.routing.remote_model
+)
@@ -0,0 +1,212 @@
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+import requests
+from core.exceptions import OverloadedError
+from core.logger import logger
+from core.metrics import metrics, MODEL_TTFT, MODEL_TOKENS_PER_SECOND
+from core.resilience import backend_timeout
+from core.settings import settings
+
+
+@dataclass(eq=False)
+class _OllamaJob:
+    model: str
+    messages: list
+    options: dict
+    enqueued_at: float = field(default_factory=time.monotonic)
+    future: Future = field(default_factory=Future)
+
+
+def _percentile(samples: list, fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(math.ceil(fraction * len(ordered))) - 1)]
+
+
+class _LatencyWindow:
+    def __init__(self, size: int = 1000):
+        self._samples = deque(maxlen=size)
+
+    def add(self, seconds: float):
+        self._samples.append(seconds)
+
+    def summary(self) -> dict:
+        samples = list(self._samples)
+        return {
+            "avg_ms": round(1000 * sum(samples) / len(samples), 2) if samples else 0.0,
+            "p50_ms": round(1000 * _percentile(samples, 0.5), 2),
+            "p95_ms": round(1000 * _percentile(samples, 0.95), 2)
+        }
+
+
+class OllamaScheduler:
+    """
+    Single entry point for local inference. Requests are queued per model and
+    dispatched in micro-batches that fill the Ollama server's parallel slots,
+    so concurrent requests share one loaded model instead of contending for
+    it. While the loaded model has queued work it keeps the slots, for at most
+    max_consecutive_batches batches in a row and only until another model's
+    oldest request has waited max_model_wait_ms; then (or when it runs out of
+    work) the model with the oldest waiting request goes next. A full queue
+    rejects new requests with OverloadedError instead of letting latency grow.
+    """
+
+    def __init__(self, base_url: str, parallel_slots: int, max_queue_depth: int, batch_window_ms: int, keep_alive: str,
+                 max_consecutive_batches: int, max_model_wait_ms: int):
+        self.url = f"{base_url.rstrip('/')}/api/chat"
+        self.generate_url = f"{base_url.rstrip('/')}/api/generate"
+        self.parallel_slots = parallel_slots
+        self.max_queue_depth = max_queue_depth
+        self.batch_window = batch_window_ms / 1000
+        self.keep_alive = keep_alive
+        self.max_consecutive_batches = max_consecutive_batches
+        self.max_model_wait = max_model_wait_ms / 1000
+        self._consecutive_batches = 0
+        self._queues = OrderedDict()
+        self._pending = 0
+        self._active = 0
+        self._current_model = None
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=parallel_slots, thread_name_prefix="ollama-slot")
+        self._dispatcher = None
+        self._queue_wait = _LatencyWindow()
+        self._generation = _LatencyWindow()
+        self._counts = {"completed": 0, "failed": 0, "rejected": 0, "timed_out": 0, "batches": 0}
+
+    def chat(self, model: str, messages: list, options: dict = None) -> dict:
+        """Queues a non-streaming /api/chat call and blocks until it completes."""
+        job = _OllamaJob(model=model, messages=messages, options=options or {})
+        with self._cond:
+            if self._pending >= self.max_queue_depth:
+                self._counts["rejected"] += 1
+                raise OverloadedError("Local model queue is full, retry later", retry_after=self._retry_after())
+            self._queues.setdefault(model, deque()).append(job)
+            self._pending += 1
+            # The caller holds an admission slot and a server thread, so it waits for the expected
+            # queue time plus one call, not for as long as the dispatcher might be stuck
+            timeout = backend_timeout("ollama") + self._retry_after()
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(target=self._dispatch_loop, name="ollama-dispatcher", daemon=True)
+                self._dispatcher.start()
+            self._cond.notify()
+        try:
+            return job.future.result(timeout=timeout)
+        except FutureTimeoutError:
+            with self._cond:
+                self._counts["timed_out"] += 1
+                jobs = self._queues.get(model)
+                if jobs and job in jobs:
+                    # Still queued: withdraw it so it does not run for a caller that is gone
+                    jobs.remove(job)
+                    self._pending -= 1
+                    if not jobs:
+                        del self._queues[model]
+            raise TimeoutError(f"Ollama did not complete the '{model}' request within {timeout:.1f}s")
+
+    def preload(self, model: str):
+        """Loads the model into memory and pins it for keep_alive; bypasses the queue, meant for warmup."""
+        response = requests.post(self.generate_url, json={"model": model, "keep_alive": self.keep_alive},
+                                 timeout=backend_timeout("ollama"))
+        response.raise_for_status()
+
+    def _retry_after(self) -> int:
+        generation = self._generation.summary()["avg_ms"] / 1000 or 1.0
+        return max(1, int(math.ceil(generation * self._pending / self.parallel_slots)))
+
+    def _next_model(self):
+        oldest_first = lambda m: self._queues[m][0].enqueued_at
+        others = [model for model, jobs in self._queues.items() if jobs and model != self._current_model]
+        if self._active and self._queues.get(self._current_model):
+            starved = others and time.monotonic() - min(map(oldest_first, others)) >= self.max_model_wait
+            if not starved and self._consecutive_batches < self.max_consecutive_batches:
+                return self._current_model
+            if others:
+                return min(others, key=oldest_first)
+        return min((model for model, jobs in self._queues.items() if jobs), key=oldest_first)
+
+    def _dispatch_loop(self):
+        while True:
+            with self._cond:
+                while not (self._pending and self._active < self.parallel_slots):
+                    self._cond.wait()
+                if self.batch_window and self._pending < self.parallel_slots - self._active:
+                    # Give concurrent arrivals a moment to join the batch
+                    self._cond.wait(self.batch_window)
+                model = self._next_model()
+                jobs = self._queues[model]
+                batch = [jobs.popleft() for _ in range(min(len(jobs), self.parallel_slots - self._active))]
+                if not jobs:
+                    del self._queues[model]
+                self._pending -= len(batch)
+                self._active += len(batch)
+                self._consecutive_batches = self._consecutive_batches + 1 if model == self._current_model else 1
+                self._current_model = model
+                self._counts["batches"] += 1
+            for job in batch:
+                self._executor.submit(self._execute, job)
+
+    def _execute(self, job: _OllamaJob):
+        started = time.monotonic()
+        self._queue_wait.add(started - job.enqueued_at)
+        try:
+            response = requests.post(self.url, json={
+                "model": job.model,
+                "messages": job.messages,
+                "stream": False,
+                "keep_alive": self.keep_alive,
+                "options": job.options
+            }, timeout=backend_timeout("ollama"))
+            response.raise_for_status()
+            result = response.json()
+        except Exception as e:
+            logger.error(f"[OllamaScheduler] Request to '{job.model}' failed: {e}")
+            with self._cond:
+                self._counts["failed"] += 1
+            job.future.set_exception(e)
+        else:
+            self._generation.add(time.monotonic() - started)
+            # Ollama reports durations in nanoseconds
+            first_token_ns = (result.get("load_duration") or 0) + (result.get("prompt_eval_duration") or 0)
+            if first_token_ns:
+                MODEL_TTFT.observe(first_token_ns / 1e9, "ollama", job.model)
+            if result.get("eval_count") and result.get("eval_duration"):
+                MODEL_TOKENS_PER_SECOND.observe(result["eval_count"] / (result["eval_duration"] / 1e9), "ollama", job.model)
+            with self._cond:
+                self._counts["completed"] += 1
+            job.future.set_result(result)
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._cond.notify()
+
+    def stats(self) -> dict:
+        with self._cond:
+            snapshot = dict(self._counts, queue_depth=self._pending, active=self._active,
+                            parallel_slots=self.parallel_slots, current_model=self._current_model)
+        snapshot["queue_wait"] = self._queue_wait.summary()
+        snapshot["generation"] = self._generation.summary()
+        return snapshot
+
+
+def _scheduler_gauges():
+    stats = ollama_scheduler.stats()
+    return {("queued",): stats["queue_depth"], ("active",): stats["active"]}
+
+
+ollama_scheduler = OllamaScheduler(
+    base_url=settings.app.ollama_url,
+    parallel_slots=settings.ollama.parallel_slots,
+    max_queue_depth=settings.ollama.max_queue_depth,
+    batch_window_ms=settings.ollama.batch_window_ms,
+    keep_alive=settings.ollama.keep_alive,
+    max_consecutive_batches=settings.ollama.max_consecutive_batches,
+    max_model_wait_ms=settings.ollama.max_model_wait_ms
+)
+
+metrics.register_callback("breviobot_ollama_requests", "Ollama requests waiting in the scheduler queue or running",
+                          ("state",), _scheduler_gauges)
@@ -3,14 +3,15 @@ from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from core.settings import settings
 from auth.authenticators import require_auth
-from text.handlers import handle_summarize_request, handle_ask_request
+from text.handlers import handle_summarize_request, handle_ask_request, handle_ask_stats_request, handle_end_session_request, handle_list_models_request, handle_ollama_stats_request
 
 text_bp = Blueprint("text", __name__)
 
 text_limiter = Limiter(
     app=None,
     key_func=get_remote_address,
-    default_limits=[f"{settings.api.rate_limit} per minute"]
+    default_limits=[f"{settings.api.rate_limit} per minute"],
+    storage_uri=settings.api.rate_limit_storage_uri
 )
 
 @text_bp.route("/api/text/summarize", methods=["POST"])
@@ -24,3 +25,23 @@ def summarize():
 @require_auth
 def ask():
     return handle_ask_request(request.json)
+
+@text_bp.route("/api/text/ask/stats", methods=["GET"])
+@require_auth
+def ask_stats():
+    return handle_ask_stats_request()
+
+@text_bp.route("/api/text/ask/sessions/<session_id>", methods=["DELETE"])
+@require_auth
+def end_ask_session(session_id):
+    return handle_end_session_request(session_id)
+
+@text_bp.route("/api/text/models", methods=["GET"])
+@require_auth
+def list_models():
+    return handle_list_models_request()
+
+@text_bp.route("/api/text/ollama/stats", methods=["GET"])
+@require_auth
+def ollama_stats():
+    return handle_ollama_stats_request()
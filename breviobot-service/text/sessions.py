@@ -0,0 +1,121 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+from core.exceptions import ValidationError
+from core.logger import logger
+from core.settings import settings
+
+
+@dataclass
+class ConversationSession:
+    session_id: str
+    user_id: Optional[int]
+    summary: str = ""
+    turns: list = field(default_factory=list)
+    last_used: float = field(default_factory=time.monotonic)
+    compacting: bool = False
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def context_messages(self) -> list:
+        with self.lock:
+            messages = []
+            if self.summary:
+                messages.append({"role": "system", "content": f"Summary of the earlier conversation: {self.summary}"})
+            messages.extend(dict(turn) for turn in self.turns)
+            return messages
+
+
+class ConversationStore:
+    """
+    Bounded in-memory store of /api/text/ask conversations. Each session keeps the
+    last max_turns exchanges verbatim plus a rolling summary of older ones; the
+    summary is updated in the background so request latency does not grow with
+    the conversation. Least recently used and idle sessions are evicted.
+    """
+
+    def __init__(self, max_sessions: int, idle_ttl_seconds: int, max_turns: int, max_summary_chars: int):
+        self.max_sessions = max_sessions
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_turns = max_turns
+        self.max_summary_chars = max_summary_chars
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self._compactor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="session-compaction")
+
+    def _evict(self):
+        now = time.monotonic()
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if len(self._sessions) <= self.max_sessions and now - session.last_used < self.idle_ttl_seconds:
+                break
+            self._sessions.popitem(last=False)
+
+    def get_or_create(self, session_id: Optional[str], user_id: Optional[int]) -> ConversationSession:
+        with self._lock:
+            self._evict()
+            if session_id:
+                session = self._sessions.get(session_id)
+                if session is None or session.user_id != user_id:
+                    raise ValidationError("Unknown or expired conversation session")
+            else:
+                session = ConversationSession(session_id=uuid.uuid4().hex, user_id=user_id)
+                self._sessions[session.session_id] = session
+            session.last_used = time.monotonic()
+            self._sessions.move_to_end(session.session_id)
+            self._evict()
+            return session
+
+    def end(self, session_id: str, user_id: Optional[int]) -> bool:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None or session.user_id != user_id:
+                return False
+            del self._sessions[session_id]
+            return True
+
+    def append_turn(self, session: ConversationSession, user_content: str, assistant_content: str,
+                    summarize: Callable[[str, list], str]):
+        with session.lock:
+            session.turns.append({"role": "user", "content": user_content})
+            session.turns.append({"role": "assistant", "content": assistant_content})
+            needs_compaction = len(session.turns) > self.max_turns * 2 and not session.compacting
+            if needs_compaction:
+                session.compacting = True
+        if needs_compaction:
+            self._compactor.submit(self._compact, session, summarize)
+
+    def _compact(self, session: ConversationSession, summarize: Callable[[str, list], str]):
+        with session.lock:
+            overflow = session.turns[:-self.max_turns * 2]
+            previous_summary = session.summary
+        try:
+            try:
+                summary = summarize(previous_summary, overflow)
+            except Exception as e:
+                logger.warning(f"[Sessions] Summary model call failed, truncating instead: {e}")
+                summary = self._extractive_summary(previous_summary, overflow)
+            with session.lock:
+                session.summary = summary[-self.max_summary_chars:]
+                # Turns are only ever appended, so the folded prefix is unchanged
+                del session.turns[:len(overflow)]
+        finally:
+            with session.lock:
+                session.compacting = False
+
+    @staticmethod
+    def _extractive_summary(previous_summary: str, turns: list) -> str:
+        parts = [previous_summary] if previous_summary else []
+        parts.extend(f"{turn['role']}: {turn['content'][:200]}" for turn in turns)
+        return " | ".join(parts)
+
+
+conversation_store = ConversationStore(
+    max_sessions=settings.sessions.max_sessions,
+    idle_ttl_seconds=settings.sessions.idle_ttl_seconds,
+    max_turns=settings.sessions.max_turns,
+    max_summary_chars=settings.sessions.max_summary_chars
+)
@@ -1,12 +1,16 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from typing import Optional
-from openai import OpenAI
-import subprocess
 import os
-from core.exceptions import ValidationError, ModelError
+import time
+from core.exceptions import ValidationError, ModelError, OverloadedError
+from core.resilience import resilient_call, backend_timeout, is_transient
+from core.openai_clients import get_openai_client
 from core import settings
 from core.logger import logger
+from usage.accounting import estimate_tokens
+from text.model_registry import model_registry
+from text.ollama_scheduler import ollama_scheduler
 
 @dataclass
 class SummaryRequest:
@@ -29,6 +33,7 @@ class TextSummarizer:
     def __init__(self, openai_api_key: str, prompts: dict):
         self.openai_api_key = openai_api_key
         self.prompts = prompts
+        self.last_usage = None
         self._validate_prompts()
 
     def _validate_prompts(self):
@@ -52,7 +57,20 @@ class TextSummarizer:
             summarizer = SummarizerFactory.create_summarizer(
                 model, system_prompt, self.openai_api_key
             )
-            summary = summarizer.summarize(text)
+            started = time.perf_counter()
+            try:
+                summary = summarizer.summarize(text)
+            except OverloadedError:
+                raise
+            except Exception as e:
+                # Same mapping as the LLM clients: retries exhausted -> 502, anything else -> 400
+                logger.error(f"{summarizer.provider} error: {e}", exc_info=True)
+                if is_transient(e):
+                    raise ModelError(f"{summarizer.provider} is currently unavailable.")
+                raise ValidationError(f"{summarizer.provider} did not return a valid response.")
+            model_registry.record_latency(model, time.perf_counter() - started,
+                                          (summarizer.usage or {}).get("completion_tokens"))
+            self.last_usage = summarizer.usage
             
             if not summary:
                 raise ModelError("Model returned empty summary")
@@ -93,8 +111,11 @@ class TextSummarizer:
             raise
 
 class SummarizerBase(ABC):
+    provider = ""
+
     def __init__(self, system_prompt: str):
         self.system_prompt = system_prompt
+        self.usage = None
 
     @abstractmethod
     def summarize(self, text: str) -> str:
@@ -102,31 +123,37 @@ class SummarizerBase(ABC):
 
 
 class OllamaSummarizer(SummarizerBase):
+    provider = "Ollama"
+
     def __init__(self, system_prompt: str, model: str):
         super().__init__(system_prompt)
         self.model = model
 
     def summarize(self, text: str) -> str:
-        full_prompt = f"{self.system_prompt}\n\n{text}"
-        result = subprocess.run(
-            ["ollama", "run", self.model],
-            input=full_prompt.encode("utf-8"),
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
-        )
-        if result.returncode != 0:
-            raise RuntimeError(f"Error in llama while summarizing: {result.stderr.decode('utf-8')}")
-        return result.stdout.decode("utf-8").strip()
+        result = resilient_call("ollama", ollama_scheduler.chat, self.model, [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": text}
+        ], options={"temperature": 0.3})
+        summary = result["message"]["content"].strip()
+        self.usage = {
+            "prompt_tokens": result.get("prompt_eval_count") or estimate_tokens(self.system_prompt + text),
+            "completion_tokens": result.get("eval_count") or estimate_tokens(summary)
+        }
+        return summary
     
 
 class OpenAISummarizer(SummarizerBase):
+    provider = "OpenAI"
+
     def __init__(self, system_prompt: str, model: str, api_key: str):
         super().__init__(system_prompt)
         self.model = model
-        self.client = OpenAI(api_key=api_key)
+        self.client = get_openai_client(api_key, backend_timeout("openai"))
 
     def summarize(self, text: str) -> str:
-        response = self.client.chat.completions.create(
+        response = resilient_call(
+            "openai",
+            self.client.chat.completions.create,
             model=self.model,
             messages=[
                 {"role": "system", "content": self.system_prompt},
@@ -134,15 +161,20 @@ class OpenAISummarizer(SummarizerBase):
             ],
             temperature=0.3
         )
+        if response.usage:
+            self.usage = {
+                "prompt_tokens": response.usage.prompt_tokens,
+                "completion_tokens": response.usage.completion_tokens
+            }
         return response.choices[0].message.content.strip()
     
 
 class SummarizerFactory:
     @staticmethod
     def create_summarizer(model: str, system_prompt: str, openai_api_key: str) -> SummarizerBase:
-        if model.startswith("gpt"):
+        backend = model_registry.resolve(model)
+        if backend.provider == "openai":
             if not openai_api_key:
                 raise ValueError("OpenAI API key is not set")
-            return OpenAISummarizer(system_prompt, model, openai_api_key)
-        else:
-            return OllamaSummarizer(system_prompt, model)
\ No newline at end of file
+            return OpenAISummarizer(system_prompt, backend.name, openai_api_key)
+        return OllamaSummarizer(system_prompt, backend.name)
\ No newline at end of file
@@ -0,0 +1,70 @@
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+
+class ToolResultCache:
+    """
+    Bounded LRU of tool results shared by all cached tools. Entries expire after
+    their tool's TTL and can be dropped in bulk through invalidation tags
+    (e.g. "calendar:42" after user 42 creates an event).
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._tags = defaultdict(set)
+        self._stats = defaultdict(lambda: {"hits": 0, "misses": 0})
+        self._lock = threading.Lock()
+
+    def get(self, tool_name, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self._stats[tool_name]["hits"] += 1
+                return True, entry[1]
+            if entry is not None:
+                self._remove(key)
+            self._stats[tool_name]["misses"] += 1
+            return False, None
+
+    def set(self, key, value, ttl: float, tags=()):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, value, tuple(tags))
+            for tag in tags:
+                self._tags[tag].add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def invalidate(self, tag) -> int:
+        with self._lock:
+            keys = list(self._tags.get(tag, ()))
+            for key in keys:
+                self._remove(key)
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            tools = {}
+            for tool_name, counts in self._stats.items():
+                total = counts["hits"] + counts["misses"]
+                tools[tool_name] = dict(counts, hit_rate=round(counts["hits"] / total, 4) if total else 0.0)
+            return {"entries": len(self._entries), "max_entries": self.max_entries, "tools": tools}
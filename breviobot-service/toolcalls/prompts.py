@@ -1,8 +1,6 @@
-import datetime
+from core.prompts import PromptTemplate
 
 # Get Google Calendar events between two dates (OpenAI Function Calling style)
-TODAY = datetime.datetime.utcnow().date()
-
 GET_GOOGLE_CALENDAR_EVENTS_SCHEMA = {
     "name": "get_google_calendar_events",
     "description": "Return all Google Calendar events between the specified start and end dates.",
@@ -24,10 +22,15 @@ GET_GOOGLE_CALENDAR_EVENTS_SCHEMA = {
     }
 }
 
-INIT_GOOGLE_CALENDAR_TOOLCALL_PROMPT = (
+# The current date is rendered per request at the end of each prompt so the static
+# prefix stays byte-identical and OpenAI prompt-prefix caching keeps hitting
+CURRENT_DATE_SUFFIX = (
+    "\n\nToday's date is {today}. When interpreting natural language queries involving relative dates (e.g., “next week”), assume this as the current date."
+)
+
+INIT_GOOGLE_CALENDAR_TOOLCALL_TEMPLATE = PromptTemplate((
     "You are an assistant that helps retrieve events between a start and end date from Google Calendar using structured tool-calls. "
-    "When you receive a natural language request about calendar events, respond only with a JSON object that matches the function schema below, choosing the appropriate function and filling in the required parameters.\n"
-    f"Today's date is {TODAY}. When interpreting natural language queries involving relative dates (e.g., “next week”), assume this as the current date.\n\n"
+    "When you receive a natural language request about calendar events, respond only with a JSON object that matches the function schema below, choosing the appropriate function and filling in the required parameters.\n\n"
     f"Available function:\n{GET_GOOGLE_CALENDAR_EVENTS_SCHEMA}\n\n"
     "Example user request 1:\n"
     "\"Show me the calendar events between June 5 and June 7, 2025\"\n\n"
@@ -50,5 +53,18 @@ INIT_GOOGLE_CALENDAR_TOOLCALL_PROMPT = (
     "  }\n"
     "}\n\n"
     "Always respond only with a JSON object matching this schema."
-)
+), CURRENT_DATE_SUFFIX)
+
+INIT_TOOL_ROUTER_TEMPLATE = PromptTemplate((
+    "You are an assistant that answers questions about the user's Google Calendar. "
+    "Use the available tools to retrieve the data you need; you may call several tools at once when they are independent. "
+    "Dates passed to tools must be ISO 8601 date-times in UTC (e.g., 2025-06-01T00:00:00Z). "
+    "Once you have the tool results, answer concisely in the language of the user's request."
+), CURRENT_DATE_SUFFIX)
 
+CONVERSATION_SUMMARY_PROMPT = (
+    "You maintain the memory of a conversation between a user and a calendar assistant. "
+    "Merge the existing summary with the new messages into a single updated summary of at most a few sentences. "
+    "Keep facts needed for follow-up questions (dates and ranges discussed, calendars, people, decisions) and drop everything else. "
+    "Respond only with the updated summary."
+)
@@ -1,18 +1,121 @@
+import inspect
+import json
+from flask import g, has_app_context
+from core.settings import settings
+from core.tracing import span
+from core.metrics import metrics
+from toolcalls.cache import ToolResultCache
+
 TOOL_REGISTRY = {}
+TOOL_SCHEMAS = {}
+TOOL_CACHE_OPTIONS = {}
+
+tool_result_cache = ToolResultCache(settings.toolcalls.result_cache_max_entries)
+
+_JSON_TYPES = {
+    str: "string",
+    int: "integer",
+    float: "number",
+    bool: "boolean",
+    dict: "object",
+    list: "array"
+}
 
-def register_tool(name):
+def _build_schema(name, func, description=None, param_descriptions=None):
+    param_descriptions = param_descriptions or {}
+    properties = {}
+    required = []
+    for param in inspect.signature(func).parameters.values():
+        prop = {"type": _JSON_TYPES.get(param.annotation, "string")}
+        if param.name in param_descriptions:
+            prop["description"] = param_descriptions[param.name]
+        if param.default is inspect.Parameter.empty:
+            required.append(param.name)
+        else:
+            prop["default"] = param.default
+        properties[param.name] = prop
+    if description is None:
+        # First paragraph of the docstring
+        description = (inspect.getdoc(func) or name).split("\n\n")[0].replace("\n", " ")
+    return {
+        "name": name,
+        "description": description,
+        "parameters": {
+            "type": "object",
+            "properties": properties,
+            "required": required
+        }
+    }
+
+def register_tool(name, description=None, param_descriptions=None, cache_ttl=None, cache_key=None, cache_tags=()):
+    """
+    Registers a tool callable by the model. With cache_ttl (seconds) results are
+    memoized; cache_key(parameters, user_id) overrides the default key, and
+    cache_tags are format strings over the parameters and user_id (e.g.
+    "calendar:{user_id}") used to invalidate entries with invalidate_tool_cache.
+    """
     def decorator(func):
         TOOL_REGISTRY[name] = func
+        TOOL_SCHEMAS[name] = _build_schema(name, func, description, param_descriptions)
+        if cache_ttl:
+            TOOL_CACHE_OPTIONS[name] = {
+                "ttl": cache_ttl,
+                "key": cache_key,
+                "tags": tuple(cache_tags),
+                "signature": inspect.signature(func)
+            }
         return func
     return decorator
 
-# Esempio di funzione da registrare (da implementare altrove)
-# @register_tool("get_google_calendar_events")
-# def get_google_calendar_events(start_date: str, end_date: str):
-#     ...
+def get_tool_definitions():
+    # OpenAI function-calling format
+    return [{"type": "function", "function": schema} for schema in TOOL_SCHEMAS.values()]
+
+def _current_user_id():
+    if has_app_context() and hasattr(g, 'current_user'):
+        return g.current_user.get('user_id')
+    return None
 
 def dispatch_tool_call(tool_name, parameters):
     func = TOOL_REGISTRY.get(tool_name)
     if not func:
         raise ValueError(f"Tool '{tool_name}' non supportato")
-    return func(**parameters)
+    with span(f"tool.{tool_name}") as tool_span:
+        return _dispatch(tool_name, func, parameters, tool_span)
+
+def _dispatch(tool_name, func, parameters, tool_span):
+    options = TOOL_CACHE_OPTIONS.get(tool_name)
+    if not options:
+        return func(**parameters)
+
+    # Normalize so that omitted defaults and explicit defaults share a cache entry
+    bound = options["signature"].bind(**parameters)
+    bound.apply_defaults()
+    arguments = dict(bound.arguments)
+    user_id = _current_user_id()
+    if options["key"]:
+        key = (tool_name, options["key"](arguments, user_id))
+    else:
+        key = (tool_name, user_id, json.dumps(arguments, sort_keys=True, default=str))
+
+    hit, result = tool_result_cache.get(tool_name, key)
+    if tool_span:
+        tool_span.set_attribute("cache_hit", hit)
+    if hit:
+        return result
+    result = func(**parameters)
+    tags = [tag.format(**{**arguments, "user_id": user_id}) for tag in options["tags"]]
+    tool_result_cache.set(key, result, options["ttl"], tags)
+    return result
+
+def invalidate_tool_cache(tag):
+    return tool_result_cache.invalidate(tag)
+
+def get_tool_cache_stats():
+    return tool_result_cache.stats()
+
+def _tool_cache_counts(kind):
+    return lambda: {(f"tool:{name}",): counts[kind] for name, counts in get_tool_cache_stats()["tools"].items()}
+
+metrics.register_callback("breviobot_cache_hits_total", "Cache hits", ("cache",), _tool_cache_counts("hits"), metric_type="counter")
+metrics.register_callback("breviobot_cache_misses_total", "Cache misses", ("cache",), _tool_cache_counts("misses"), metric_type="counter")
@@ -0,0 +1,92 @@
+import contextvars
+import json
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app, g
+from core.logger import logger
+from core.settings import settings
+from toolcalls.registry import dispatch_tool_call, get_tool_definitions
+
+
+def _run_tool(app, current_user, tool_name, parameters):
+    # Worker threads have no application context; recreate it with the caller's user
+    with app.app_context():
+        g.current_user = current_user
+        return dispatch_tool_call(tool_name, parameters)
+
+
+def execute_tool_calls(tool_calls) -> list:
+    """
+    Runs the tool calls of one model turn concurrently. Failures are returned to the
+    model as error results instead of aborting the request, so it can recover.
+    """
+    app = current_app._get_current_object()
+    current_user = getattr(g, 'current_user', None)
+    results = [None] * len(tool_calls)
+    pending = []
+    for i, call in enumerate(tool_calls):
+        try:
+            parameters = json.loads(call.function.arguments or "{}")
+        except json.JSONDecodeError as e:
+            results[i] = {"error": f"Invalid arguments: {e}"}
+            continue
+        pending.append((i, call.function.name, parameters))
+
+    workers = max(1, min(len(pending), settings.toolcalls.max_parallel_tools))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [(i, name, pool.submit(contextvars.copy_context().run, _run_tool, app, current_user, name, parameters)) for i, name, parameters in pending]
+        for i, name, future in futures:
+            try:
+                results[i] = future.result()
+            except Exception as e:
+                logger.error(f"[ToolCalls] Tool '{name}' failed: {e}", exc_info=True)
+                results[i] = {"error": str(e)}
+    return results
+
+
+def run_tool_conversation(client, user_query: str, max_rounds: int = None, history: list = None) -> dict:
+    """
+    Native tool-calling loop: the model may request several tools per turn, their
+    results are sent back, and the model produces a final answer. At most max_rounds
+    model calls are made; the last one is not allowed to request further tools.
+    history holds prior conversation messages placed between the system prompt and the query.
+    """
+    max_rounds = max_rounds or settings.toolcalls.max_rounds
+    tools = get_tool_definitions()
+    messages = [{"role": "system", "content": client.system_prompt}]
+    messages.extend(history or [])
+    messages.append({"role": "user", "content": user_query})
+    executed = []
+    usage = {"prompt_tokens": 0, "completion_tokens": 0}
+    for round_number in range(1, max_rounds + 1):
+        # Reset so a round whose response carries no usage adds nothing, not the previous round again
+        client.last_usage = None
+        message = client.chat(messages, tools=tools, allow_tools=round_number < max_rounds)
+        for key in usage:
+            usage[key] += (client.last_usage or {}).get(key, 0)
+        if not message.tool_calls:
+            client.last_usage = usage
+            return {"answer": (message.content or "").strip(), "tool_calls": executed}
+
+        logger.info("[ToolCalls] Round %s: model requested %d tool call(s)", round_number, len(message.tool_calls))
+        messages.append({
+            "role": "assistant",
+            "content": message.content,
+            "tool_calls": [
+                {
+                    "id": call.id,
+                    "type": "function",
+                    "function": {"name": call.function.name, "arguments": call.function.arguments}
+                }
+                for call in message.tool_calls
+            ]
+        })
+        results = execute_tool_calls(message.tool_calls)
+        for call, result in zip(message.tool_calls, results):
+            executed.append({"name": call.function.name, "arguments": call.function.arguments, "result": result})
+            messages.append({
+                "role": "tool",
+                "tool_call_id": call.id,
+                "content": json.dumps(result, default=str)
+            })
+    client.last_usage = usage
+    return {"answer": None, "tool_calls": executed}
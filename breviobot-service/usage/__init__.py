@@ -0,0 +1,7 @@
+from .accounting import UsageTracker, usage_tracker, estimate_tokens
+
+__all__ = [
+    'UsageTracker',
+    'usage_tracker',
+    'estimate_tokens'
+]
@@ -0,0 +1,208 @@
+import atexit
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from core.exceptions import QuotaExceededError
+from core.logger import logger
+from core.settings import settings
+from persistence.db_session import SessionLocal
+from persistence.repositories import UsageRepository
+
+
+def estimate_tokens(text: str) -> int:
+    # Rough heuristic (~4 characters per token) for backends that do not report usage
+    return max(1, len(text) // 4) if text else 0
+
+
+@dataclass
+class _PeriodTotals:
+    day: str
+    month: str
+    day_tokens: int = 0
+    day_audio_seconds: float = 0.0
+    month_tokens: int = 0
+    month_audio_seconds: float = 0.0
+
+
+class UsageTracker:
+    """
+    Records per-user token and audio usage and enforces quotas.
+    Records are buffered in memory and written in batches by a background thread;
+    quota checks are served from in-memory counters that are re-hydrated from the
+    database after each flush, so usage written by other workers is picked up.
+    """
+
+    def __init__(self, flush_interval_seconds: int, flush_batch_size: int):
+        self.flush_interval_seconds = flush_interval_seconds
+        self.flush_batch_size = flush_batch_size
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._buffer = []
+        self._inflight = []
+        self._counters = {}
+        self._generation = 0
+        self._stop_event = threading.Event()
+        self._flush_requested = threading.Event()
+        self._flush_thread = None
+
+    @staticmethod
+    def _period_keys(now: datetime) -> tuple:
+        return now.strftime("%Y-%m-%d"), now.strftime("%Y-%m")
+
+    def _load_totals(self, user_id: int, now: datetime) -> _PeriodTotals:
+        day_key, month_key = self._period_keys(now)
+        day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        month_start = day_start.replace(day=1)
+        with SessionLocal() as db:
+            repo = UsageRepository(db)
+            day = repo.get_totals(user_id, day_start)
+            month = repo.get_totals(user_id, month_start)
+        return _PeriodTotals(
+            day=day_key,
+            month=month_key,
+            day_tokens=day["prompt_tokens"] + day["completion_tokens"],
+            day_audio_seconds=day["audio_seconds"],
+            month_tokens=month["prompt_tokens"] + month["completion_tokens"],
+            month_audio_seconds=month["audio_seconds"]
+        )
+
+    @staticmethod
+    def _apply(totals: _PeriodTotals, record: dict):
+        created_day, created_month = UsageTracker._period_keys(record["created_at"])
+        tokens = record["prompt_tokens"] + record["completion_tokens"]
+        if created_month == totals.month:
+            totals.month_tokens += tokens
+            totals.month_audio_seconds += record["audio_seconds"]
+            if created_day == totals.day:
+                totals.day_tokens += tokens
+                totals.day_audio_seconds += record["audio_seconds"]
+
+    def _get_totals(self, user_id: int) -> _PeriodTotals:
+        while True:
+            now = datetime.utcnow()
+            day_key, month_key = self._period_keys(now)
+            with self._lock:
+                totals = self._counters.get(user_id)
+                if totals is not None and totals.day == day_key and totals.month == month_key:
+                    return totals
+                generation = self._generation
+            # The database read happens outside the lock so other requests are not blocked
+            totals = self._load_totals(user_id, now)
+            with self._lock:
+                if generation != self._generation:
+                    # A flush committed records while we were reading; read again
+                    continue
+                # Records not yet committed are not visible in the database
+                for record in self._inflight + self._buffer:
+                    if record["user_id"] == user_id:
+                        self._apply(totals, record)
+                self._counters[user_id] = totals
+                return totals
+
+    def get_usage(self, user_id: int) -> dict:
+        totals = self._get_totals(user_id)
+        return {
+            "day": {
+                "period": totals.day,
+                "tokens": totals.day_tokens,
+                "audio_seconds": round(totals.day_audio_seconds, 2),
+                "token_quota": settings.usage.daily_token_quota or None,
+                "audio_seconds_quota": settings.usage.daily_audio_seconds_quota or None
+            },
+            "month": {
+                "period": totals.month,
+                "tokens": totals.month_tokens,
+                "audio_seconds": round(totals.month_audio_seconds, 2),
+                "token_quota": settings.usage.monthly_token_quota or None,
+                "audio_seconds_quota": settings.usage.monthly_audio_seconds_quota or None
+            }
+        }
+
+    def check_quota(self, user_id: Optional[int], tokens: bool = False, audio: bool = False):
+        if user_id is None:
+            return
+        totals = self._get_totals(user_id)
+        quotas = settings.usage
+        if tokens:
+            if quotas.daily_token_quota and totals.day_tokens >= quotas.daily_token_quota:
+                raise QuotaExceededError("Daily token quota exceeded")
+            if quotas.monthly_token_quota and totals.month_tokens >= quotas.monthly_token_quota:
+                raise QuotaExceededError("Monthly token quota exceeded")
+        if audio:
+            if quotas.daily_audio_seconds_quota and totals.day_audio_seconds >= quotas.daily_audio_seconds_quota:
+                raise QuotaExceededError("Daily audio quota exceeded")
+            if quotas.monthly_audio_seconds_quota and totals.month_audio_seconds >= quotas.monthly_audio_seconds_quota:
+                raise QuotaExceededError("Monthly audio quota exceeded")
+
+    def record(self, user_id: Optional[int], endpoint: str, model: Optional[str] = None,
+               prompt_tokens: int = 0, completion_tokens: int = 0, audio_seconds: float = 0.0):
+        if user_id is None:
+            return
+        record = {
+            "user_id": user_id,
+            "endpoint": endpoint,
+            "model": model,
+            "prompt_tokens": int(prompt_tokens or 0),
+            "completion_tokens": int(completion_tokens or 0),
+            "audio_seconds": float(audio_seconds or 0.0),
+            "created_at": datetime.utcnow()
+        }
+        with self._lock:
+            self._buffer.append(record)
+            totals = self._counters.get(user_id)
+            if totals is not None:
+                self._apply(totals, record)
+            buffer_full = len(self._buffer) >= self.flush_batch_size
+        self._ensure_flush_thread()
+        if buffer_full:
+            self._flush_requested.set()
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                if not self._buffer:
+                    return
+                self._inflight, self._buffer = self._buffer, []
+            try:
+                with SessionLocal() as db:
+                    UsageRepository(db).add_many(self._inflight)
+            except Exception as e:
+                logger.error(f"[Usage] Failed to flush {len(self._inflight)} usage records: {e}", exc_info=True)
+                with self._lock:
+                    self._buffer = self._inflight + self._buffer
+                    self._inflight = []
+                return
+            with self._lock:
+                logger.debug("[Usage] Flushed %d usage records", len(self._inflight))
+                self._inflight = []
+                self._generation += 1
+                # Force a re-read so counters include usage flushed by other workers
+                self._counters.clear()
+
+    def _ensure_flush_thread(self):
+        if self._flush_thread is not None:
+            return
+        with self._lock:
+            if self._flush_thread is not None:
+                return
+            self._flush_thread = threading.Thread(target=self._flush_loop, name="usage-flush", daemon=True)
+            self._flush_thread.start()
+            atexit.register(self.shutdown)
+
+    def _flush_loop(self):
+        while not self._stop_event.is_set():
+            self._flush_requested.wait(self.flush_interval_seconds)
+            self._flush_requested.clear()
+            self.flush()
+
+    def shutdown(self):
+        self._stop_event.set()
+        self._flush_requested.set()
+        self.flush()
+
+
+usage_tracker = UsageTracker(
+    flush_interval_seconds=settings.usage.flush_interval_seconds,
+    flush_batch_size=settings.usage.flush_batch_size
+)
@@ -0,0 +1,12 @@
+from flask import jsonify, g
+from core.exceptions import ValidationError
+from core.logger import logger
+from usage.accounting import usage_tracker
+
+
+def handle_usage_request():
+    user_id = g.current_user.get('user_id')
+    if user_id is None:
+        raise ValidationError("Usage is only tracked for authenticated users")
+    logger.info(f"[Usage] Usage requested for user_id={user_id}")
+    return jsonify({"usage": usage_tracker.get_usage(user_id)})
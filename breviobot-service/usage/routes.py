@@ -0,0 +1,21 @@
+from flask import Blueprint
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
+from core.settings import settings
+from auth.authenticators import require_auth
+from usage.handlers import handle_usage_request
+
+usage_bp = Blueprint("usage", __name__)
+
+usage_limiter = Limiter(
+    app=None,
+    key_func=get_remote_address,
+    default_limits=[f"{settings.api.rate_limit} per minute"],
+    storage_uri=settings.api.rate_limit_storage_uri
+)
+
+@usage_bp.route("/api/usage", methods=["GET"])
+@usage_limiter.limit(f"{settings.api.rate_limit} per minute")
+@require_auth
+def usage():
+    return handle_usage_request()
@@ -7,8 +7,8 @@ import os
 @dataclass(frozen=True)
 class AppDefaultSettings:
     SUPPORTED_LANGUAGES: List[str] = ("it", "en")
-    SUPPORTED_MODELS: List[str] = ("llama3", "llama3:instruct", "mistral", "gpt-3.5-turbo", "gpt-4")
-    ModelType = Literal["llama3", "llama3:instruct", "mistral", "gpt-3.5-turbo", "gpt-4"]
+    SUPPORTED_MODELS: List[str] = ("auto", "llama3", "llama3:instruct", "mistral", "gpt-3.5-turbo", "gpt-4")
+    ModelType = Literal["auto", "llama3", "llama3:instruct", "mistral", "gpt-3.5-turbo", "gpt-4"]
     LangType = Literal["it", "en"]
     DEFAULT_LANG: str = "it"
     DEFAULT_MODEL: str = "llama3"